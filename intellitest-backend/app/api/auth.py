@@ -1,22 +1,32 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from datetime import timedelta
+from typing import Optional
 from app.core.database import get_db
-from app.core.security import verify_password, create_access_token
+from app.core.security import password_hasher, create_access_token
 from app.core.config import settings
 from app.models.user import User
+from app.utils.cache import principal_cache
 from app.schemas.user import UserLogin, Token, UserResponse
 
 router = APIRouter()
 
+def _get_user_by_username(db: Session, username: str) -> Optional[User]:
+    user = db.query(User).filter(User.username == username).first()
+    # Hand the connection back before the slow password check; closing
+    # detaches the user with its loaded columns intact
+    db.close()
+    return user
+
 @router.post("/login", response_model=Token)
 async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
 ):
-    user = db.query(User).filter(User.username == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    user = await run_in_threadpool(_get_user_by_username, db, form_data.username)
+    if not user or not await password_hasher.verify(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -29,6 +39,9 @@ async def login(
             detail="Inactive user"
         )
     
+    # Requests made with the new token start with a warm principal
+    principal_cache.put(user)
+    
     access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
     access_token = create_access_token(
         data={"sub": str(user.id)}, expires_delta=access_token_expires
@@ -45,8 +58,8 @@ async def login_json(
     user_login: UserLogin,
     db: Session = Depends(get_db)
 ):
-    user = db.query(User).filter(User.username == user_login.username).first()
-    if not user or not verify_password(user_login.password, user.hashed_password):
+    user = await run_in_threadpool(_get_user_by_username, db, user_login.username)
+    if not user or not await password_hasher.verify(user_login.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -59,6 +72,9 @@ async def login_json(
             detail="Inactive user"
         )
     
+    # Requests made with the new token start with a warm principal
+    principal_cache.put(user)
+    
     access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
     access_token = create_access_token(
         data={"sub": str(user.id)}, expires_delta=access_token_expires
@@ -1,26 +1,78 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+import json
+from fastapi import APIRouter, Depends, HTTPException, Request, WebSocket, WebSocketDisconnect, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any
-from app.core.database import get_db
-from app.models.user import User
+from typing import List, Dict, Any, Optional
+from app.core.database import get_db, pool_status, SessionLocal
+from app.core.events import progress_hub
+from app.core.security import password_hasher
+from app.models.user import UserRole
 from app.models.test import Test
-from app.models.submission import Submission, SubmissionAnswer
-from app.api.dependencies import require_admin_or_teacher
+from app.schemas.test import TestResponse
+from app.utils.analytics import analytics_snapshot
+from app.utils.cache import Principal, cache_stats
+from app.utils.progress import progress_snapshot
+from app.api.dependencies import get_principal_from_token, require_admin_or_teacher, require_role
 
 router = APIRouter()
 
-@router.get("/live-tests")
-async def get_live_tests(
-    current_user: User = Depends(require_admin_or_teacher),
+SSE_KEEPALIVE_SECONDS = 15
+
+def _open_progress_stream(test_id: int, token: str) -> Optional[str]:
+    """Authorize a stream watcher and return the encoded snapshot event.
+
+    Browsers cannot attach an Authorization header to WebSocket or
+    EventSource requests, so streams take the bearer token as a query param.
+    """
+    db = SessionLocal()
+    try:
+        user = get_principal_from_token(token, db)
+        if not user or not user.is_active or user.role not in [UserRole.ADMIN, UserRole.TEACHER]:
+            return None
+        
+        test = db.query(Test).filter(Test.id == test_id).first()
+        if not test:
+            return None
+        
+        snapshot = progress_snapshot(db, test)
+    finally:
+        db.close()
+    
+    return json.dumps(jsonable_encoder({"type": "snapshot", **snapshot}))
+
+@router.get("/live-tests", response_model=List[TestResponse])
+def get_live_tests(
+    current_user: Principal = Depends(require_admin_or_teacher),
     db: Session = Depends(get_db)
 ):
     live_tests = db.query(Test).filter(Test.is_live == True).all()
     return live_tests
 
+@router.get("/cache-stats")
+async def get_cache_stats(
+    current_user: Principal = Depends(require_role(UserRole.ADMIN))
+):
+    return cache_stats()
+
+@router.get("/hash-pool")
+async def get_hash_pool_stats(
+    current_user: Principal = Depends(require_role(UserRole.ADMIN))
+):
+    return password_hasher.stats()
+
+@router.get("/db-pool")
+async def get_db_pool_stats(
+    current_user: Principal = Depends(require_role(UserRole.ADMIN))
+):
+    return pool_status()
+
 @router.get("/test/{test_id}/progress")
-async def get_test_progress(
+def get_test_progress(
     test_id: int,
-    current_user: User = Depends(require_admin_or_teacher),
+    current_user: Principal = Depends(require_admin_or_teacher),
     db: Session = Depends(get_db)
 ):
     # Verify test exists
@@ -28,47 +80,13 @@ async def get_test_progress(
     if not test:
         raise HTTPException(status_code=404, detail="Test not found")
     
-    # Get all submissions for this test
-    submissions = db.query(Submission).filter(Submission.test_id == test_id).all()
-    
-    progress_data = []
-    for submission in submissions:
-        # Get student info
-        student = db.query(User).filter(User.id == submission.student_id).first()
-        
-        # Get answers for this submission
-        answers = db.query(SubmissionAnswer).filter(
-            SubmissionAnswer.submission_id == submission.id
-        ).all()
-        
-        # Count attempted questions
-        attempted = len([a for a in answers if a.selected_answer is not None])
-        
-        progress_data.append({
-            "student_id": submission.student_id,
-            "student_name": student.full_name if student else "Unknown",
-            "student_class": student.class_name if student else None,
-            "attempted_questions": attempted,
-            "total_questions": submission.total_questions,
-            "status": "Submitted" if submission.submitted_at else "In Progress",
-            "started_at": submission.started_at,
-            "submitted_at": submission.submitted_at,
-            "score": submission.score
-        })
-    
-    return {
-        "test_id": test_id,
-        "test_name": test.name,
-        "total_students": len(progress_data),
-        "submitted_count": len([p for p in progress_data if p["status"] == "Submitted"]),
-        "in_progress_count": len([p for p in progress_data if p["status"] == "In Progress"]),
-        "students": progress_data
-    }
+    # One grouped query for every student instead of two lookups per submission
+    return progress_snapshot(db, test)
 
 @router.get("/test/{test_id}/analytics")
-async def get_test_analytics(
+def get_test_analytics(
     test_id: int,
-    current_user: User = Depends(require_admin_or_teacher),
+    current_user: Principal = Depends(require_admin_or_teacher),
     db: Session = Depends(get_db)
 ):
     # Verify test exists
@@ -76,54 +94,62 @@ async def get_test_analytics(
     if not test:
         raise HTTPException(status_code=404, detail="Test not found")
     
-    # Get all submissions for this test
-    submissions = db.query(Submission).filter(Submission.test_id == test_id).all()
-    
-    if not submissions:
-        return {
-            "test_id": test_id,
-            "test_name": test.name,
-            "total_submissions": 0,
-            "average_score": 0,
-            "score_distribution": {},
-            "question_analysis": []
-        }
+    # Grouped aggregates over submission_answers; no ORM rows are loaded
+    return analytics_snapshot(db, test)
+
+@router.websocket("/test/{test_id}/stream")
+async def stream_test_progress(websocket: WebSocket, test_id: int, token: str):
+    # Subscribe before taking the snapshot so no delta can fall in between;
+    # deltas carry whole rows, so replaying one already in the snapshot is harmless
+    queue = progress_hub.subscribe(test_id)
+    snapshot = await run_in_threadpool(_open_progress_stream, test_id, token)
+    if snapshot is None:
+        progress_hub.unsubscribe(test_id, queue)
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
     
-    # Calculate average score
-    scores = [s.score for s in submissions if s.score is not None]
-    average_score = sum(scores) / len(scores) if scores else 0
+    await websocket.accept()
     
-    # Score distribution
-    score_ranges = {
-        "0-20": 0,
-        "21-40": 0,
-        "41-60": 0,
-        "61-80": 0,
-        "81-100": 0
-    }
+    async def pump():
+        await websocket.send_text(snapshot)
+        while True:
+            await websocket.send_text(await queue.get())
     
-    for score in scores:
-        if score <= 20:
-            score_ranges["0-20"] += 1
-        elif score <= 40:
-            score_ranges["21-40"] += 1
-        elif score <= 60:
-            score_ranges["41-60"] += 1
-        elif score <= 80:
-            score_ranges["61-80"] += 1
-        else:
-            score_ranges["81-100"] += 1
+    sender = asyncio.create_task(pump())
+    try:
+        # Reading is only used to notice the client going away
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sender.cancel()
+        progress_hub.unsubscribe(test_id, queue)
+
+@router.get("/test/{test_id}/events")
+async def stream_test_progress_sse(test_id: int, token: str, request: Request):
+    """Server-Sent Events fallback for clients that cannot open a WebSocket"""
+    queue = progress_hub.subscribe(test_id)
+    snapshot = await run_in_threadpool(_open_progress_stream, test_id, token)
+    if snapshot is None:
+        progress_hub.unsubscribe(test_id, queue)
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
     
-    # Question-level analysis
-    question_analysis = []
-    # This would require more complex queries to analyze each question
-    # For now, return basic structure
+    async def event_stream():
+        try:
+            yield f"data: {snapshot}\n\n"
+            while not await request.is_disconnected():
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"data: {message}\n\n"
+        finally:
+            progress_hub.unsubscribe(test_id, queue)
     
-    return {
-        "test_id": test_id,
-        "test_name": test.name,
-        "total_submissions": len(submissions),
-        "average_score": round(average_score, 2),
-        "score_distribution": score_ranges,
-        "question_analysis": question_analysis
-    }
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
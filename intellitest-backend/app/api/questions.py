@@ -1,21 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, Query, Response, UploadFile, status
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from app.core.database import get_db
-from app.models.user import User
+from app.models.job import ImportJob
 from app.models.question import Question
-from app.schemas.question import QuestionCreate, QuestionUpdate, QuestionResponse
+from app.schemas.question import (
+    QuestionCreate, QuestionUpdate, QuestionResponse, QuestionSearchHit, QuestionSearchResults,
+    QuestionWithDuplicates, DuplicateReport
+)
+from app.schemas.job import ImportJobResponse
+from app.utils.cache import Principal, invalidate_question
+from app.utils.dedupe import (
+    DOCUMENT_FIELDS, DUPLICATE_THRESHOLD, delete_fingerprints, document_of, duplicate_report,
+    find_duplicates, index_questions
+)
+from app.utils.imports import create_job, import_format, run_import, save_upload
+from app.utils.pagination import paginate, page_response, parse_fields
+from app.utils.search import search_matches, search_questions, search_terms
 from app.api.dependencies import require_admin_or_teacher
 
 router = APIRouter()
 
 @router.get("/", response_model=List[QuestionResponse])
-async def read_questions(
-    skip: int = 0,
-    limit: int = 100,
+def read_questions(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    fields: Optional[str] = None,
     topic: Optional[str] = None,
     search: Optional[str] = None,
-    current_user: User = Depends(require_admin_or_teacher),
+    current_user: Principal = Depends(require_admin_or_teacher),
     db: Session = Depends(get_db)
 ):
     query = db.query(Question)
@@ -23,18 +38,58 @@ async def read_questions(
     if topic:
         query = query.filter(Question.topic.ilike(f"%{topic}%"))
     
-    if search:
-        query = query.filter(Question.question_text.ilike(f"%{search}%"))
+    terms = search_terms(search)
+    if terms:
+        # Served from the full-text index instead of a scanning ILIKE
+        matches = search_matches(db, terms)
+        query = query.filter(Question.id.in_(select(matches.c.question_id)))
     
-    questions = query.offset(skip).limit(limit).all()
-    return questions
+    page = paginate(db, query, Question, cursor, limit, parse_fields(fields, QuestionResponse))
+    return page_response(response, page)
 
-@router.post("/", response_model=QuestionResponse)
-async def create_question(
+@router.get("/search", response_model=QuestionSearchResults)
+def search_question_bank(
+    q: str,
+    topic: Optional[str] = None,
+    difficulty: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=1000),
+    current_user: Principal = Depends(require_admin_or_teacher),
+    db: Session = Depends(get_db)
+):
+    """Ranked full-text search with prefix matching and topic/difficulty facets"""
+    terms = search_terms(q)
+    if not terms:
+        return QuestionSearchResults(total=0, results=[], facets={"topic": {}, "difficulty_level": {}})
+    
+    hits, total, facets = search_questions(db, terms, topic, difficulty, limit, offset)
+    return QuestionSearchResults(
+        total=total,
+        results=[
+            QuestionSearchHit(**QuestionResponse.model_validate(question).model_dump(), score=score)
+            for question, score in hits
+        ],
+        facets=facets
+    )
+
+@router.get("/duplicates", response_model=DuplicateReport)
+def read_duplicate_report(
+    threshold: float = Query(DUPLICATE_THRESHOLD, ge=0.5, le=1.0),
+    limit: int = Query(100, ge=1, le=1000),
+    current_user: Principal = Depends(require_admin_or_teacher),
+    db: Session = Depends(get_db)
+):
+    """Groups of near-duplicate questions in the bank, largest first"""
+    groups, total = duplicate_report(db, threshold, limit)
+    return DuplicateReport(threshold=threshold, total_groups=total, groups=groups)
+
+@router.post("/", response_model=QuestionWithDuplicates)
+def create_question(
     question: QuestionCreate,
-    current_user: User = Depends(require_admin_or_teacher),
+    current_user: Principal = Depends(require_admin_or_teacher),
     db: Session = Depends(get_db)
 ):
+    """Create a question; near-duplicates already in the bank are listed, not rejected"""
     db_question = Question(
         question_text=question.question_text,
         option_a=question.option_a,
@@ -47,15 +102,62 @@ async def create_question(
         image_url=question.image_url,
         created_by=current_user.id
     )
+    document = document_of(db_question)
+    duplicates = find_duplicates(db, document)
+    
     db.add(db_question)
+    db.flush()
+    index_questions(db, [(db_question.id, document)])
     db.commit()
     db.refresh(db_question)
-    return db_question
+    return QuestionWithDuplicates(
+        **QuestionResponse.model_validate(db_question).model_dump(), duplicates=duplicates
+    )
+
+@router.post("/bulk", response_model=ImportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+def bulk_import_questions(
+    background_tasks: BackgroundTasks,
+    response: Response,
+    file: UploadFile = File(...),
+    format: Optional[str] = None,
+    background: bool = True,
+    current_user: Principal = Depends(require_admin_or_teacher),
+    db: Session = Depends(get_db)
+):
+    """Import questions from a CSV or JSONL upload.
+
+    Rows are validated and inserted in chunks, and invalid rows are reported
+    by row number instead of failing the whole file. The import runs in the
+    background unless background=false; poll GET /bulk/{job_id} for progress.
+    """
+    format = import_format(file.filename, format)
+    path = save_upload(file)
+    job = create_job(db, "questions", file.filename, current_user.id)
+    
+    if background:
+        background_tasks.add_task(run_import, job.id, path, format, current_user.id)
+        return job
+    
+    run_import(job.id, path, format, current_user.id)
+    db.refresh(job)
+    response.status_code = status.HTTP_200_OK
+    return job
+
+@router.get("/bulk/{job_id}", response_model=ImportJobResponse)
+def read_import_job(
+    job_id: int,
+    current_user: Principal = Depends(require_admin_or_teacher),
+    db: Session = Depends(get_db)
+):
+    job = db.query(ImportJob).filter(ImportJob.id == job_id, ImportJob.kind == "questions").first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job
 
 @router.get("/{question_id}", response_model=QuestionResponse)
-async def read_question(
+def read_question(
     question_id: int,
-    current_user: User = Depends(require_admin_or_teacher),
+    current_user: Principal = Depends(require_admin_or_teacher),
     db: Session = Depends(get_db)
 ):
     question = db.query(Question).filter(Question.id == question_id).first()
@@ -63,11 +165,11 @@ async def read_question(
         raise HTTPException(status_code=404, detail="Question not found")
     return question
 
-@router.put("/{question_id}", response_model=QuestionResponse)
-async def update_question(
+@router.put("/{question_id}", response_model=QuestionWithDuplicates)
+def update_question(
     question_id: int,
     question_update: QuestionUpdate,
-    current_user: User = Depends(require_admin_or_teacher),
+    current_user: Principal = Depends(require_admin_or_teacher),
     db: Session = Depends(get_db)
 ):
     db_question = db.query(Question).filter(Question.id == question_id).first()
@@ -78,20 +180,31 @@ async def update_question(
     for field, value in update_data.items():
         setattr(db_question, field, value)
     
+    duplicates = []
+    if any(field in update_data for field in DOCUMENT_FIELDS):
+        document = document_of(db_question)
+        duplicates = find_duplicates(db, document, exclude_id=question_id)
+        index_questions(db, [(question_id, document)])
+    
     db.commit()
+    invalidate_question(question_id)
     db.refresh(db_question)
-    return db_question
+    return QuestionWithDuplicates(
+        **QuestionResponse.model_validate(db_question).model_dump(), duplicates=duplicates
+    )
 
 @router.delete("/{question_id}")
-async def delete_question(
+def delete_question(
     question_id: int,
-    current_user: User = Depends(require_admin_or_teacher),
+    current_user: Principal = Depends(require_admin_or_teacher),
     db: Session = Depends(get_db)
 ):
     db_question = db.query(Question).filter(Question.id == question_id).first()
     if not db_question:
         raise HTTPException(status_code=404, detail="Question not found")
     
+    delete_fingerprints(db, question_id)
     db.delete(db_question)
     db.commit()
+    invalidate_question(question_id)
     return {"message": "Question deleted successfully"}
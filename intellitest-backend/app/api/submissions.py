@@ -1,21 +1,214 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi.responses import StreamingResponse
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, noload, selectinload
+from typing import List, Optional
 from datetime import datetime
 from app.core.database import get_db
-from app.models.user import User, UserRole
+from app.models.user import UserRole
 from app.models.test import Test
 from app.models.submission import Submission, SubmissionAnswer
-from app.models.question import Question
-from app.schemas.submission import SubmissionCreate, SubmissionResponse
+from app.schemas.submission import (
+    SubmissionStart, SubmissionCreate, SubmissionResponse,
+    SubmissionAnswerCreate, SubmissionAnswerResponse
+)
+from app.utils.analytics import record_attempt, record_submission
+from app.utils.cache import Principal, answer_key_cache, paper_cache
+from app.utils.deadlines import deadline_scheduler
+from app.utils.export import EXPORT_MEDIA_TYPES, load_question_ids, parquet_available, stream_export
+from app.utils.grading import apply_score, attempt_deadline, mark_answer, question_count, student_questions
+from app.utils.progress import publish_progress
+from app.utils.shuffle import attempt_seed, to_displayed, to_original
 from app.api.dependencies import get_current_active_user, require_admin_or_teacher
 
 router = APIRouter()
 
+def _normalize_answer(selected_answer: Optional[str], question_id: int, seed: Optional[int] = None) -> Optional[str]:
+    # Clients send 'a'..'d' as well as 'A'..'D'; answer keys are upper-case
+    selected_answer = selected_answer.upper() if selected_answer else None
+    # Shuffled papers are answered by displayed letter; the bank's letter is stored
+    return to_original(seed, question_id, selected_answer) if seed is not None else selected_answer
+
+def _option_seed(test_id: int, student_id: int, shuffle_options: bool) -> Optional[int]:
+    return attempt_seed(test_id, student_id) if shuffle_options else None
+
+def _get_open_attempt(db: Session, submission_id: int, current_user: Principal) -> Submission:
+    submission = db.query(Submission).filter(Submission.id == submission_id).first()
+    if not submission or submission.student_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Submission not found")
+    
+    if submission.submitted_at:
+        raise HTTPException(status_code=400, detail="Already submitted this test")
+    
+    # Past the grace period the deadline scheduler owns the attempt
+    test = db.query(Test.duration_minutes, Test.end_time).filter(Test.id == submission.test_id).first()
+    if submission.started_at and test:
+        deadline = attempt_deadline(submission.started_at, test.duration_minutes, test.end_time)
+        if datetime.utcnow() > deadline + deadline_scheduler.grace:
+            raise HTTPException(status_code=400, detail="Time is up for this test")
+    
+    return submission
+
+def _as_seen_by_student(db: Session, submission: Submission):
+    """A student's own submission, with answers in the lettering of their shuffled paper"""
+    paper = paper_cache.get(db, submission.test_id)
+    if not (paper and paper.shuffle_options and submission.answers):
+        return submission
+    seed = attempt_seed(submission.test_id, submission.student_id)
+    response = SubmissionResponse.model_validate(submission)
+    for answer in response.answers:
+        answer.selected_answer = to_displayed(seed, answer.question_id, answer.selected_answer)
+    return response
+
+def _answers_loader(include_answers: bool):
+    """Load every listed submission's answers in one extra IN query, or skip them"""
+    return selectinload(Submission.answers) if include_answers else noload(Submission.answers)
+
+def _finalize_submission(db: Session, submission: Submission):
+    """Score the answers saved against an attempt and close it"""
+    # Close the attempt with a conditional UPDATE so that of two racing
+    # finalizes only one goes on to be counted in the rollups
+    closed = db.query(Submission).filter(
+        Submission.id == submission.id,
+        Submission.submitted_at.is_(None)
+    ).update({Submission.submitted_at: datetime.utcnow()}, synchronize_session=False)
+    if not closed:
+        raise HTTPException(status_code=400, detail="Already submitted this test")
+    
+    answer_key = answer_key_cache.get(db, submission.test_id)
+    answers = db.query(SubmissionAnswer).filter(
+        SubmissionAnswer.submission_id == submission.id
+    ).all()
+    
+    for answer in answers:
+        answer.is_correct = mark_answer(answer_key, answer.question_id, answer.selected_answer)
+    
+    apply_score(submission, question_count(db, submission.test_id), [a.is_correct for a in answers])
+    record_submission(
+        db, submission, [(a.question_id, a.selected_answer, a.is_correct) for a in answers],
+        student_questions(db, submission.test_id, submission.student_id)
+    )
+
+@router.post("/start", response_model=SubmissionResponse)
+def start_submission(
+    attempt: SubmissionStart,
+    current_user: Principal = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    test = db.query(Test).filter(Test.id == attempt.test_id).first()
+    if not test:
+        raise HTTPException(status_code=404, detail="Test not found")
+    
+    if not test.is_live:
+        raise HTTPException(status_code=400, detail="Test is not live")
+    
+    if test.end_time and datetime.utcnow() >= test.end_time:
+        raise HTTPException(status_code=400, detail="Test has ended")
+    
+    existing_submission = db.query(Submission).filter(
+        Submission.test_id == attempt.test_id,
+        Submission.student_id == current_user.id
+    ).first()
+    
+    if existing_submission:
+        if existing_submission.submitted_at:
+            raise HTTPException(status_code=400, detail="Already submitted this test")
+        # Resuming after a reload keeps the original start time and answers
+        return _as_seen_by_student(db, existing_submission)
+    
+    total_questions = question_count(db, attempt.test_id)
+    db_submission = Submission(
+        test_id=attempt.test_id,
+        student_id=current_user.id,
+        started_at=datetime.utcnow(),
+        total_questions=total_questions,
+        attempted_questions=0
+    )
+    db.add(db_submission)
+    record_attempt(db, attempt.test_id)
+    try:
+        db.commit()
+    except IntegrityError:
+        # A concurrent start (double click, second tab) won the unique
+        # (test_id, student_id) index; resume that attempt instead
+        db.rollback()
+        db_submission = db.query(Submission).filter(
+            Submission.test_id == attempt.test_id,
+            Submission.student_id == current_user.id
+        ).first()
+        if not db_submission:
+            # The winning attempt was removed before it could be read back
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Could not start the test, please retry")
+        if db_submission.submitted_at:
+            raise HTTPException(status_code=400, detail="Already submitted this test")
+        return _as_seen_by_student(db, db_submission)
+    db.refresh(db_submission)
+    
+    deadline_scheduler.schedule(
+        db_submission.id, attempt_deadline(db_submission.started_at, test.duration_minutes, test.end_time)
+    )
+    publish_progress(db, db_submission)
+    return _as_seen_by_student(db, db_submission)
+
+@router.patch("/{submission_id}/answers", response_model=SubmissionAnswerResponse)
+def save_answer(
+    submission_id: int,
+    answer: SubmissionAnswerCreate,
+    current_user: Principal = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Upsert a single answer while the attempt is open (autosave)"""
+    submission = _get_open_attempt(db, submission_id, current_user)
+    
+    if answer.question_id not in student_questions(db, submission.test_id, current_user.id):
+        raise HTTPException(status_code=400, detail="Question is not part of this test")
+    
+    paper = paper_cache.get(db, submission.test_id)
+    seed = _option_seed(submission.test_id, current_user.id, bool(paper and paper.shuffle_options))
+    
+    db_answer = db.query(SubmissionAnswer).filter(
+        SubmissionAnswer.submission_id == submission_id,
+        SubmissionAnswer.question_id == answer.question_id
+    ).first()
+    if not db_answer:
+        db_answer = SubmissionAnswer(submission_id=submission_id, question_id=answer.question_id)
+        db.add(db_answer)
+    
+    db_answer.selected_answer = _normalize_answer(answer.selected_answer, answer.question_id, seed)
+    db_answer.answered_at = datetime.utcnow()
+    
+    db.commit()
+    db.refresh(db_answer)
+    
+    publish_progress(db, submission)
+    if seed is None:
+        return db_answer
+    # Echo the answer back in the student's own lettering
+    response = SubmissionAnswerResponse.model_validate(db_answer)
+    response.selected_answer = to_displayed(seed, answer.question_id, db_answer.selected_answer)
+    return response
+
+@router.post("/{submission_id}/finalize", response_model=SubmissionResponse)
+def finalize_submission(
+    submission_id: int,
+    current_user: Principal = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Score the autosaved answers and close the attempt"""
+    submission = _get_open_attempt(db, submission_id, current_user)
+    
+    _finalize_submission(db, submission)
+    db.commit()
+    db.refresh(submission)
+    
+    publish_progress(db, submission)
+    return _as_seen_by_student(db, submission)
+
 @router.post("/", response_model=SubmissionResponse)
-async def create_submission(
+def create_submission(
     submission: SubmissionCreate,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     # Verify test exists and is live
@@ -26,6 +219,8 @@ async def create_submission(
     if not test.is_live:
         raise HTTPException(status_code=400, detail="Test is not live")
     
+    seed = _option_seed(submission.test_id, current_user.id, test.shuffle_options)
+    
     # Check if student already has a submission for this test
     existing_submission = db.query(Submission).filter(
         Submission.test_id == submission.test_id,
@@ -33,80 +228,147 @@ async def create_submission(
     ).first()
     
     if existing_submission:
-        raise HTTPException(status_code=400, detail="Already submitted this test")
+        if existing_submission.submitted_at:
+            raise HTTPException(status_code=400, detail="Already submitted this test")
+        
+        # Full answer sheet posted over an autosaved attempt: merge, then score
+        saved_answers = {
+            a.question_id: a for a in db.query(SubmissionAnswer).filter(
+                SubmissionAnswer.submission_id == existing_submission.id
+            ).all()
+        }
+        on_paper = student_questions(db, submission.test_id, current_user.id)
+        for answer_data in submission.answers:
+            if answer_data.question_id not in on_paper:
+                continue
+            db_answer = saved_answers.get(answer_data.question_id)
+            if not db_answer:
+                db_answer = SubmissionAnswer(
+                    submission_id=existing_submission.id,
+                    question_id=answer_data.question_id
+                )
+                db.add(db_answer)
+            db_answer.selected_answer = _normalize_answer(answer_data.selected_answer, answer_data.question_id, seed)
+            db_answer.answered_at = datetime.utcnow()
+        
+        db.flush()
+        _finalize_submission(db, existing_submission)
+        db.commit()
+        db.refresh(existing_submission)
+        
+        publish_progress(db, existing_submission)
+        return _as_seen_by_student(db, existing_submission)
+    
+    # Score in a single pass against the test's answer key
+    answer_key = answer_key_cache.get(db, submission.test_id)
+    on_paper = student_questions(db, submission.test_id, current_user.id)
+    selected_answers = {
+        a.question_id: _normalize_answer(a.selected_answer, a.question_id, seed)
+        for a in submission.answers
+        if a.question_id in on_paper
+    }
+    
+    now = datetime.utcnow()
+    answer_rows = [
+        {
+            "question_id": question_id,
+            "selected_answer": selected_answer,
+            "is_correct": mark_answer(answer_key, question_id, selected_answer),
+            "answered_at": now
+        }
+        for question_id, selected_answer in selected_answers.items()
+    ]
     
-    # Create submission
     db_submission = Submission(
         test_id=submission.test_id,
         student_id=current_user.id,
-        started_at=datetime.utcnow(),
-        submitted_at=datetime.utcnow(),
-        total_questions=len(submission.answers)
+        started_at=now
     )
+    apply_score(db_submission, question_count(db, submission.test_id), [row["is_correct"] for row in answer_rows])
     db.add(db_submission)
-    db.commit()
-    db.refresh(db_submission)
+    db.flush()
     
-    # Calculate score and create answers
-    correct_count = 0
-    attempted_count = 0
+    # One bulk INSERT for every answer, committed with the submission
+    if answer_rows:
+        for row in answer_rows:
+            row["submission_id"] = db_submission.id
+        db.execute(insert(SubmissionAnswer), answer_rows)
     
-    for answer_data in submission.answers:
-        question = db.query(Question).filter(Question.id == answer_data.question_id).first()
-        if not question:
-            continue
-        
-        is_correct = None
-        if answer_data.selected_answer:
-            attempted_count += 1
-            is_correct = "true" if answer_data.selected_answer == question.correct_answer else "false"
-            if is_correct == "true":
-                correct_count += 1
-        
-        db_answer = SubmissionAnswer(
-            submission_id=db_submission.id,
-            question_id=answer_data.question_id,
-            selected_answer=answer_data.selected_answer,
-            is_correct=is_correct,
-            answered_at=datetime.utcnow()
-        )
-        db.add(db_answer)
-    
-    # Update submission with score
-    db_submission.score = (correct_count / len(submission.answers)) * 100 if submission.answers else 0
-    db_submission.attempted_questions = attempted_count
+    # Analytics rollups are updated in the same transaction as the answers
+    record_attempt(db, submission.test_id)
+    record_submission(db, db_submission, [
+        (row["question_id"], row["selected_answer"], row["is_correct"]) for row in answer_rows
+    ], on_paper)
     
     db.commit()
     db.refresh(db_submission)
     
-    return db_submission
+    publish_progress(db, db_submission)
+    return _as_seen_by_student(db, db_submission)
 
 @router.get("/my-submissions", response_model=List[SubmissionResponse])
-async def read_my_submissions(
-    current_user: User = Depends(get_current_active_user),
+def read_my_submissions(
+    include_answers: bool = True,
+    current_user: Principal = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    submissions = db.query(Submission).filter(Submission.student_id == current_user.id).all()
-    return submissions
+    """The caller's submissions; include_answers=false leaves answers empty for summary views"""
+    submissions = db.query(Submission).options(
+        _answers_loader(include_answers)
+    ).filter(Submission.student_id == current_user.id).all()
+    return [_as_seen_by_student(db, submission) for submission in submissions]
 
 @router.get("/test/{test_id}", response_model=List[SubmissionResponse])
-async def read_test_submissions(
+def read_test_submissions(
     test_id: int,
-    current_user: User = Depends(require_admin_or_teacher),
+    include_answers: bool = True,
+    current_user: Principal = Depends(require_admin_or_teacher),
     db: Session = Depends(get_db)
 ):
+    """Every submission for a test; include_answers=false leaves answers empty for summary views"""
     # Verify test exists and user has access
     test = db.query(Test).filter(Test.id == test_id).first()
     if not test:
         raise HTTPException(status_code=404, detail="Test not found")
     
-    submissions = db.query(Submission).filter(Submission.test_id == test_id).all()
+    submissions = db.query(Submission).options(
+        _answers_loader(include_answers)
+    ).filter(Submission.test_id == test_id).all()
     return submissions
 
+@router.get("/test/{test_id}/export")
+def export_test_submissions(
+    test_id: int,
+    format: str = "csv",
+    wide: bool = False,
+    current_user: Principal = Depends(require_admin_or_teacher),
+    db: Session = Depends(get_db)
+):
+    """Stream a test's results as CSV, NDJSON or Parquet.
+
+    The default layout has one row per answer; wide=true gives one row per
+    submission with a column per question.
+    """
+    if format not in EXPORT_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail="Unsupported export format")
+    
+    if format == "parquet" and not parquet_available():
+        raise HTTPException(status_code=501, detail="Parquet export is not available on this server")
+    
+    test = db.query(Test).filter(Test.id == test_id).first()
+    if not test:
+        raise HTTPException(status_code=404, detail="Test not found")
+    
+    return StreamingResponse(
+        stream_export(test_id, load_question_ids(db, test_id), format, wide),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="test_{test_id}_results.{format}"'}
+    )
+
 @router.get("/{submission_id}", response_model=SubmissionResponse)
-async def read_submission(
+def read_submission(
     submission_id: int,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     submission = db.query(Submission).filter(Submission.id == submission_id).first()
@@ -117,4 +379,6 @@ async def read_submission(
     if current_user.role == UserRole.STUDENT and submission.student_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to view this submission")
     
+    if submission.student_id == current_user.id:
+        return _as_seen_by_student(db, submission)
     return submission
@@ -1,22 +1,46 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime
 from app.core.database import get_db
-from app.models.user import User, UserRole
-from app.models.test import Test, TestQuestion
+from app.models.user import UserRole
+from app.models.test import Test, TestClass, TestQuestion
 from app.models.question import Question
 from app.schemas.test import TestCreate, TestUpdate, TestResponse, TestWithQuestions
+from app.utils.analytics import delete_rollups
+from app.utils.blueprints import sample_blueprint
+from app.utils.cache import Principal, invalidate_test, paper_cache, warm_test
+from app.utils.deadlines import deadline_scheduler
+from app.utils.windows import test_scheduler
+from app.utils.pagination import paginate, page_response, parse_fields
+from app.utils.shuffle import student_paper
 from app.api.dependencies import get_current_active_user, require_admin_or_teacher
 
 router = APIRouter()
 
+def _assemble(db: Session, blueprint) -> List[int]:
+    """Draw a blueprint's questions from the bank, or explain which sections fall short"""
+    question_ids, shortfalls = sample_blueprint(db, [section.model_dump() for section in blueprint])
+    if shortfalls:
+        raise HTTPException(status_code=400, detail="Not enough questions for: " + "; ".join(
+            f"{s['topic']} ({s['difficulty_level']}) needs {s['pool'] or s['count']}, has {s['available']}"
+            for s in shortfalls
+        ))
+    return question_ids
+
+def _check_window(start_time: Optional[datetime], end_time: Optional[datetime]):
+    if start_time and end_time and end_time <= start_time:
+        raise HTTPException(status_code=400, detail="end_time must be after start_time")
+
 @router.get("/", response_model=List[TestResponse])
-async def read_tests(
-    skip: int = 0,
-    limit: int = 100,
+def read_tests(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    fields: Optional[str] = None,
     is_live: Optional[bool] = None,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     query = db.query(Test)
@@ -24,36 +48,51 @@ async def read_tests(
     # Students can only see tests assigned to their class
     if current_user.role == UserRole.STUDENT:
         if current_user.class_name:
-            query = query.filter(Test.assigned_classes.contains(current_user.class_name))
+            # Exact match through the indexed join table; a substring match
+            # on the old CSV column let "Class A" see "Class AB" tests
+            query = query.join(TestClass).filter(TestClass.class_name == current_user.class_name)
         else:
-            query = query.filter(Test.assigned_classes.is_(None))
+            query = query.filter(~Test.classes.any())
     
     # Teachers and admins can see all tests
     if is_live is not None:
         query = query.filter(Test.is_live == is_live)
     
-    tests = query.offset(skip).limit(limit).all()
-    return tests
+    page = paginate(db, query, Test, cursor, limit, parse_fields(fields, TestResponse))
+    return page_response(response, page)
 
 @router.post("/", response_model=TestResponse)
-async def create_test(
+def create_test(
     test: TestCreate,
-    current_user: User = Depends(require_admin_or_teacher),
+    current_user: Principal = Depends(require_admin_or_teacher),
     db: Session = Depends(get_db)
 ):
-    # Verify all questions exist
-    questions = db.query(Question).filter(Question.id.in_(test.question_ids)).all()
-    if len(questions) != len(test.question_ids):
-        raise HTTPException(
-            status_code=400,
-            detail="Some questions not found"
-        )
+    _check_window(test.start_time, test.end_time)
+    
+    if test.blueprint:
+        if test.question_ids:
+            raise HTTPException(status_code=400, detail="Give either question_ids or a blueprint, not both")
+        question_ids = _assemble(db, test.blueprint)
+    else:
+        # Verify all questions exist
+        question_ids = test.question_ids
+        found = db.query(func.count(Question.id)).filter(Question.id.in_(question_ids)).scalar()
+        if found != len(question_ids):
+            raise HTTPException(
+                status_code=400,
+                detail="Some questions not found"
+            )
     
     db_test = Test(
         name=test.name,
         description=test.description,
         duration_minutes=test.duration_minutes,
         assigned_classes=test.assigned_classes,
+        start_time=test.start_time,
+        end_time=test.end_time,
+        shuffle_questions=test.shuffle_questions,
+        shuffle_options=test.shuffle_options,
+        blueprint=[section.model_dump() for section in test.blueprint] if test.blueprint else None,
         created_by=current_user.id
     )
     db.add(db_test)
@@ -61,7 +100,7 @@ async def create_test(
     db.refresh(db_test)
     
     # Add questions to test
-    for i, question_id in enumerate(test.question_ids):
+    for i, question_id in enumerate(question_ids):
         test_question = TestQuestion(
             test_id=db_test.id,
             question_id=question_id,
@@ -70,24 +109,47 @@ async def create_test(
         db.add(test_question)
     
     db.commit()
+    if db_test.start_time or db_test.end_time:
+        test_scheduler.schedule_test(db_test.id, db_test.start_time, db_test.end_time, db_test.is_live)
     return db_test
 
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in [tag[2:] if tag.startswith("W/") else tag for tag in candidates]
+
+def _read_test_paper(test_id: int, current_user: Principal, request: Request, db: Session) -> Response:
+    """Serve the pre-serialized, answer-free paper, shuffled per student if the test asks for it"""
+    paper = paper_cache.get(db, test_id)
+    if not paper:
+        raise HTTPException(status_code=404, detail="Test not found")
+    
+    # Check if student has access to this test
+    if current_user.class_name and paper.class_names:
+        if current_user.class_name not in paper.class_names:
+            raise HTTPException(status_code=403, detail="Not authorized to access this test")
+    
+    body, etag = student_paper(paper, test_id, current_user.id)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
 @router.get("/{test_id}", response_model=TestWithQuestions)
-async def read_test(
+def read_test(
     test_id: int,
-    current_user: User = Depends(get_current_active_user),
+    request: Request,
+    current_user: Principal = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
+    if current_user.role == UserRole.STUDENT:
+        return _read_test_paper(test_id, current_user, request, db)
+    
     test = db.query(Test).filter(Test.id == test_id).first()
     if not test:
         raise HTTPException(status_code=404, detail="Test not found")
     
-    # Check if student has access to this test
-    if current_user.role == UserRole.STUDENT:
-        if current_user.class_name and test.assigned_classes:
-            if current_user.class_name not in test.assigned_classes.split(','):
-                raise HTTPException(status_code=403, detail="Not authorized to access this test")
-    
     # Get questions for this test
     test_questions = db.query(TestQuestion).filter(TestQuestion.test_id == test_id).order_by(TestQuestion.order).all()
     question_ids = [tq.question_id for tq in test_questions]
@@ -97,16 +159,17 @@ async def read_test(
     question_dict = {q.id: q for q in questions}
     ordered_questions = [question_dict[qid] for qid in question_ids]
     
+    # assigned_classes is a property, so it is not in the instance __dict__
     return TestWithQuestions(
-        **test.__dict__,
+        **TestResponse.model_validate(test).model_dump(),
         questions=ordered_questions
     )
 
 @router.put("/{test_id}", response_model=TestResponse)
-async def update_test(
+def update_test(
     test_id: int,
     test_update: TestUpdate,
-    current_user: User = Depends(require_admin_or_teacher),
+    current_user: Principal = Depends(require_admin_or_teacher),
     db: Session = Depends(get_db)
 ):
     db_test = db.query(Test).filter(Test.id == test_id).first()
@@ -114,6 +177,19 @@ async def update_test(
         raise HTTPException(status_code=404, detail="Test not found")
     
     update_data = test_update.dict(exclude_unset=True)
+    _check_window(
+        update_data.get("start_time", db_test.start_time),
+        update_data.get("end_time", db_test.end_time)
+    )
+    
+    if update_data.get("blueprint"):
+        if update_data.get("question_ids"):
+            raise HTTPException(status_code=400, detail="Give either question_ids or a blueprint, not both")
+        # Redraw the questions; the blueprint is stored as sent
+        update_data["question_ids"] = _assemble(db, test_update.blueprint)
+    elif "question_ids" in update_data:
+        # An explicit list replaces any blueprint
+        update_data["blueprint"] = None
     
     # Handle question updates
     if "question_ids" in update_data:
@@ -135,19 +211,31 @@ async def update_test(
         setattr(db_test, field, value)
     
     db.commit()
+    invalidate_test(test_id)
+    if "duration_minutes" in update_data or "end_time" in update_data:
+        # Attempts already under way get their new deadline
+        deadline_scheduler.reschedule_test(test_id)
+    if "start_time" in update_data or "end_time" in update_data:
+        test_scheduler.schedule_test(test_id, db_test.start_time, db_test.end_time, db_test.is_live)
+    if db_test.is_live:
+        # Build the paper and answer key before the first student arrives
+        warm_test(db, test_id)
+    
     db.refresh(db_test)
     return db_test
 
 @router.delete("/{test_id}")
-async def delete_test(
+def delete_test(
     test_id: int,
-    current_user: User = Depends(require_admin_or_teacher),
+    current_user: Principal = Depends(require_admin_or_teacher),
     db: Session = Depends(get_db)
 ):
     db_test = db.query(Test).filter(Test.id == test_id).first()
     if not db_test:
         raise HTTPException(status_code=404, detail="Test not found")
     
+    delete_rollups(db, test_id)
     db.delete(db_test)
     db.commit()
+    invalidate_test(test_id)
     return {"message": "Test deleted successfully"}
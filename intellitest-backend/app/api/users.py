@@ -1,32 +1,42 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, File, Form, HTTPException, Query, Response, UploadFile, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.core.database import get_db
 from app.core.security import get_password_hash
+from app.models.job import ImportJob
 from app.models.user import User, UserRole
+from app.schemas.job import ImportJobResponse
 from app.schemas.user import UserCreate, UserUpdate, UserResponse
+from app.utils.cache import Principal, principal_cache
+from app.utils.imports import create_job, import_format, run_import, save_upload
+from app.utils.pagination import paginate, page_response, parse_fields
 from app.api.dependencies import get_current_active_user, require_role
 
 router = APIRouter()
 
 @router.get("/me", response_model=UserResponse)
-async def read_users_me(current_user: User = Depends(get_current_active_user)):
-    return current_user
+def read_users_me(
+    current_user: Principal = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    return db.query(User).filter(User.id == current_user.id).first()
 
 @router.get("/", response_model=List[UserResponse])
-async def read_users(
-    skip: int = 0,
-    limit: int = 100,
-    current_user: User = Depends(require_role(UserRole.ADMIN)),
+def read_users(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    fields: Optional[str] = None,
+    current_user: Principal = Depends(require_role(UserRole.ADMIN)),
     db: Session = Depends(get_db)
 ):
-    users = db.query(User).offset(skip).limit(limit).all()
-    return users
+    page = paginate(db, db.query(User), User, cursor, limit, parse_fields(fields, UserResponse))
+    return page_response(response, page)
 
 @router.post("/", response_model=UserResponse)
-async def create_user(
+def create_user(
     user: UserCreate,
-    current_user: User = Depends(require_role(UserRole.ADMIN)),
+    current_user: Principal = Depends(require_role(UserRole.ADMIN)),
     db: Session = Depends(get_db)
 ):
     # Check if username already exists
@@ -45,6 +55,7 @@ async def create_user(
             detail="Email already registered"
         )
     
+    # The handler already runs on a threadpool worker; the hash pool is kept for sign-ins
     hashed_password = get_password_hash(user.password)
     db_user = User(
         username=user.username,
@@ -60,11 +71,54 @@ async def create_user(
     db.refresh(db_user)
     return db_user
 
+@router.post("/bulk", response_model=ImportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+def bulk_import_users(
+    background_tasks: BackgroundTasks,
+    response: Response,
+    file: UploadFile = File(...),
+    default_password: Optional[str] = Form(None),
+    format: Optional[str] = None,
+    background: bool = True,
+    current_user: Principal = Depends(require_role(UserRole.ADMIN)),
+    db: Session = Depends(get_db)
+):
+    """Create accounts from a CSV or JSONL roster of username, email and class.
+
+    Rows without a password column get default_password. Rows whose username
+    or email is already registered, or repeated within the file, are skipped
+    and reported. Poll GET /bulk/{job_id} for progress unless background=false.
+    """
+    format = import_format(file.filename, format)
+    path = save_upload(file)
+    job = create_job(db, "users", file.filename, current_user.id)
+    
+    if background:
+        background_tasks.add_task(
+            run_import, job.id, path, format, current_user.id, default_password=default_password
+        )
+        return job
+    
+    run_import(job.id, path, format, current_user.id, default_password=default_password)
+    db.refresh(job)
+    response.status_code = status.HTTP_200_OK
+    return job
+
+@router.get("/bulk/{job_id}", response_model=ImportJobResponse)
+def read_import_job(
+    job_id: int,
+    current_user: Principal = Depends(require_role(UserRole.ADMIN)),
+    db: Session = Depends(get_db)
+):
+    job = db.query(ImportJob).filter(ImportJob.id == job_id, ImportJob.kind == "users").first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job
+
 @router.put("/{user_id}", response_model=UserResponse)
-async def update_user(
+def update_user(
     user_id: int,
     user_update: UserUpdate,
-    current_user: User = Depends(require_role(UserRole.ADMIN)),
+    current_user: Principal = Depends(require_role(UserRole.ADMIN)),
     db: Session = Depends(get_db)
 ):
     db_user = db.query(User).filter(User.id == user_id).first()
@@ -79,13 +133,14 @@ async def update_user(
         setattr(db_user, field, value)
     
     db.commit()
+    principal_cache.invalidate(user_id)
     db.refresh(db_user)
     return db_user
 
 @router.delete("/{user_id}")
-async def delete_user(
+def delete_user(
     user_id: int,
-    current_user: User = Depends(require_role(UserRole.ADMIN)),
+    current_user: Principal = Depends(require_role(UserRole.ADMIN)),
     db: Session = Depends(get_db)
 ):
     db_user = db.query(User).filter(User.id == user_id).first()
@@ -94,4 +149,5 @@ async def delete_user(
     
     db.delete(db_user)
     db.commit()
+    principal_cache.invalidate(user_id)
     return {"message": "User deleted successfully"}
@@ -3,9 +3,24 @@ from typing import Optional
 
 class Settings(BaseSettings):
     database_url: str = "sqlite:///./intellitest.db"
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout: int = 30
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    sqlite_busy_timeout_ms: int = 5000
     secret_key: str = "your-secret-key-change-this-in-production"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
+    threadpool_size: int = 40
+    password_hash_workers: int = 4
+    password_hash_queue_size: int = 64
+    bulk_hash_processes: Optional[int] = None  # one per CPU
+    test_cache_ttl_seconds: int = 300
+    principal_cache_ttl_seconds: int = 60
+    auto_submit_grace_seconds: int = 30
+    auto_submit_batch_size: int = 200
+    test_prewarm_seconds: int = 120
     
     class Config:
         env_file = ".env"
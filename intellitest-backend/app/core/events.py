@@ -0,0 +1,68 @@
+import asyncio
+import json
+import threading
+from typing import Any, Dict, List, Set, Tuple
+from fastapi.encoders import jsonable_encoder
+
+RESYNC_MESSAGE = json.dumps({"type": "resync"})
+
+class ProgressHub:
+    """In-process pub/sub fanning live monitoring events out to watchers.
+
+    Each published event is encoded once and handed to every subscriber
+    queue, so N teachers watching the same test cost a single computation.
+    Publishing is thread-safe and may be called from threadpool handlers.
+    """
+
+    def __init__(self, queue_size: int = 256):
+        self.queue_size = queue_size
+        self._subscribers: Dict[int, Set[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, test_id: int) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._subscribers.setdefault(test_id, set()).add((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, test_id: int, queue: asyncio.Queue):
+        with self._lock:
+            subscribers = self._subscribers.get(test_id, set())
+            subscribers.difference_update({s for s in subscribers if s[1] is queue})
+            if not subscribers:
+                self._subscribers.pop(test_id, None)
+
+    def has_subscribers(self, test_id: int) -> bool:
+        with self._lock:
+            return bool(self._subscribers.get(test_id))
+
+    def publish(self, test_id: int, event: Dict[str, Any]):
+        with self._lock:
+            subscribers: List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = list(
+                self._subscribers.get(test_id, ())
+            )
+        if not subscribers:
+            return
+
+        message = json.dumps(jsonable_encoder(event))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(_deliver, queue, message)
+            except RuntimeError:
+                # Subscriber's loop has shut down; it will unsubscribe itself
+                pass
+
+    def stats(self) -> Dict[int, int]:
+        with self._lock:
+            return {test_id: len(subs) for test_id, subs in self._subscribers.items()}
+
+def _deliver(queue: asyncio.Queue, message: str):
+    try:
+        queue.put_nowait(message)
+    except asyncio.QueueFull:
+        # Slow consumer: drop its backlog and tell it to reload a snapshot
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(RESYNC_MESSAGE)
+
+progress_hub = ProgressHub()
@@ -1,5 +1,10 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Callable, Dict, List, Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.core.config import settings
@@ -28,3 +33,98 @@ def verify_token(token: str) -> Optional[dict]:
         return payload
     except JWTError:
         return None
+
+class HashPoolSaturated(Exception):
+    """Raised when the password hashing queue is full"""
+
+class PasswordHasher:
+    """Bounded worker pool for bcrypt so hashing never runs on the event loop.
+
+    At most `workers` hashes run at once and `queue_size` more may wait;
+    beyond that submissions are rejected so callers can answer 429 rather
+    than let logins pile up behind a slow queue.
+    """
+
+    def __init__(self, workers: int, queue_size: int):
+        self.workers = workers
+        self.max_pending = workers + queue_size
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.peak_pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_wait_seconds = 0.0
+
+    def submit(self, fn: Callable[..., Any], *args) -> Future:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise HashPoolSaturated()
+            self._pending += 1
+            self.peak_pending = max(self.peak_pending, self._pending)
+
+        return self._executor.submit(self._run, time.monotonic(), fn, *args)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await asyncio.wrap_future(self.submit(verify_password, plain_password, hashed_password))
+
+    async def hash(self, password: str) -> str:
+        return await asyncio.wrap_future(self.submit(get_password_hash, password))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "pending": self._pending,
+                "queued": max(self._pending - self.workers, 0),
+                "peak_pending": self.peak_pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "avg_wait_ms": round(self.total_wait_seconds / self.completed * 1000, 2) if self.completed else None
+            }
+
+    def _run(self, submitted_at: float, fn: Callable[..., Any], *args) -> Any:
+        waited = time.monotonic() - submitted_at
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self.completed += 1
+                self.total_wait_seconds += waited
+
+password_hasher = PasswordHasher(
+    workers=settings.password_hash_workers,
+    queue_size=settings.password_hash_queue_size
+)
+
+# Passwords handed to each worker process at a time by hash_passwords
+BULK_HASH_BATCH = 8
+
+_bulk_hash_pool: Optional[ProcessPoolExecutor] = None
+_bulk_hash_lock = threading.Lock()
+
+def hash_passwords(passwords: List[str]) -> List[str]:
+    """Hash many passwords at once across worker processes, in order.
+
+    Meant for bulk imports, which would otherwise hold the login pool for
+    minutes. Workers are spawned rather than forked because the server
+    process is multithreaded.
+    """
+    global _bulk_hash_pool
+    with _bulk_hash_lock:
+        if _bulk_hash_pool is None:
+            _bulk_hash_pool = ProcessPoolExecutor(
+                max_workers=settings.bulk_hash_processes,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+    return list(_bulk_hash_pool.map(get_password_hash, passwords, chunksize=BULK_HASH_BATCH))
+
+def shutdown_bulk_hashing():
+    global _bulk_hash_pool
+    with _bulk_hash_lock:
+        if _bulk_hash_pool is not None:
+            _bulk_hash_pool.shutdown()
+            _bulk_hash_pool = None
@@ -1,13 +1,28 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from anyio import to_thread
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from app.api import auth, users, questions, tests, submissions, monitoring
-from app.core.database import engine
-from app.models import Base
+from app.core.config import settings
+from app.core.security import HashPoolSaturated, shutdown_bulk_hashing
+from app.utils.deadlines import deadline_scheduler
+from app.utils.windows import test_scheduler
+from app.utils.pagination import PAGINATION_HEADERS
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Route handlers are sync and run on this pool, so it bounds how many
+    # requests can be inside the database at once
+    to_thread.current_default_thread_limiter().total_tokens = settings.threadpool_size
+    await deadline_scheduler.start()
+    await test_scheduler.start()
+    yield
+    await test_scheduler.stop()
+    await deadline_scheduler.stop()
+    shutdown_bulk_hashing()
 
-app = FastAPI(title="IntelliTest API", version="1.0.0")
+app = FastAPI(title="IntelliTest API", version="1.0.0", lifespan=lifespan)
 
 # Configure CORS
 app.add_middleware(
@@ -22,8 +37,17 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=PAGINATION_HEADERS,
 )
 
+@app.exception_handler(HashPoolSaturated)
+async def hash_pool_saturated_handler(request: Request, exc: HashPoolSaturated):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "Too many concurrent sign-ins, please retry"},
+        headers={"Retry-After": "1"},
+    )
+
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["authentication"])
 app.include_router(users.router, prefix="/api/users", tags=["users"])
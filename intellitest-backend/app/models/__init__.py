@@ -1,7 +1,10 @@
 from app.core.database import Base
 from .user import User
-from .question import Question
-from .test import Test, TestQuestion
+from .question import Question, QuestionFingerprint
+from .test import Test, TestClass, TestQuestion
 from .submission import Submission, SubmissionAnswer
+from .analytics import TestRollup, TestScoreRollup, QuestionRollup
+from .job import ImportJob
 
-__all__ = ["Base", "User", "Question", "Test", "TestQuestion", "Submission", "SubmissionAnswer"]
+__all__ = ["Base", "User", "Question", "Test", "TestClass", "TestQuestion", "Submission", "SubmissionAnswer",
+           "TestRollup", "TestScoreRollup", "QuestionRollup", "ImportJob", "QuestionFingerprint"]
@@ -0,0 +1,41 @@
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey
+from app.core.database import Base
+
+class TestRollup(Base):
+    """Running score totals for a test, maintained as attempts are submitted"""
+    __tablename__ = "test_rollups"
+
+    test_id = Column(Integer, ForeignKey("tests.id"), primary_key=True)
+    attempt_count = Column(Integer, nullable=False, default=0)
+    submission_count = Column(Integer, nullable=False, default=0)
+    score_sum = Column(Float, nullable=False, default=0)
+    score_sq_sum = Column(Float, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=True)
+
+class TestScoreRollup(Base):
+    """Submission count per distinct score; a test has at most questions + 1 rows"""
+    __tablename__ = "test_score_rollups"
+
+    test_id = Column(Integer, ForeignKey("tests.id"), primary_key=True)
+    score = Column(Float, primary_key=True)
+    submission_count = Column(Integer, nullable=False, default=0)
+
+class QuestionRollup(Base):
+    """Answer tallies for one question within one test"""
+    __tablename__ = "question_rollups"
+
+    test_id = Column(Integer, ForeignKey("tests.id"), primary_key=True)
+    question_id = Column(Integer, ForeignKey("questions.id"), primary_key=True)
+    # Scored students who were shown the question; with a blueprint pool
+    # that is fewer than every student who took the test
+    exposed = Column(Integer, nullable=False, default=0)
+    exposed_score_sum = Column(Float, nullable=False, default=0)
+    answered = Column(Integer, nullable=False, default=0)
+    correct = Column(Integer, nullable=False, default=0)
+    option_a = Column(Integer, nullable=False, default=0)
+    option_b = Column(Integer, nullable=False, default=0)
+    option_c = Column(Integer, nullable=False, default=0)
+    option_d = Column(Integer, nullable=False, default=0)
+    # Sum of the test scores of students who got this question right,
+    # which is what the point-biserial discrimination index needs
+    correct_score_sum = Column(Float, nullable=False, default=0)
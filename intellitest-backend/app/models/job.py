@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON
+from app.core.database import Base
+
+class ImportJob(Base):
+    """Progress and error report of a bulk import running in the background"""
+    __tablename__ = "import_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False)  # questions, users
+    status = Column(String, nullable=False, default="pending")  # pending, running, completed, failed
+    filename = Column(String, nullable=True)
+    total_rows = Column(Integer, nullable=False, default=0)
+    processed_rows = Column(Integer, nullable=False, default=0)
+    inserted_rows = Column(Integer, nullable=False, default=0)
+    error_count = Column(Integer, nullable=False, default=0)
+    errors = Column(JSON, nullable=True)  # [{"row": 3, "errors": [...]}], capped
+    message = Column(Text, nullable=True)
+    created_by = Column(Integer, ForeignKey("users.id"))
+    created_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
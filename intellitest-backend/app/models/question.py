@@ -1,9 +1,13 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, BigInteger, String, Text, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
 class Question(Base):
     __tablename__ = "questions"
+    __table_args__ = (
+        # Blueprint sampling seeks within one topic and difficulty by id
+        Index("ix_questions_topic_difficulty_level_id", "topic", "difficulty_level", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     question_text = Column(Text, nullable=False)
@@ -21,3 +25,14 @@ class Question(Base):
     # Relationships
     test_questions = relationship("TestQuestion", back_populates="question")
     submission_answers = relationship("SubmissionAnswer", back_populates="question")
+
+class QuestionFingerprint(Base):
+    """One MinHash LSH band bucket of a question, for near-duplicate lookup"""
+    __tablename__ = "question_fingerprints"
+    __table_args__ = (
+        Index("ix_question_fingerprints_band_bucket", "band", "bucket"),
+    )
+
+    question_id = Column(Integer, ForeignKey("questions.id"), primary_key=True)
+    band = Column(Integer, primary_key=True)
+    bucket = Column(BigInteger, nullable=False)
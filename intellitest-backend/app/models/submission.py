@@ -1,13 +1,22 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float, Index, text
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
 class Submission(Base):
     __tablename__ = "submissions"
+    __table_args__ = (
+        Index("uq_submissions_test_id_student_id", "test_id", "student_id", unique=True),
+        # Only attempts still in progress, which is all the deadline scheduler reads
+        Index(
+            "ix_submissions_open_test_id", "test_id",
+            sqlite_where=text("submitted_at IS NULL"),
+            postgresql_where=text("submitted_at IS NULL")
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     test_id = Column(Integer, ForeignKey("tests.id"))
-    student_id = Column(Integer, ForeignKey("users.id"))
+    student_id = Column(Integer, ForeignKey("users.id"), index=True)
     started_at = Column(DateTime, nullable=True)
     submitted_at = Column(DateTime, nullable=True)
     score = Column(Float, nullable=True)
@@ -22,10 +31,13 @@ class Submission(Base):
 
 class SubmissionAnswer(Base):
     __tablename__ = "submission_answers"
+    __table_args__ = (
+        Index("uq_submission_answers_submission_id_question_id", "submission_id", "question_id", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     submission_id = Column(Integer, ForeignKey("submissions.id"))
-    question_id = Column(Integer, ForeignKey("questions.id"))
+    question_id = Column(Integer, ForeignKey("questions.id"), index=True)
     selected_answer = Column(String, nullable=True)  # 'A', 'B', 'C', 'D', or None
     is_correct = Column(String, nullable=True)  # 'true', 'false', or None
     answered_at = Column(DateTime, nullable=True)
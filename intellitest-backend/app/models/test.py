@@ -1,7 +1,17 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Index, JSON, false
 from sqlalchemy.orm import relationship
+from typing import List, Optional
 from app.core.database import Base
 
+def parse_class_names(assigned_classes: Optional[str]) -> List[str]:
+    """Split a comma-separated class list, dropping blanks and repeats"""
+    names: List[str] = []
+    for name in (assigned_classes or "").split(","):
+        name = name.strip()
+        if name and name not in names:
+            names.append(name)
+    return names
+
 class Test(Base):
     __tablename__ = "tests"
 
@@ -9,24 +19,65 @@ class Test(Base):
     name = Column(String, nullable=False)
     description = Column(Text, nullable=True)
     duration_minutes = Column(Integer, nullable=False)
-    is_live = Column(Boolean, default=False)
-    assigned_classes = Column(String, nullable=True)  # Comma-separated class names
+    is_live = Column(Boolean, default=False, index=True)
     created_by = Column(Integer, ForeignKey("users.id"))
     created_at = Column(DateTime, default=None)
     start_time = Column(DateTime, nullable=True)
     end_time = Column(DateTime, nullable=True)
+    shuffle_questions = Column(Boolean, default=False, nullable=False, server_default=false())
+    shuffle_options = Column(Boolean, default=False, nullable=False, server_default=false())
+    blueprint = Column(JSON, nullable=True)  # [{"topic", "difficulty_level", "count", "pool"}]
     
     # Relationships
     creator = relationship("User", back_populates="created_tests")
     test_questions = relationship("TestQuestion", back_populates="test")
     submissions = relationship("Submission", back_populates="test")
+    classes = relationship(
+        "TestClass",
+        back_populates="test",
+        cascade="all, delete-orphan",
+        order_by="TestClass.id",
+        lazy="selectin"
+    )
+
+    @property
+    def assigned_classes(self) -> Optional[str]:
+        """Comma-separated class names, as the API has always exposed them"""
+        return ",".join(c.class_name for c in self.classes) or None
+
+    @assigned_classes.setter
+    def assigned_classes(self, value: Optional[str]):
+        # Keep rows for classes that stay assigned so the unique
+        # (test_id, class_name) index never sees a delete-then-insert
+        existing = {c.class_name: c for c in self.classes}
+        self.classes = [
+            existing.get(name) or TestClass(class_name=name)
+            for name in parse_class_names(value)
+        ]
+
+class TestClass(Base):
+    __tablename__ = "test_classes"
+    __table_args__ = (
+        Index("uq_test_classes_test_id_class_name", "test_id", "class_name", unique=True),
+        Index("ix_test_classes_class_name_test_id", "class_name", "test_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    test_id = Column(Integer, ForeignKey("tests.id"), nullable=False)
+    class_name = Column(String, nullable=False)
+
+    # Relationships
+    test = relationship("Test", back_populates="classes")
 
 class TestQuestion(Base):
     __tablename__ = "test_questions"
+    __table_args__ = (
+        Index("ix_test_questions_test_id_order", "test_id", "order"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     test_id = Column(Integer, ForeignKey("tests.id"))
-    question_id = Column(Integer, ForeignKey("questions.id"))
+    question_id = Column(Integer, ForeignKey("questions.id"), index=True)
     order = Column(Integer, nullable=False)
     
     # Relationships
@@ -1,11 +1,20 @@
-from .user import UserCreate, UserUpdate, UserResponse, UserLogin
-from .question import QuestionCreate, QuestionUpdate, QuestionResponse
-from .test import TestCreate, TestUpdate, TestResponse, TestWithQuestions
-from .submission import SubmissionCreate, SubmissionResponse, SubmissionAnswerCreate
+from .user import UserCreate, UserUpdate, UserResponse, UserLogin, RosterEntry
+from .question import (
+    QuestionCreate, QuestionUpdate, QuestionResponse, QuestionPublic,
+    QuestionSearchHit, QuestionSearchResults, QuestionDuplicate, QuestionWithDuplicates,
+    DuplicateGroup, DuplicateReport
+)
+from .test import BlueprintSection, TestCreate, TestUpdate, TestResponse, TestWithQuestions, TestPaper
+from .submission import SubmissionStart, SubmissionCreate, SubmissionResponse, SubmissionAnswerCreate, SubmissionAnswerResponse
+from .job import ImportRowError, ImportJobResponse
 
 __all__ = [
-    "UserCreate", "UserUpdate", "UserResponse", "UserLogin",
-    "QuestionCreate", "QuestionUpdate", "QuestionResponse",
-    "TestCreate", "TestUpdate", "TestResponse", "TestWithQuestions",
-    "SubmissionCreate", "SubmissionResponse", "SubmissionAnswerCreate"
+    "UserCreate", "UserUpdate", "UserResponse", "UserLogin", "RosterEntry",
+    "QuestionCreate", "QuestionUpdate", "QuestionResponse", "QuestionPublic",
+    "QuestionSearchHit", "QuestionSearchResults", "QuestionDuplicate", "QuestionWithDuplicates",
+    "DuplicateGroup", "DuplicateReport",
+    "BlueprintSection", "TestCreate", "TestUpdate", "TestResponse", "TestWithQuestions", "TestPaper",
+    "SubmissionStart", "SubmissionCreate", "SubmissionResponse", "SubmissionAnswerCreate",
+    "SubmissionAnswerResponse",
+    "ImportRowError", "ImportJobResponse"
 ]
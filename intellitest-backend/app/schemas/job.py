@@ -0,0 +1,24 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+
+class ImportRowError(BaseModel):
+    row: int
+    errors: List[str]
+
+class ImportJobResponse(BaseModel):
+    id: int
+    kind: str
+    status: str
+    filename: Optional[str] = None
+    total_rows: int
+    processed_rows: int
+    inserted_rows: int
+    error_count: int
+    errors: List[ImportRowError] = []
+    message: Optional[str] = None
+    created_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
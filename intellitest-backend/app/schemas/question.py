@@ -1,7 +1,26 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, field_validator
+from typing import Dict, List, Optional
 from datetime import datetime
 
+ANSWER_OPTIONS = ("A", "B", "C", "D")
+DIFFICULTY_LEVELS = ("easy", "medium", "hard")
+
+def normalize_correct_answer(value: Optional[str]) -> Optional[str]:
+    if value is None:
+        return None
+    value = value.strip().upper()
+    if value not in ANSWER_OPTIONS:
+        raise ValueError("must be one of A, B, C, D")
+    return value
+
+def normalize_difficulty(value: Optional[str]) -> Optional[str]:
+    if value is None:
+        return None
+    value = value.strip().lower()
+    if value not in DIFFICULTY_LEVELS:
+        raise ValueError("must be one of easy, medium, hard")
+    return value
+
 class QuestionBase(BaseModel):
     question_text: str
     option_a: str
@@ -14,7 +33,15 @@ class QuestionBase(BaseModel):
     image_url: Optional[str] = None
 
 class QuestionCreate(QuestionBase):
-    pass
+    @field_validator("correct_answer")
+    @classmethod
+    def validate_correct_answer(cls, value):
+        return normalize_correct_answer(value)
+
+    @field_validator("difficulty_level")
+    @classmethod
+    def validate_difficulty_level(cls, value):
+        return normalize_difficulty(value)
 
 class QuestionUpdate(BaseModel):
     question_text: Optional[str] = None
@@ -27,6 +54,16 @@ class QuestionUpdate(BaseModel):
     difficulty_level: Optional[str] = None
     image_url: Optional[str] = None
 
+    @field_validator("correct_answer")
+    @classmethod
+    def validate_correct_answer(cls, value):
+        return normalize_correct_answer(value)
+
+    @field_validator("difficulty_level")
+    @classmethod
+    def validate_difficulty_level(cls, value):
+        return normalize_difficulty(value)
+
 class QuestionResponse(QuestionBase):
     id: int
     created_by: int
@@ -34,3 +71,44 @@ class QuestionResponse(QuestionBase):
 
     class Config:
         from_attributes = True
+
+class QuestionPublic(BaseModel):
+    """A question as shown to students taking a test, without the answer"""
+    id: int
+    question_text: str
+    option_a: str
+    option_b: str
+    option_c: str
+    option_d: str
+    topic: Optional[str] = None
+    difficulty_level: str = "medium"
+    image_url: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+class QuestionSearchHit(QuestionResponse):
+    score: float
+
+class QuestionSearchResults(BaseModel):
+    total: int
+    results: List[QuestionSearchHit]
+    facets: Dict[str, Dict[str, int]]
+
+class QuestionDuplicate(BaseModel):
+    id: int
+    similarity: float
+
+class QuestionWithDuplicates(QuestionResponse):
+    """A saved question and the existing questions it nearly duplicates"""
+    duplicates: List[QuestionDuplicate] = []
+
+class DuplicateGroup(BaseModel):
+    question_ids: List[int]
+    similarity: float
+    exact: bool
+
+class DuplicateReport(BaseModel):
+    threshold: float
+    total_groups: int
+    groups: List[DuplicateGroup]
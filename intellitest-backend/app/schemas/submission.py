@@ -6,6 +6,9 @@ class SubmissionAnswerCreate(BaseModel):
     question_id: int
     selected_answer: Optional[str] = None
 
+class SubmissionStart(BaseModel):
+    test_id: int
+
 class SubmissionCreate(BaseModel):
     test_id: int
     answers: List[SubmissionAnswerCreate]
@@ -1,16 +1,66 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, field_validator, model_validator
 from typing import List, Optional
-from datetime import datetime
-from app.schemas.question import QuestionResponse
+from datetime import datetime, timezone
+from app.schemas.question import QuestionResponse, QuestionPublic, normalize_difficulty
+
+def to_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Times are stored as naive UTC, like every other timestamp in the database"""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+class BlueprintSection(BaseModel):
+    """Draw `count` questions of a topic and difficulty for each student.
+
+    With `pool`, that many are drawn for the test and every student gets
+    their own `count` of them; otherwise all students share one draw.
+    """
+    topic: str
+    difficulty_level: str
+    count: int = Field(ge=1, le=1000)
+    pool: Optional[int] = Field(None, le=10000)
+
+    @field_validator("difficulty_level")
+    @classmethod
+    def validate_difficulty_level(cls, value):
+        return normalize_difficulty(value)
+
+    @model_validator(mode="after")
+    def validate_pool(self):
+        if self.pool is not None and self.pool < self.count:
+            raise ValueError("pool must be at least count")
+        return self
+
+def check_blueprint(sections: Optional[List[BlueprintSection]]) -> Optional[List[BlueprintSection]]:
+    if sections is not None:
+        keys = [(section.topic, section.difficulty_level) for section in sections]
+        if not keys or len(set(keys)) != len(keys):
+            raise ValueError("must list each topic and difficulty once")
+    return sections
 
 class TestBase(BaseModel):
     name: str
     description: Optional[str] = None
     duration_minutes: int
     assigned_classes: Optional[str] = None
+    shuffle_questions: bool = False
+    shuffle_options: bool = False
 
 class TestCreate(TestBase):
-    question_ids: List[int]
+    question_ids: List[int] = []
+    blueprint: Optional[List[BlueprintSection]] = None
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+
+    @field_validator("start_time", "end_time")
+    @classmethod
+    def validate_times(cls, value):
+        return to_naive_utc(value)
+
+    @field_validator("blueprint")
+    @classmethod
+    def validate_blueprint(cls, value):
+        return check_blueprint(value)
 
 class TestUpdate(BaseModel):
     name: Optional[str] = None
@@ -19,6 +69,21 @@ class TestUpdate(BaseModel):
     is_live: Optional[bool] = None
     assigned_classes: Optional[str] = None
     question_ids: Optional[List[int]] = None
+    blueprint: Optional[List[BlueprintSection]] = None
+    shuffle_questions: Optional[bool] = None
+    shuffle_options: Optional[bool] = None
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+
+    @field_validator("start_time", "end_time")
+    @classmethod
+    def validate_times(cls, value):
+        return to_naive_utc(value)
+
+    @field_validator("blueprint")
+    @classmethod
+    def validate_blueprint(cls, value):
+        return check_blueprint(value)
 
 class TestResponse(TestBase):
     id: int
@@ -27,9 +92,13 @@ class TestResponse(TestBase):
     created_at: Optional[datetime] = None
     start_time: Optional[datetime] = None
     end_time: Optional[datetime] = None
+    blueprint: Optional[List[BlueprintSection]] = None
 
     class Config:
         from_attributes = True
 
 class TestWithQuestions(TestResponse):
     questions: List[QuestionResponse] = []
+
+class TestPaper(TestResponse):
+    questions: List[QuestionPublic] = []
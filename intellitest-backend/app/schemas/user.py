@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import AliasChoices, BaseModel, EmailStr, Field
 from typing import Optional
 from datetime import datetime
 from app.models.user import UserRole
@@ -23,6 +23,16 @@ class UserUpdate(BaseModel):
     school_name: Optional[str] = None
     is_active: Optional[bool] = None
 
+class RosterEntry(BaseModel):
+    """One row of a bulk user import; the class column may be named class"""
+    username: str
+    email: EmailStr
+    class_name: Optional[str] = Field(None, validation_alias=AliasChoices("class_name", "class"))
+    full_name: Optional[str] = None
+    password: Optional[str] = None
+    role: UserRole = UserRole.STUDENT
+    school_name: str = "Demo School"
+
 class UserLogin(BaseModel):
     username: str
     password: str
@@ -0,0 +1,279 @@
+import math
+from datetime import datetime
+from sqlalchemy import delete, func, insert, literal, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from app.models.analytics import TestRollup, TestScoreRollup, QuestionRollup
+from app.models.question import Question
+from app.models.test import Test, TestQuestion
+from app.models.submission import Submission, SubmissionAnswer
+from app.utils.blueprints import student_question_ids
+from app.utils.cache import paper_cache
+from app.utils.shuffle import attempt_seed
+
+OPTIONS = ["A", "B", "C", "D"]
+
+OPTION_COLUMNS = [f"option_{option.lower()}" for option in OPTIONS]
+
+SCORE_RANGES = ["0-20", "21-40", "41-60", "61-80", "81-100"]
+
+PERCENTILE_BUCKETS = 4
+
+# (question_id, selected_answer, is_correct) for one answer on a submission
+AnswerMark = Tuple[int, Optional[str], Optional[str]]
+
+def _ratio(part: int, whole: int) -> Optional[float]:
+    return round(part / whole, 4) if whole else None
+
+def _score_range(score: float) -> str:
+    for upper, label in zip((20, 40, 60, 80), SCORE_RANGES):
+        if score <= upper:
+            return label
+    return SCORE_RANGES[-1]
+
+def _upsert(
+    db: Session,
+    model,
+    keys: Sequence[str],
+    rows: List[Dict[str, Any]],
+    increments: Sequence[str],
+    replacements: Sequence[str] = ()
+):
+    """Insert rollup rows, or add their counts onto the rows already there"""
+    dialect_insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+    stmt = dialect_insert(model)
+    set_ = {column: getattr(model, column) + getattr(stmt.excluded, column) for column in increments}
+    set_.update({column: getattr(stmt.excluded, column) for column in replacements})
+    db.execute(stmt.on_conflict_do_update(index_elements=list(keys), set_=set_), rows)
+
+def record_attempt(db: Session, test_id: int):
+    """Count a newly started attempt, inside the transaction that creates it"""
+    _upsert(db, TestRollup, ["test_id"], [{
+        "test_id": test_id,
+        "attempt_count": 1,
+        "submission_count": 0,
+        "score_sum": 0.0,
+        "score_sq_sum": 0.0,
+        "updated_at": datetime.utcnow()
+    }], ["attempt_count"], ["updated_at"])
+
+def _question_row(test_id: int, question_id: int) -> Dict[str, Any]:
+    row = {
+        "test_id": test_id,
+        "question_id": question_id,
+        "exposed": 0,
+        "exposed_score_sum": 0.0,
+        "answered": 0,
+        "correct": 0,
+        "correct_score_sum": 0.0
+    }
+    row.update({column: 0 for column in OPTION_COLUMNS})
+    return row
+
+def record_submission(db: Session, submission: Submission, marks: Iterable[AnswerMark], shown: Iterable[int]):
+    """Fold a scored submission into the rollups, inside the caller's transaction.
+
+    `shown` is every question on the student's paper, answered or not.
+    """
+    score = submission.score or 0.0
+    _upsert(db, TestRollup, ["test_id"], [{
+        "test_id": submission.test_id,
+        "attempt_count": 0,
+        "submission_count": 1,
+        "score_sum": score,
+        "score_sq_sum": score * score,
+        "updated_at": datetime.utcnow()
+    }], ["submission_count", "score_sum", "score_sq_sum"], ["updated_at"])
+    _upsert(db, TestScoreRollup, ["test_id", "score"], [{
+        "test_id": submission.test_id,
+        "score": score,
+        "submission_count": 1
+    }], ["submission_count"])
+
+    question_rows = {}
+    for question_id in shown:
+        row = question_rows[question_id] = _question_row(submission.test_id, question_id)
+        row["exposed"] = 1
+        row["exposed_score_sum"] = score
+    for question_id, selected_answer, is_correct in marks:
+        row = question_rows.setdefault(question_id, _question_row(submission.test_id, question_id))
+        correct = is_correct == "true"
+        row["answered"] = 1 if selected_answer else 0
+        row["correct"] = 1 if correct else 0
+        row["correct_score_sum"] = score if correct else 0.0
+        for option, column in zip(OPTIONS, OPTION_COLUMNS):
+            row[column] = 1 if selected_answer == option else 0
+
+    if question_rows:
+        # Sorted so concurrent submissions take question row locks in one order
+        _upsert(db, QuestionRollup, ["test_id", "question_id"], [question_rows[key] for key in sorted(question_rows)],
+                ["exposed", "exposed_score_sum", "answered", "correct", "correct_score_sum", *OPTION_COLUMNS])
+
+def delete_rollups(db: Session, test_id: int):
+    for model in (TestRollup, TestScoreRollup, QuestionRollup):
+        db.execute(delete(model).where(model.test_id == test_id))
+
+def rebuild_rollups(db: Session, test_id: int):
+    """Recompute a test's rollups from its submissions with set-based inserts"""
+    delete_rollups(db, test_id)
+
+    scored = (Submission.test_id == test_id) & Submission.submitted_at.isnot(None) & Submission.score.isnot(None)
+    is_correct = SubmissionAnswer.is_correct == "true"
+
+    db.execute(insert(TestRollup).from_select(
+        ["test_id", "attempt_count", "submission_count", "score_sum", "score_sq_sum", "updated_at"],
+        select(
+            literal(test_id),
+            func.count(Submission.id),
+            func.count(Submission.id).filter(scored),
+            func.coalesce(func.sum(Submission.score).filter(scored), 0.0),
+            func.coalesce(func.sum(Submission.score * Submission.score).filter(scored), 0.0),
+            literal(datetime.utcnow())
+        ).where(Submission.test_id == test_id)
+    ))
+    db.execute(insert(TestScoreRollup).from_select(
+        ["test_id", "score", "submission_count"],
+        select(literal(test_id), Submission.score, func.count()).where(scored).group_by(Submission.score)
+    ))
+    db.execute(insert(QuestionRollup).from_select(
+        ["test_id", "question_id", "answered", "correct", "correct_score_sum", *OPTION_COLUMNS],
+        select(
+            literal(test_id),
+            SubmissionAnswer.question_id,
+            func.count(SubmissionAnswer.selected_answer),
+            func.count().filter(is_correct),
+            func.coalesce(func.sum(Submission.score).filter(is_correct), 0.0),
+            *[func.count().filter(SubmissionAnswer.selected_answer == option) for option in OPTIONS]
+        ).join(
+            Submission, Submission.id == SubmissionAnswer.submission_id
+        ).where(scored).group_by(SubmissionAnswer.question_id)
+    ))
+
+    # Exposure is not in the answer rows: unanswered questions have none
+    students = db.query(Submission.student_id, Submission.score).filter(scored).all()
+    paper = paper_cache.get(db, test_id)
+    exposure: Dict[int, List[float]] = {}
+    for student_id, score in students:
+        if paper and paper.sections:
+            shown = student_question_ids(paper.question_ids, paper.sections, attempt_seed(test_id, student_id))
+        else:
+            shown = paper.question_ids if paper else []
+        for question_id in shown:
+            totals = exposure.setdefault(question_id, [0, 0.0])
+            totals[0] += 1
+            totals[1] += score
+    exposure_rows = []
+    for question_id in sorted(exposure):
+        row = _question_row(test_id, question_id)
+        row["exposed"], row["exposed_score_sum"] = exposure[question_id]
+        exposure_rows.append(row)
+    if exposure_rows:
+        _upsert(db, QuestionRollup, ["test_id", "question_id"], exposure_rows, ["exposed", "exposed_score_sum"])
+
+def _percentile_buckets(histogram: List[Tuple[float, int]], scored: int) -> List[Dict[str, Any]]:
+    """Split the score histogram into equal-count buckets the way NTILE does"""
+    width = 100 // PERCENTILE_BUCKETS
+    buckets = []
+    scores = iter(histogram)
+    score, remaining = 0.0, 0
+    for index in range(PERCENTILE_BUCKETS):
+        size = scored // PERCENTILE_BUCKETS + (1 if index < scored % PERCENTILE_BUCKETS else 0)
+        if not size:
+            continue
+        count, total, min_score = 0, 0.0, None
+        while count < size:
+            if not remaining:
+                score, remaining = next(scores)
+            taken = min(remaining, size - count)
+            remaining -= taken
+            count += taken
+            total += score * taken
+            if min_score is None:
+                min_score = score
+        buckets.append({
+            "percentile": f"{index * width}-{(index + 1) * width}",
+            "count": count,
+            "min_score": round(min_score, 2),
+            "max_score": round(score, 2),
+            "average_score": round(total / count, 2)
+        })
+    return buckets
+
+def _discrimination(rollup: QuestionRollup, score_sd: float) -> Optional[float]:
+    """Point-biserial correlation between getting the question right and the test score,
+    among the students who were shown the question"""
+    correct, exposed = rollup.correct, rollup.exposed
+    if not score_sd or not 0 < correct < exposed:
+        return None
+    mean_correct = rollup.correct_score_sum / correct
+    mean_incorrect = (rollup.exposed_score_sum - rollup.correct_score_sum) / (exposed - correct)
+    p = correct / exposed
+    return round((mean_correct - mean_incorrect) / score_sd * math.sqrt(p * (1 - p)), 4)
+
+def analytics_snapshot(db: Session, test: Test) -> Dict[str, Any]:
+    """Score summary and per-question item analysis, read from the rollups"""
+    rollup = db.query(TestRollup).filter(TestRollup.test_id == test.id).first()
+    attempts = rollup.attempt_count if rollup else 0
+    scored = rollup.submission_count if rollup else 0
+    score_sum = rollup.score_sum if rollup else 0.0
+    score_sd = 0.0
+    if scored:
+        mean = score_sum / scored
+        score_sd = math.sqrt(max(rollup.score_sq_sum / scored - mean * mean, 0.0))
+
+    histogram = db.query(TestScoreRollup.score, TestScoreRollup.submission_count).filter(
+        TestScoreRollup.test_id == test.id
+    ).order_by(TestScoreRollup.score).all()
+
+    score_distribution = {label: 0 for label in SCORE_RANGES}
+    for score, count in histogram:
+        score_distribution[_score_range(score)] += count
+
+    rows = db.query(
+        TestQuestion.question_id,
+        Question.topic,
+        Question.difficulty_level,
+        Question.correct_answer,
+        QuestionRollup
+    ).join(
+        Question, Question.id == TestQuestion.question_id
+    ).outerjoin(
+        QuestionRollup,
+        (QuestionRollup.test_id == TestQuestion.test_id) & (QuestionRollup.question_id == TestQuestion.question_id)
+    ).filter(
+        TestQuestion.test_id == test.id
+    ).order_by(TestQuestion.order).all()
+
+    question_analysis = []
+    for question_id, topic, difficulty_level, correct_answer, question_rollup in rows:
+        if question_rollup is None:
+            question_rollup = QuestionRollup(**_question_row(test.id, question_id))
+        # Students who never touched a question have no answer row, so
+        # skips are measured against every scored attempt it was shown in
+        question_analysis.append({
+            "question_id": question_id,
+            "topic": topic,
+            "difficulty_level": difficulty_level,
+            "correct_answer": correct_answer,
+            "answered": question_rollup.answered,
+            "correct": question_rollup.correct,
+            "exposed": question_rollup.exposed,
+            "p_value": _ratio(question_rollup.correct, question_rollup.exposed),
+            "discrimination_index": _discrimination(question_rollup, score_sd),
+            "skip_rate": _ratio(question_rollup.exposed - question_rollup.answered, question_rollup.exposed),
+            "option_distribution": {
+                option: getattr(question_rollup, column) for option, column in zip(OPTIONS, OPTION_COLUMNS)
+            }
+        })
+
+    return {
+        "test_id": test.id,
+        "test_name": test.name,
+        "total_submissions": attempts,
+        "scored_submissions": scored,
+        "average_score": round(score_sum / scored, 2) if scored else 0,
+        "score_distribution": score_distribution,
+        "percentile_buckets": _percentile_buckets(histogram, scored),
+        "question_analysis": question_analysis
+    }
@@ -0,0 +1,104 @@
+import random
+from sqlalchemy import and_, func, select
+from sqlalchemy.orm import Session
+from typing import Any, Collection, Dict, List, Optional, Set, Tuple
+from app.models.question import Question
+
+# Random seeks per query; each is one scalar subquery in a single SELECT
+PROBES_PER_QUERY = 200
+
+# Rounds of seeks before falling back to reading the whole section
+SAMPLE_ROUNDS = 3
+
+def _section(topic: str, difficulty_level: str):
+    return and_(Question.topic == topic, Question.difficulty_level == difficulty_level)
+
+def sample_section(
+    db: Session,
+    topic: str,
+    difficulty_level: str,
+    count: int,
+    rng: random.Random,
+    exclude: Collection[int] = ()
+) -> List[int]:
+    """Up to `count` distinct random ids of questions with the topic and difficulty.
+
+    Each draw picks a random id between the section's lowest and highest
+    and seeks to the first section member at or after it, through the
+    (topic, difficulty_level, id) index, so the cost follows `count` and
+    not the size of the bank. Members after a long gap in the id sequence
+    are somewhat likelier to be drawn. Sections too small or sparse for
+    seeks to fill are read in full and sampled in memory.
+    """
+    section = _section(topic, difficulty_level)
+    # Separate subqueries, so each is a single index seek rather than a range scan
+    low, high = db.execute(select(
+        select(func.min(Question.id)).where(section).scalar_subquery(),
+        select(func.max(Question.id)).where(section).scalar_subquery()
+    )).one()
+    if low is None:
+        return []
+
+    seen: Set[int] = set(exclude)
+    chosen: List[int] = []
+    for _ in range(SAMPLE_ROUNDS):
+        needed = count - len(chosen)
+        if needed <= 0:
+            return chosen
+        # Twice as many seeks as needed, since some land on the same question
+        starts = [rng.randint(low, high) for _ in range(min(needed * 2, PROBES_PER_QUERY))]
+        probes = [
+            select(Question.id).where(section, Question.id >= start).order_by(Question.id).limit(1).scalar_subquery()
+            for start in starts
+        ]
+        for question_id in db.execute(select(*probes)).one():
+            if question_id not in seen and len(chosen) < count:
+                seen.add(question_id)
+                chosen.append(question_id)
+
+    if len(chosen) < count:
+        remaining = [question_id for question_id in db.execute(select(Question.id).where(section)).scalars() if question_id not in seen]
+        chosen += rng.sample(remaining, min(count - len(chosen), len(remaining)))
+    return chosen
+
+def sample_blueprint(
+    db: Session,
+    sections: List[Dict[str, Any]],
+    rng: Optional[random.Random] = None
+) -> Tuple[List[int], List[Dict[str, Any]]]:
+    """Draw each section's pool from the bank.
+
+    Returns the question ids in section order, and the sections that
+    could not be filled, with how many questions were available.
+    """
+    rng = rng or random.Random()
+    question_ids: List[int] = []
+    shortfalls = []
+    for section in sections:
+        size = section["pool"] or section["count"]
+        drawn = sample_section(db, section["topic"], section["difficulty_level"], size, rng)
+        if len(drawn) < size:
+            shortfalls.append({**section, "available": len(drawn)})
+        question_ids += drawn
+    return question_ids, shortfalls
+
+def blueprint_sections(blueprint: Optional[List[Dict[str, Any]]], questions) -> Optional[List[Tuple[List[int], int]]]:
+    """(pool question ids, count) per section, or None when every student gets the whole pool"""
+    if not blueprint or all(not section.get("pool") or section["pool"] <= section["count"] for section in blueprint):
+        return None
+    return [
+        (
+            [q.id for q in questions if q.topic == section["topic"] and q.difficulty_level == section["difficulty_level"]],
+            section["count"]
+        )
+        for section in blueprint
+    ]
+
+def student_question_ids(question_ids: List[int], sections: Optional[List[Tuple[List[int], int]]], seed: int) -> List[int]:
+    """The questions one student is given, in paper order"""
+    if not sections:
+        return question_ids
+    chosen: Set[int] = set()
+    for index, (pool, count) in enumerate(sections):
+        chosen.update(random.Random(f"{seed}:{index}").sample(pool, min(count, len(pool))))
+    return [question_id for question_id in question_ids if question_id in chosen]
@@ -0,0 +1,255 @@
+import hashlib
+import threading
+import time
+from sqlalchemy.orm import Session
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+from app.core.config import settings
+from app.models.question import Question
+from app.models.test import Test, TestQuestion
+from app.models.user import User, UserRole
+from app.schemas.question import QuestionPublic
+from app.schemas.test import TestResponse, TestPaper
+from app.utils.blueprints import blueprint_sections
+
+class Principal(NamedTuple):
+    """The slice of a user that authorization needs"""
+    id: int
+    role: UserRole
+    class_name: Optional[str]
+    is_active: bool
+
+class CachedPaper(NamedTuple):
+    body: bytes
+    etag: str
+    class_names: List[str]
+    question_ids: List[int]
+    # JSON-ready parts of the body, for papers shuffled per student
+    header: Dict[str, Any]
+    questions: List[Dict[str, Any]]
+    shuffle_questions: bool
+    shuffle_options: bool
+    # Blueprint pools each student draws their own questions from
+    sections: Optional[List[Tuple[List[int], int]]]
+    question_count: int
+
+def load_answer_key(db: Session, test_id: int) -> Dict[int, str]:
+    """Correct answers for every question on a test, in one query"""
+    rows = db.query(Question.id, Question.correct_answer).join(
+        TestQuestion, TestQuestion.question_id == Question.id
+    ).filter(TestQuestion.test_id == test_id).all()
+    # Keys saved by older clients may be lower-case; answers are compared upper-case
+    return {question_id: (correct_answer or "").upper() for question_id, correct_answer in rows}
+
+def render_test_paper(db: Session, test_id: int) -> Optional[CachedPaper]:
+    """Serialize a test with its questions in order and the answer key stripped"""
+    test = db.query(Test).filter(Test.id == test_id).first()
+    if not test:
+        return None
+
+    questions = db.query(Question).join(
+        TestQuestion, TestQuestion.question_id == Question.id
+    ).filter(TestQuestion.test_id == test_id).order_by(TestQuestion.order).all()
+
+    paper = TestPaper(
+        **TestResponse.model_validate(test).model_dump(),
+        questions=[QuestionPublic.model_validate(q) for q in questions]
+    )
+    body = paper.model_dump_json().encode()
+    etag = '"%s"' % hashlib.sha256(body).hexdigest()[:32]
+    header = paper.model_dump(mode="json", exclude={"questions"})
+    sections = blueprint_sections(test.blueprint, questions)
+    question_count = sum(min(count, len(pool)) for pool, count in sections) if sections else len(questions)
+    return CachedPaper(
+        body, etag, [c.class_name for c in test.classes], [q.id for q in questions],
+        header, [q.model_dump(mode="json") for q in paper.questions],
+        bool(test.shuffle_questions), bool(test.shuffle_options),
+        sections, question_count
+    )
+
+class TestCache:
+    """Process-local cache of per-test values built from the database.
+
+    Every test carries a version stamp that is bumped on invalidation; a
+    load that raced with an edit is only stored if the stamp it started
+    from is still current. Entries also expire after a TTL, which bounds
+    staleness when several worker processes each hold their own copy.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[Session, int], Any],
+        question_ids: Callable[[Any], Iterable[int]],
+        ttl_seconds: int
+    ):
+        self.loader = loader
+        self.question_ids = question_ids
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[int, Tuple[int, float, Any]] = {}
+        self._versions: Dict[int, int] = {}
+        self._tests_by_question: Dict[int, Set[int]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, db: Session, test_id: int) -> Any:
+        with self._lock:
+            version = self._versions.get(test_id, 0)
+            entry = self._entries.get(test_id)
+            if entry and entry[0] == version and entry[1] > time.monotonic():
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+
+        value = self.loader(db, test_id)
+        self._store(test_id, version, value)
+        return value
+
+    def warm(self, db: Session, test_id: int) -> Any:
+        with self._lock:
+            version = self._versions.get(test_id, 0)
+        value = self.loader(db, test_id)
+        self._store(test_id, version, value)
+        return value
+
+    def invalidate(self, test_id: int):
+        with self._lock:
+            self._versions[test_id] = self._versions.get(test_id, 0) + 1
+            self._drop(test_id)
+            self.invalidations += 1
+
+    def invalidate_question(self, question_id: int):
+        """Drop every cached test that contains the question"""
+        with self._lock:
+            test_ids = list(self._tests_by_question.get(question_id, ()))
+        for test_id in test_ids:
+            self.invalidate(test_id)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "invalidations": self.invalidations,
+                "ttl_seconds": self.ttl_seconds
+            }
+
+    def _store(self, test_id: int, version: int, value: Any):
+        # Missing tests are not cached so a new test id is never shadowed
+        if value is None:
+            return
+        with self._lock:
+            if self._versions.get(test_id, 0) != version:
+                return
+            self._drop(test_id)
+            self._entries[test_id] = (version, time.monotonic() + self.ttl_seconds, value)
+            for question_id in self.question_ids(value):
+                self._tests_by_question.setdefault(question_id, set()).add(test_id)
+
+    def _drop(self, test_id: int):
+        entry = self._entries.pop(test_id, None)
+        if not entry:
+            return
+        for question_id in self.question_ids(entry[2]):
+            test_ids = self._tests_by_question.get(question_id)
+            if test_ids:
+                test_ids.discard(test_id)
+                if not test_ids:
+                    del self._tests_by_question[question_id]
+
+class PrincipalCache:
+    """Short-lived authenticated principals keyed by user id.
+
+    Lets token-authenticated requests skip the per-request User SELECT.
+    Edits through the users API invalidate immediately in this process;
+    the TTL bounds how long other worker processes may lag behind.
+    """
+
+    def __init__(self, ttl_seconds: int, max_entries: int = 50000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: Dict[int, Tuple[float, Principal]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: int) -> Optional[Principal]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry and entry[0] > time.monotonic():
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def put(self, user: User) -> Principal:
+        principal = Principal(user.id, user.role, user.class_name, bool(user.is_active))
+        with self._lock:
+            self._entries.pop(user.id, None)
+            if len(self._entries) >= self.max_entries:
+                # Dicts keep insertion order, so this evicts the oldest entry
+                del self._entries[next(iter(self._entries))]
+            self._entries[user.id] = (time.monotonic() + self.ttl_seconds, principal)
+        return principal
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "ttl_seconds": self.ttl_seconds
+            }
+
+answer_key_cache = TestCache(
+    load_answer_key,
+    lambda answer_key: answer_key.keys(),
+    ttl_seconds=settings.test_cache_ttl_seconds
+)
+paper_cache = TestCache(
+    render_test_paper,
+    lambda paper: paper.question_ids,
+    ttl_seconds=settings.test_cache_ttl_seconds
+)
+principal_cache = PrincipalCache(ttl_seconds=settings.principal_cache_ttl_seconds)
+
+def invalidate_test(test_id: int):
+    answer_key_cache.invalidate(test_id)
+    paper_cache.invalidate(test_id)
+
+def invalidate_question(question_id: int):
+    answer_key_cache.invalidate_question(question_id)
+    paper_cache.invalidate_question(question_id)
+
+def warm_test(db: Session, test_id: int):
+    answer_key_cache.warm(db, test_id)
+    paper_cache.warm(db, test_id)
+
+def warm_roster(db: Session, class_names: List[str]) -> int:
+    """Load the principals of every active student in the classes"""
+    if not class_names:
+        return 0
+    students = db.query(User).filter(
+        User.role == UserRole.STUDENT,
+        User.class_name.in_(class_names),
+        User.is_active.is_(True)
+    ).all()
+    for student in students:
+        principal_cache.put(student)
+    return len(students)
+
+def cache_stats() -> Dict[str, Any]:
+    return {
+        "answer_keys": answer_key_cache.stats(),
+        "test_papers": paper_cache.stats(),
+        "principals": principal_cache.stats()
+    }
@@ -0,0 +1,88 @@
+import logging
+from datetime import datetime, timedelta
+from anyio import to_thread
+from typing import List, Tuple
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.utils.grading import finalize_expired, open_attempt_deadlines
+from app.utils.progress import publish_progress
+from app.utils.timers import TimerHeap
+
+logger = logging.getLogger(__name__)
+
+class DeadlineScheduler(TimerHeap):
+    """Auto-submits attempts when their time runs out.
+
+    Open attempts sit in the heap keyed by deadline and are finalized in
+    batches on the threadpool, so the submissions table is never scanned.
+    Attempts that a student submits themselves are left in the heap and
+    skipped when they come due. The heap lives in memory and is rebuilt
+    from the open attempts when the app starts.
+    """
+
+    def __init__(self, grace_seconds: int, batch_size: int):
+        super().__init__()
+        self.grace = timedelta(seconds=grace_seconds)
+        self.batch_size = batch_size
+        self.auto_submitted = 0
+        self.batches = 0
+
+    def schedule(self, submission_id: int, deadline: datetime):
+        """Track an attempt; safe to call from threadpool handlers"""
+        self.push(deadline + self.grace, submission_id)
+
+    def schedule_many(self, deadlines: List[Tuple[int, datetime]]):
+        for submission_id, deadline in deadlines:
+            self.schedule(submission_id, deadline)
+
+    def rebuild(self):
+        """Load every open attempt, e.g. after a restart"""
+        db = SessionLocal()
+        try:
+            deadlines = open_attempt_deadlines(db)
+        finally:
+            db.close()
+        self.replace((deadline + self.grace, submission_id) for submission_id, deadline in deadlines)
+        logger.info("Deadline scheduler tracking %d open attempts", len(deadlines))
+
+    def reschedule_test(self, test_id: int):
+        """Re-key a test's open attempts after its duration or end time changed.
+
+        Entries with the old deadline stay in the heap; when they come due
+        the attempt's deadline is recomputed, so they are harmless.
+        """
+        db = SessionLocal()
+        try:
+            self.schedule_many(open_attempt_deadlines(db, test_id=test_id))
+        finally:
+            db.close()
+
+    async def dispatch(self, items: List[int], now: datetime):
+        due = sorted(set(items))
+        for start in range(0, len(due), self.batch_size):
+            batch = due[start:start + self.batch_size]
+            try:
+                await to_thread.run_sync(self._finalize_batch, batch, now - self.grace)
+            except Exception:
+                # Put the batch back so a database hiccup only delays it
+                logger.exception("Auto-submit batch failed; retrying in %ss", self.grace.seconds)
+                self.schedule_many([(submission_id, now) for submission_id in batch])
+
+    def _finalize_batch(self, submission_ids: List[int], cutoff: datetime):
+        db = SessionLocal()
+        try:
+            submissions, not_due = finalize_expired(db, submission_ids, cutoff)
+            db.commit()
+            self.schedule_many(not_due)
+            with self._lock:
+                self.auto_submitted += len(submissions)
+                self.batches += 1
+            for submission in submissions:
+                publish_progress(db, submission)
+        finally:
+            db.close()
+
+deadline_scheduler = DeadlineScheduler(
+    grace_seconds=settings.auto_submit_grace_seconds,
+    batch_size=settings.auto_submit_batch_size
+)
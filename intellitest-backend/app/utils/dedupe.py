@@ -0,0 +1,202 @@
+import hashlib
+import re
+import struct
+from collections import Counter
+from itertools import groupby
+from sqlalchemy import and_, delete, func, insert, or_, select
+from sqlalchemy.orm import Session
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from app.models.question import Question, QuestionFingerprint
+
+# Character shingles survive typos and reworded endings better than word
+# shingles on texts as short as a question
+SHINGLE_SIZE = 5
+
+# 16 bands of 4 rows: pairs at 0.8 similarity share a bucket with
+# probability 0.9998, pairs at 0.3 with probability 0.12
+NUM_HASHES = 64
+LSH_BANDS = 16
+ROWS_PER_BAND = NUM_HASHES // LSH_BANDS
+
+DUPLICATE_THRESHOLD = 0.8
+
+# Members of one bucket each paired with at most this many following ids
+BUCKET_PAIR_WINDOW = 64
+
+# At the default threshold or above, the report only compares pairs sharing
+# two buckets; pairs at 0.8 similarity do so with probability 0.997
+MIN_SHARED_BANDS = 2
+
+# Insert-time checks compare at most this many candidates, most shared buckets first
+MAX_CANDIDATES = 200
+
+DOCUMENT_FIELDS = ("question_text", "option_a", "option_b", "option_c", "option_d")
+
+_NON_WORD = re.compile(r"\W+", re.UNICODE)
+
+# One extendable-output digest per shingle yields all of its hash values
+_HASH_VALUES = struct.Struct(f">{NUM_HASHES}I")
+
+def normalize(text: Optional[str]) -> str:
+    return _NON_WORD.sub(" ", (text or "").lower()).strip()
+
+def question_document(question_text: str, options: Sequence[str]) -> str:
+    """Comparable form of a question: case, punctuation and option order are ignored"""
+    return " | ".join([normalize(question_text)] + sorted(normalize(option) for option in options))
+
+def document_of(question) -> str:
+    return question_document(question.question_text, [
+        question.option_a, question.option_b, question.option_c, question.option_d
+    ])
+
+def shingles(document: str) -> Set[str]:
+    if len(document) <= SHINGLE_SIZE:
+        return {document}
+    return {document[i:i + SHINGLE_SIZE] for i in range(len(document) - SHINGLE_SIZE + 1)}
+
+def minhash(shingle_set: Set[str]) -> List[int]:
+    hashed = (_HASH_VALUES.unpack(hashlib.shake_128(shingle.encode()).digest(_HASH_VALUES.size)) for shingle in shingle_set)
+    return [min(values) for values in zip(*hashed)]
+
+def band_buckets(signature: List[int]) -> List[int]:
+    buckets = []
+    for band in range(LSH_BANDS):
+        rows = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        digest = hashlib.blake2b(struct.pack(f">{ROWS_PER_BAND}I", *rows), digest_size=8).digest()
+        # Shifted to fit a signed BIGINT
+        buckets.append(int.from_bytes(digest, "big") >> 1)
+    return buckets
+
+def similarity(a: Set[str], b: Set[str]) -> float:
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared)
+
+def index_questions(db: Session, documents: Iterable[Tuple[int, str]]):
+    """Write the LSH buckets of (question_id, document) pairs, replacing any they had"""
+    documents = list(documents)
+    if not documents:
+        return
+    db.execute(delete(QuestionFingerprint).where(
+        QuestionFingerprint.question_id.in_([question_id for question_id, _ in documents])
+    ))
+    db.execute(insert(QuestionFingerprint), [
+        {"question_id": question_id, "band": band, "bucket": bucket}
+        for question_id, document in documents
+        for band, bucket in enumerate(band_buckets(minhash(shingles(document))))
+    ])
+
+def delete_fingerprints(db: Session, question_id: int):
+    db.execute(delete(QuestionFingerprint).where(QuestionFingerprint.question_id == question_id))
+
+def _documents(db: Session, question_ids: Iterable[int]) -> Dict[int, str]:
+    question_ids = sorted(question_ids)
+    documents = {}
+    # Batched so a large report stays under the database's bound-parameter limit
+    for start in range(0, len(question_ids), 1000):
+        rows = db.query(Question.id, *[getattr(Question, field) for field in DOCUMENT_FIELDS]).filter(
+            Question.id.in_(question_ids[start:start + 1000])
+        ).all()
+        documents.update((row.id, document_of(row)) for row in rows)
+    return documents
+
+def find_duplicates(
+    db: Session,
+    document: str,
+    exclude_id: Optional[int] = None,
+    threshold: float = DUPLICATE_THRESHOLD,
+    limit: int = 10
+) -> List[Dict[str, Any]]:
+    """Existing questions at least `threshold` similar to a document, most similar first.
+
+    Only questions sharing an LSH bucket are compared, so the cost follows
+    the number of near matches rather than the size of the bank.
+    Questions sharing more buckets are likelier matches and are compared first.
+    """
+    shingle_set = shingles(document)
+    buckets = band_buckets(minhash(shingle_set))
+    candidates = select(QuestionFingerprint.question_id).where(or_(*[
+        and_(QuestionFingerprint.band == band, QuestionFingerprint.bucket == bucket)
+        for band, bucket in enumerate(buckets)
+    ]))
+    if exclude_id is not None:
+        candidates = candidates.where(QuestionFingerprint.question_id != exclude_id)
+    candidates = candidates.group_by(QuestionFingerprint.question_id).order_by(
+        func.count().desc(), QuestionFingerprint.question_id
+    ).limit(MAX_CANDIDATES)
+
+    matches = []
+    for question_id, candidate in _documents(db, db.execute(candidates).scalars()).items():
+        score = similarity(shingle_set, shingles(candidate))
+        if score >= threshold:
+            matches.append({"id": question_id, "similarity": round(score, 4)})
+    matches.sort(key=lambda match: (-match["similarity"], match["id"]))
+    return matches[:limit]
+
+def _candidate_pairs(db: Session, min_shared_bands: int) -> Set[Tuple[int, int]]:
+    """Pairs of questions that share at least `min_shared_bands` LSH buckets.
+
+    Templated questions can fill one bucket with thousands of members; past
+    BUCKET_PAIR_WINDOW members each is paired only with its nearest ids,
+    which keeps the pair count linear while still catching batch-imported
+    copies, since those are inserted side by side.
+    """
+    shared = db.query(QuestionFingerprint.band, QuestionFingerprint.bucket).group_by(
+        QuestionFingerprint.band, QuestionFingerprint.bucket
+    ).having(func.count() > 1).subquery()
+    rows = db.query(QuestionFingerprint.band, QuestionFingerprint.bucket, QuestionFingerprint.question_id).join(
+        shared, and_(QuestionFingerprint.band == shared.c.band, QuestionFingerprint.bucket == shared.c.bucket)
+    ).order_by(QuestionFingerprint.band, QuestionFingerprint.bucket, QuestionFingerprint.question_id)
+
+    shared_bands: Counter = Counter()
+    for _, members in groupby(rows, key=lambda row: (row.band, row.bucket)):
+        question_ids = [row.question_id for row in members]
+        for index, first in enumerate(question_ids):
+            shared_bands.update((first, second) for second in question_ids[index + 1:index + 1 + BUCKET_PAIR_WINDOW])
+    return {pair for pair, bands in shared_bands.items() if bands >= min_shared_bands}
+
+def duplicate_report(db: Session, threshold: float, limit: int) -> Tuple[List[Dict[str, Any]], int]:
+    """Groups of near-duplicate questions across the bank, and how many there are.
+
+    Candidate pairs come from shared LSH buckets and are confirmed by exact
+    shingle similarity; confirmed pairs are merged into groups, so A~B and
+    B~C report A, B and C together.
+    """
+    pairs = sorted(_candidate_pairs(db, MIN_SHARED_BANDS if threshold >= DUPLICATE_THRESHOLD else 1))
+    documents = _documents(db, {question_id for pair in pairs for question_id in pair})
+    shingle_sets = {question_id: shingles(document) for question_id, document in documents.items()}
+
+    parent: Dict[int, int] = {}
+
+    def find(question_id: int) -> int:
+        parent.setdefault(question_id, question_id)
+        while parent[question_id] != question_id:
+            parent[question_id] = parent[parent[question_id]]
+            question_id = parent[question_id]
+        return question_id
+
+    edges = []
+    for first, second in pairs:
+        # Pairs already joined through other questions need no comparison
+        if first not in shingle_sets or second not in shingle_sets or find(first) == find(second):
+            continue
+        score = similarity(shingle_sets[first], shingle_sets[second])
+        if score >= threshold:
+            edges.append((first, second, score))
+            parent[find(second)] = find(first)
+
+    groups: Dict[int, Dict[str, Any]] = {}
+    for first, second, score in edges:
+        group = groups.setdefault(find(first), {"question_ids": set(), "similarity": 1.0})
+        group["question_ids"].update((first, second))
+        group["similarity"] = min(group["similarity"], score)
+
+    report = []
+    for group in groups.values():
+        question_ids = sorted(group["question_ids"])
+        report.append({
+            "question_ids": question_ids,
+            "similarity": round(group["similarity"], 4),
+            "exact": len({documents[question_id] for question_id in question_ids}) == 1
+        })
+    report.sort(key=lambda group: (-len(group["question_ids"]), group["question_ids"][0]))
+    return report[:limit], len(report)
@@ -4,6 +4,7 @@ from app.core.security import get_password_hash
 from app.models.user import User, UserRole
 from app.models.question import Question
 from app.models.test import Test, TestQuestion
+from app.utils.dedupe import document_of, index_questions
 
 def create_demo_users(db: Session):
     """Create demo users for testing"""
@@ -193,6 +194,8 @@ def create_demo_questions(db: Session, teacher_id: int):
         db.add(question)
         questions.append(question)
     
+    db.flush()
+    index_questions(db, [(question.id, document_of(question)) for question in questions])
     db.commit()
     return questions
 
@@ -0,0 +1,192 @@
+import csv
+import io
+import json
+from itertools import groupby
+from sqlalchemy.orm import Session
+from typing import Any, Dict, Iterator, List
+from app.core.database import SessionLocal
+from app.models.user import User
+from app.models.test import TestQuestion
+from app.models.submission import Submission, SubmissionAnswer
+
+# Rows fetched per round trip, and rows per CSV/NDJSON chunk or Parquet row group
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+SUBMISSION_COLUMNS = [
+    "submission_id", "student_id", "username", "full_name", "class_name",
+    "started_at", "submitted_at", "score", "attempted_questions",
+    "total_questions", "is_auto_submitted",
+]
+
+ANSWER_COLUMNS = ["question_id", "selected_answer", "is_correct"]
+
+def question_columns(question_ids: List[int]) -> List[str]:
+    return [f"question_{question_id}" for question_id in question_ids]
+
+def export_columns(question_ids: List[int], wide: bool) -> List[str]:
+    return SUBMISSION_COLUMNS + (question_columns(question_ids) if wide else ANSWER_COLUMNS)
+
+def load_question_ids(db: Session, test_id: int) -> List[int]:
+    rows = db.query(TestQuestion.question_id).filter(
+        TestQuestion.test_id == test_id
+    ).order_by(TestQuestion.order).all()
+    return [question_id for (question_id,) in rows]
+
+def _answer_rows(db: Session, test_id: int) -> Iterator[Any]:
+    """One row per answer, or per submission without answers, in submission order"""
+    return db.query(
+        Submission.id.label("submission_id"),
+        Submission.student_id,
+        User.username,
+        User.full_name,
+        User.class_name,
+        Submission.started_at,
+        Submission.submitted_at,
+        Submission.score,
+        Submission.attempted_questions,
+        Submission.total_questions,
+        Submission.is_auto_submitted,
+        SubmissionAnswer.question_id,
+        SubmissionAnswer.selected_answer,
+        SubmissionAnswer.is_correct,
+    ).outerjoin(
+        User, User.id == Submission.student_id
+    ).outerjoin(
+        SubmissionAnswer, SubmissionAnswer.submission_id == Submission.id
+    ).filter(
+        Submission.test_id == test_id
+    ).order_by(
+        Submission.id, SubmissionAnswer.question_id
+    ).execution_options(yield_per=EXPORT_BATCH_SIZE)
+
+def iter_export_rows(db: Session, test_id: int, question_ids: List[int], wide: bool) -> Iterator[Dict[str, Any]]:
+    """Stream export rows as dicts; memory stays bounded by one batch"""
+    rows = _answer_rows(db, test_id)
+    if not wide:
+        for row in rows:
+            yield row._asdict()
+        return
+
+    # Rows arrive grouped by submission, so each wide row is folded from
+    # consecutive answer rows without holding more than one submission
+    columns = dict(zip(question_ids, question_columns(question_ids)))
+    for _, answers in groupby(rows, key=lambda row: row.submission_id):
+        answers = list(answers)
+        record = {column: answers[0]._mapping[column] for column in SUBMISSION_COLUMNS}
+        record.update({column: None for column in columns.values()})
+        for answer in answers:
+            column = columns.get(answer.question_id)
+            if column:
+                record[column] = answer.selected_answer
+        yield record
+
+def _batches(rows: Iterator[Dict[str, Any]]) -> Iterator[List[Dict[str, Any]]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= EXPORT_BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _encode_csv(rows: Iterator[Dict[str, Any]], columns: List[str]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns)
+    writer.writeheader()
+    for batch in _batches(rows):
+        writer.writerows(batch)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+def _encode_ndjson(rows: Iterator[Dict[str, Any]], columns: List[str]) -> Iterator[bytes]:
+    for batch in _batches(rows):
+        yield "".join(json.dumps(row, default=str) + "\n" for row in batch).encode()
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands back whatever was written since the last drain"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+def _parquet_schema(columns: List[str]):
+    import pyarrow as pa
+
+    types = {
+        "submission_id": pa.int64(),
+        "student_id": pa.int64(),
+        "started_at": pa.timestamp("us"),
+        "submitted_at": pa.timestamp("us"),
+        "score": pa.float64(),
+        "attempted_questions": pa.int64(),
+        "total_questions": pa.int64(),
+        "question_id": pa.int64(),
+    }
+    return pa.schema([(column, types.get(column, pa.string())) for column in columns])
+
+def _encode_parquet(rows: Iterator[Dict[str, Any]], columns: List[str]) -> Iterator[bytes]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = _parquet_schema(columns)
+    sink = _ChunkSink()
+    # Each batch becomes one row group and is flushed to the client at once
+    with pq.ParquetWriter(sink, schema) as writer:
+        for batch in _batches(rows):
+            writer.write_batch(pa.RecordBatch.from_pylist(batch, schema=schema))
+            yield sink.drain()
+    yield sink.drain()
+
+ENCODERS = {
+    "csv": _encode_csv,
+    "ndjson": _encode_ndjson,
+    "parquet": _encode_parquet,
+}
+
+def parquet_available() -> bool:
+    """pyarrow is an optional dependency, only needed for Parquet export"""
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def stream_export(test_id: int, question_ids: List[int], format: str, wide: bool) -> Iterator[bytes]:
+    """Encode a test's results in the requested format, one batch at a time.
+
+    Uses its own session because the response body is produced after the
+    request's dependencies have been torn down.
+    """
+    db = SessionLocal()
+    try:
+        columns = export_columns(question_ids, wide)
+        rows = iter_export_rows(db, test_id, question_ids, wide)
+        yield from ENCODERS[format](rows, columns)
+    finally:
+        db.close()
@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta
+from sqlalchemy import update
+from sqlalchemy.orm import Session, selectinload
+from typing import Collection, Dict, Iterable, List, Optional, Tuple
+from app.models.test import Test
+from app.models.submission import Submission
+from app.utils.analytics import record_submission
+from app.utils.blueprints import student_question_ids
+from app.utils.cache import answer_key_cache, paper_cache
+from app.utils.shuffle import attempt_seed
+
+def mark_answer(answer_key: Dict[int, str], question_id: int, selected_answer: Optional[str]) -> Optional[str]:
+    if not selected_answer:
+        return None
+    correct_answer = answer_key.get(question_id)
+    return "true" if correct_answer and selected_answer.upper() == correct_answer.upper() else "false"
+
+def apply_score(submission: Submission, total_questions: int, marks: List[Optional[str]]):
+    correct_count = marks.count("true")
+    submission.score = (correct_count / total_questions) * 100 if total_questions else 0
+    submission.attempted_questions = len([m for m in marks if m is not None])
+    submission.total_questions = total_questions
+    submission.submitted_at = datetime.utcnow()
+
+def question_count(db: Session, test_id: int) -> int:
+    """How many questions each student is given, which a blueprint can make fewer than the test holds"""
+    paper = paper_cache.get(db, test_id)
+    return paper.question_count if paper else len(answer_key_cache.get(db, test_id))
+
+def student_questions(db: Session, test_id: int, student_id: int) -> Collection[int]:
+    """Ids of the questions on one student's paper"""
+    paper = paper_cache.get(db, test_id)
+    if paper and paper.sections:
+        return set(student_question_ids(paper.question_ids, paper.sections, attempt_seed(test_id, student_id)))
+    return answer_key_cache.get(db, test_id).keys()
+
+def attempt_deadline(started_at: datetime, duration_minutes: int, end_time: Optional[datetime] = None) -> datetime:
+    """When an attempt runs out of time: its duration, cut short by the test closing"""
+    deadline = started_at + timedelta(minutes=duration_minutes)
+    return min(deadline, end_time) if end_time else deadline
+
+def open_attempt_deadlines(
+    db: Session,
+    test_id: Optional[int] = None,
+    submission_ids: Optional[List[int]] = None
+) -> List[Tuple[int, datetime]]:
+    """(submission_id, deadline) of attempts still open, read through the open-attempt index"""
+    query = db.query(Submission.id, Submission.started_at, Test.duration_minutes, Test.end_time).join(
+        Test, Test.id == Submission.test_id
+    ).filter(Submission.submitted_at.is_(None), Submission.started_at.isnot(None))
+    if test_id is not None:
+        query = query.filter(Submission.test_id == test_id)
+    if submission_ids is not None:
+        query = query.filter(Submission.id.in_(submission_ids))
+    return [
+        (submission_id, attempt_deadline(started_at, duration_minutes, end_time))
+        for submission_id, started_at, duration_minutes, end_time in query.all()
+    ]
+
+def finalize_expired(db: Session, submission_ids: Iterable[int], cutoff: datetime) -> Tuple[List[Submission], List[Tuple[int, datetime]]]:
+    """Auto-submit and score, in bulk, the attempts whose deadline is at or before cutoff.
+
+    Returns the submissions closed here, and the (id, deadline) of attempts
+    that turned out not to be due yet, such as after a test was lengthened.
+    The caller commits.
+    """
+    submission_ids = list(submission_ids)
+    due, not_due = [], []
+    for submission_id, deadline in open_attempt_deadlines(db, submission_ids=submission_ids):
+        (due if deadline <= cutoff else not_due).append((submission_id, deadline))
+    if not due:
+        return [], not_due
+
+    # Conditional UPDATE so that a student's own finalize, or another
+    # worker's scheduler, closing the same attempt is never double counted
+    closed_ids = db.execute(
+        update(Submission).where(
+            Submission.id.in_([submission_id for submission_id, _ in due]),
+            Submission.submitted_at.is_(None)
+        ).values(
+            submitted_at=datetime.utcnow(), is_auto_submitted="true"
+        ).returning(Submission.id).execution_options(synchronize_session=False)
+    ).scalars().all()
+    if not closed_ids:
+        return [], not_due
+
+    submissions = db.query(Submission).options(selectinload(Submission.answers)).filter(
+        Submission.id.in_(closed_ids)
+    ).order_by(Submission.id).all()
+    for submission in submissions:
+        answer_key = answer_key_cache.get(db, submission.test_id)
+        for answer in submission.answers:
+            answer.is_correct = mark_answer(answer_key, answer.question_id, answer.selected_answer)
+        apply_score(submission, question_count(db, submission.test_id), [answer.is_correct for answer in submission.answers])
+        record_submission(db, submission, [
+            (answer.question_id, answer.selected_answer, answer.is_correct) for answer in submission.answers
+        ], student_questions(db, submission.test_id, submission.student_id))
+    return submissions, not_due
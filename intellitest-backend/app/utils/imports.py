@@ -0,0 +1,273 @@
+import csv
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from fastapi import HTTPException, UploadFile
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert, or_
+from sqlalchemy.orm import Session
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple, Type
+from app.core.database import SessionLocal
+from app.core.security import hash_passwords
+from app.models.job import ImportJob
+from app.models.question import Question
+from app.models.user import User
+from app.schemas.question import QuestionCreate
+from app.schemas.user import RosterEntry
+from app.utils.dedupe import document_of, index_questions
+
+IMPORT_FORMATS = ("csv", "jsonl")
+
+# Rows validated and inserted per transaction; one multi-row INSERT each
+IMPORT_CHUNK_SIZE = 500
+
+# The job keeps the first errors only, so a bad file cannot bloat its row
+MAX_REPORTED_ERRORS = 1000
+
+# (row number, record or None, parse error or None)
+ParsedRow = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+def import_format(filename: Optional[str], format: Optional[str]) -> str:
+    """The explicit format, or the one implied by the upload's extension"""
+    if not format and filename:
+        extension = os.path.splitext(filename)[1].lower().lstrip(".")
+        format = "jsonl" if extension in ("jsonl", "ndjson") else extension
+    if format not in IMPORT_FORMATS:
+        raise HTTPException(status_code=400, detail="Upload must be CSV or JSONL")
+    return format
+
+def save_upload(upload: UploadFile) -> str:
+    """Copy an upload to a file that outlives the request, without reading it into memory"""
+    with tempfile.NamedTemporaryFile(prefix="intellitest-import-", delete=False) as target:
+        shutil.copyfileobj(upload.file, target)
+    return target.name
+
+def _csv_rows(file) -> Iterator[ParsedRow]:
+    reader = csv.DictReader(file)
+    for number, record in enumerate(reader, start=1):
+        # Blank cells fall back to the schema defaults
+        yield number, {key: value for key, value in record.items() if key and value not in (None, "")}, None
+
+def _jsonl_rows(file) -> Iterator[ParsedRow]:
+    number = 0
+    for line in file:
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            yield number, None, f"Invalid JSON: {exc}"
+            continue
+        if not isinstance(record, dict):
+            yield number, None, "Expected a JSON object"
+            continue
+        yield number, record, None
+
+def read_rows(path: str, format: str) -> Iterator[ParsedRow]:
+    with open(path, encoding="utf-8-sig", newline="") as file:
+        yield from (_csv_rows if format == "csv" else _jsonl_rows)(file)
+
+def check_columns(path: str, format: str, schema: Type[BaseModel]):
+    """Reject a CSV whose header lacks a required field before any row is read"""
+    if format != "csv":
+        return
+    with open(path, encoding="utf-8-sig", newline="") as file:
+        header = next(csv.reader(file), [])
+    missing = [name for name, field in schema.model_fields.items() if field.is_required() and name not in header]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+def _chunks(rows: Iterator[ParsedRow]) -> Iterator[List[ParsedRow]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= IMPORT_CHUNK_SIZE:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def validate_row(schema: Type[BaseModel], record: Dict[str, Any]) -> Tuple[Optional[BaseModel], List[str]]:
+    try:
+        return schema.model_validate(record), []
+    except ValidationError as exc:
+        return None, [
+            f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}"
+            for error in exc.errors()
+        ]
+
+def create_job(db: Session, kind: str, filename: Optional[str], user_id: int) -> ImportJob:
+    job = ImportJob(
+        kind=kind,
+        status="pending",
+        filename=filename,
+        total_rows=0,
+        processed_rows=0,
+        inserted_rows=0,
+        error_count=0,
+        errors=[],
+        created_by=user_id,
+        created_at=datetime.utcnow()
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+def record_chunk(job: ImportJob, processed: int, inserted: int, errors: List[Dict[str, Any]]):
+    """Advance the job's counters; committed together with the chunk's rows"""
+    job.processed_rows += processed
+    job.inserted_rows += inserted
+    job.error_count += len(errors)
+    room = MAX_REPORTED_ERRORS - len(job.errors or [])
+    if errors and room > 0:
+        # Reassigned rather than appended so the JSON column is flagged dirty
+        job.errors = (job.errors or []) + errors[:room]
+
+def import_questions(db: Session, job: ImportJob, path: str, format: str, user_id: int):
+    """Validate and insert questions chunk by chunk, committing progress after each"""
+    check_columns(path, format, QuestionCreate)
+    job.status = "running"
+    job.total_rows = sum(1 for _ in read_rows(path, format))
+    db.commit()
+
+    for chunk in _chunks(read_rows(path, format)):
+        values, validated, errors = [], [], []
+        created_at = datetime.utcnow()
+        for number, record, parse_error in chunk:
+            if parse_error:
+                errors.append({"row": number, "errors": [parse_error]})
+                continue
+            question, messages = validate_row(QuestionCreate, record)
+            if messages:
+                errors.append({"row": number, "errors": messages})
+                continue
+            validated.append(question)
+            values.append({**question.model_dump(), "created_by": user_id, "created_at": created_at})
+
+        if values:
+            # Still batched into multi-row INSERTs; RETURNING hands back the
+            # ids in row order so the chunk can be fingerprinted
+            ids = db.execute(insert(Question).returning(Question.id, sort_by_parameter_order=True), values).scalars().all()
+            index_questions(db, [
+                (question_id, document_of(question)) for question_id, question in zip(ids, validated)
+            ])
+        record_chunk(job, len(chunk), len(values), errors)
+        db.commit()
+
+    job.status = "completed"
+    job.finished_at = datetime.utcnow()
+    db.commit()
+
+def registered(db: Session, entries: List[RosterEntry]) -> Tuple[Set[str], Set[str]]:
+    """Usernames and emails of a chunk that are already taken, in one query"""
+    rows = db.query(User.username, User.email).filter(or_(
+        User.username.in_({entry.username for entry in entries}),
+        User.email.in_({entry.email for entry in entries})
+    )).all()
+    return {username for username, _ in rows}, {email for _, email in rows}
+
+def import_users(
+    db: Session,
+    job: ImportJob,
+    path: str,
+    format: str,
+    user_id: int,
+    default_password: Optional[str] = None
+):
+    """Create accounts from a roster chunk by chunk; conflicting rows are reported, not inserted.
+
+    Each chunk costs one uniqueness query and one INSERT, and its passwords
+    are hashed in parallel across worker processes.
+    """
+    check_columns(path, format, RosterEntry)
+    job.status = "running"
+    job.total_rows = sum(1 for _ in read_rows(path, format))
+    db.commit()
+
+    # First row of the file claiming each username and email
+    seen_usernames: Dict[str, int] = {}
+    seen_emails: Dict[str, int] = {}
+
+    for chunk in _chunks(read_rows(path, format)):
+        entries, errors = [], []
+        for number, record, parse_error in chunk:
+            if parse_error:
+                errors.append({"row": number, "errors": [parse_error]})
+                continue
+            entry, messages = validate_row(RosterEntry, record)
+            if entry is not None:
+                if not (entry.password or default_password):
+                    messages.append("password: Field required when no default password is given")
+                if entry.username in seen_usernames:
+                    messages.append(f"username: Duplicate of row {seen_usernames[entry.username]}")
+                if entry.email in seen_emails:
+                    messages.append(f"email: Duplicate of row {seen_emails[entry.email]}")
+                seen_usernames.setdefault(entry.username, number)
+                seen_emails.setdefault(entry.email, number)
+            if messages:
+                errors.append({"row": number, "errors": messages})
+                continue
+            entries.append((number, entry))
+
+        accepted = []
+        if entries:
+            taken_usernames, taken_emails = registered(db, [entry for _, entry in entries])
+            for number, entry in entries:
+                messages = []
+                if entry.username in taken_usernames:
+                    messages.append("username: Username already registered")
+                if entry.email in taken_emails:
+                    messages.append("email: Email already registered")
+                if messages:
+                    errors.append({"row": number, "errors": messages})
+                else:
+                    accepted.append(entry)
+
+        if accepted:
+            hashes = hash_passwords([entry.password or default_password for entry in accepted])
+            created_at = datetime.utcnow()
+            db.execute(insert(User).values([{
+                "username": entry.username,
+                "email": entry.email,
+                "hashed_password": hashed_password,
+                "full_name": entry.full_name or entry.username,
+                "role": entry.role,
+                "class_name": entry.class_name,
+                "school_name": entry.school_name,
+                "is_active": True,
+                "created_at": created_at
+            } for entry, hashed_password in zip(accepted, hashes)]))
+        errors.sort(key=lambda error: error["row"])
+        record_chunk(job, len(chunk), len(accepted), errors)
+        db.commit()
+
+    job.status = "completed"
+    job.finished_at = datetime.utcnow()
+    db.commit()
+
+IMPORTERS = {
+    "questions": import_questions,
+    "users": import_users,
+}
+
+def run_import(job_id: int, path: str, format: str, user_id: int, **options):
+    """Background task body; uses its own session since the request's is closed"""
+    db = SessionLocal()
+    try:
+        job = db.query(ImportJob).filter(ImportJob.id == job_id).first()
+        try:
+            IMPORTERS[job.kind](db, job, path, format, user_id, **options)
+        except Exception as exc:
+            # Chunks committed before the failure stay imported
+            db.rollback()
+            job.status = "failed"
+            job.message = f"Import failed: {exc}"
+            job.finished_at = datetime.utcnow()
+            db.commit()
+    finally:
+        db.close()
+        os.remove(path)
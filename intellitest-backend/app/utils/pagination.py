@@ -0,0 +1,116 @@
+import base64
+import binascii
+import json
+from fastapi import HTTPException, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy import func
+from sqlalchemy.orm import Query, Session, load_only
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Type
+
+# Counting stops here; larger results report an estimate instead
+COUNT_EXACT_LIMIT = 10000
+
+PAGINATION_HEADERS = ["X-Next-Cursor", "X-Total-Count", "X-Total-Count-Exact"]
+
+class Page(NamedTuple):
+    items: List[Any]
+    next_cursor: Optional[str]
+    total: Optional[int]
+    total_exact: bool
+    projected: bool
+
+def encode_cursor(last_id: int) -> str:
+    payload = json.dumps({"id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        last_id = json.loads(payload)["id"]
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(last_id, int):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return last_id
+
+def parse_fields(fields: Optional[str], schema: Type[BaseModel]) -> Optional[List[str]]:
+    """Validate a comma-separated fields= projection against a response schema"""
+    if not fields:
+        return None
+    names = []
+    for name in fields.split(","):
+        name = name.strip()
+        if name and name not in names:
+            names.append(name)
+    unknown = [name for name in names if name not in schema.model_fields]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    if "id" not in names:
+        names.insert(0, "id")
+    return names
+
+def estimate_count(db: Session, query: Query, model) -> Tuple[int, bool]:
+    """Row count for a filtered query without an unbounded COUNT(*).
+
+    Counts exactly up to COUNT_EXACT_LIMIT; past that, PostgreSQL reports
+    the planner's estimate and other databases report the limit itself.
+    """
+    query = query.order_by(None)
+    bounded = db.query(func.count()).select_from(
+        query.with_entities(model.id).limit(COUNT_EXACT_LIMIT).subquery()
+    ).scalar()
+    if bounded < COUNT_EXACT_LIMIT:
+        return bounded, True
+
+    if db.get_bind().dialect.name == "postgresql":
+        compiled = query.statement.compile(dialect=db.get_bind().dialect)
+        plan = db.connection().exec_driver_sql(
+            "EXPLAIN (FORMAT JSON) " + str(compiled), compiled.params
+        ).scalar()
+        return max(int(plan[0]["Plan"]["Plan Rows"]), COUNT_EXACT_LIMIT), False
+    return COUNT_EXACT_LIMIT, False
+
+def paginate(
+    db: Session,
+    query: Query,
+    model,
+    cursor: Optional[str],
+    limit: int,
+    fields: Optional[List[str]] = None
+) -> Page:
+    """Keyset page ordered by id; the total is only computed for the first page"""
+    total, total_exact = None, False
+    if cursor is None:
+        total, total_exact = estimate_count(db, query, model)
+    else:
+        query = query.filter(model.id > decode_cursor(cursor))
+
+    if fields:
+        columns = [getattr(model, name) for name in fields if name in model.__table__.columns]
+        query = query.options(load_only(*columns))
+
+    rows = query.order_by(model.id).limit(limit + 1).all()
+    next_cursor = encode_cursor(rows[limit - 1].id) if len(rows) > limit else None
+    rows = rows[:limit]
+
+    if fields:
+        rows = [{name: getattr(row, name) for name in fields} for row in rows]
+    return Page(rows, next_cursor, total, total_exact, bool(fields))
+
+def page_response(response: Response, page: Page):
+    """Put paging metadata in headers so the body stays a plain list"""
+    headers: Dict[str, str] = {}
+    if page.next_cursor:
+        headers["X-Next-Cursor"] = page.next_cursor
+    if page.total is not None:
+        headers["X-Total-Count"] = str(page.total)
+        headers["X-Total-Count-Exact"] = "true" if page.total_exact else "false"
+
+    # Projected rows are partial, so they skip response_model validation
+    if page.projected:
+        return JSONResponse(content=jsonable_encoder(page.items), headers=headers)
+
+    response.headers.update(headers)
+    return page.items
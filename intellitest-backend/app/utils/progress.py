@@ -0,0 +1,69 @@
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from typing import Any, Dict
+from app.core.events import progress_hub
+from app.models.user import User
+from app.models.test import Test
+from app.models.submission import Submission, SubmissionAnswer
+
+def progress_query(db: Session, test_id: int):
+    """Per-student progress rows for a test, joined and aggregated in SQL"""
+    attempted = func.count(SubmissionAnswer.id).filter(
+        SubmissionAnswer.selected_answer.isnot(None)
+    )
+    return (
+        db.query(
+            Submission.student_id,
+            User.full_name,
+            User.class_name,
+            attempted.label("attempted_questions"),
+            Submission.total_questions,
+            Submission.started_at,
+            Submission.submitted_at,
+            Submission.score,
+        )
+        .outerjoin(User, User.id == Submission.student_id)
+        .outerjoin(SubmissionAnswer, SubmissionAnswer.submission_id == Submission.id)
+        .filter(Submission.test_id == test_id)
+        .group_by(Submission.id, User.id)
+        .order_by(Submission.id)
+    )
+
+def progress_row(row) -> Dict[str, Any]:
+    return {
+        "student_id": row.student_id,
+        "student_name": row.full_name if row.full_name else "Unknown",
+        "student_class": row.class_name,
+        "attempted_questions": row.attempted_questions,
+        "total_questions": row.total_questions,
+        "status": "Submitted" if row.submitted_at else "In Progress",
+        "started_at": row.started_at,
+        "submitted_at": row.submitted_at,
+        "score": row.score
+    }
+
+def progress_snapshot(db: Session, test: Test) -> Dict[str, Any]:
+    progress_data = [progress_row(row) for row in progress_query(db, test.id).all()]
+    return {
+        "test_id": test.id,
+        "test_name": test.name,
+        "total_students": len(progress_data),
+        "submitted_count": len([p for p in progress_data if p["status"] == "Submitted"]),
+        "in_progress_count": len([p for p in progress_data if p["status"] == "In Progress"]),
+        "students": progress_data
+    }
+
+def publish_progress(db: Session, submission: Submission):
+    """Push one student's progress row to everyone watching the test"""
+    if not progress_hub.has_subscribers(submission.test_id):
+        return
+
+    row = progress_query(db, submission.test_id).filter(Submission.id == submission.id).first()
+    if row is None:
+        return
+
+    progress_hub.publish(submission.test_id, {
+        "type": "student",
+        "test_id": submission.test_id,
+        "student": progress_row(row)
+    })
@@ -0,0 +1,88 @@
+import re
+from sqlalchemy import and_, column, func, literal, literal_column, select, table
+from sqlalchemy.orm import Session
+from typing import Any, Dict, List, Optional, Tuple
+from app.models.question import Question
+
+# SQLite: external-content FTS5 table kept in sync by triggers on questions
+FTS_TABLE = "questions_fts"
+
+# PostgreSQL: trigger-maintained tsvector column with a GIN index
+SEARCH_VECTOR_COLUMN = "search_vector"
+TEXT_SEARCH_CONFIG = "english"
+
+MAX_SEARCH_TERMS = 16
+
+_TERM = re.compile(r"\w+", re.UNICODE)
+
+def search_terms(text: Optional[str]) -> List[str]:
+    """Word tokens of a user query; punctuation never reaches the query syntax"""
+    return _TERM.findall((text or "").lower())[:MAX_SEARCH_TERMS]
+
+def search_matches(db: Session, terms: List[str]):
+    """Subquery of (question_id, score) for questions matching every term.
+
+    The last term is matched as a prefix so results appear while typing;
+    a higher score is a better match.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        fts = table(FTS_TABLE, column("rowid"), column("rank"))
+        query = " ".join(f'"{term}"' for term in terms[:-1]) + f' "{terms[-1]}"*'
+        return select(
+            fts.c.rowid.label("question_id"),
+            (-fts.c.rank).label("score")
+        ).where(literal_column(FTS_TABLE).op("MATCH")(query.strip())).subquery()
+
+    if dialect == "postgresql":
+        tsquery = func.to_tsquery(TEXT_SEARCH_CONFIG, " & ".join(terms[:-1] + [f"{terms[-1]}:*"]))
+        vector = literal_column(f"{Question.__tablename__}.{SEARCH_VECTOR_COLUMN}")
+        return select(
+            Question.id.label("question_id"),
+            func.ts_rank(vector, tsquery).label("score")
+        ).where(vector.op("@@")(tsquery)).subquery()
+
+    # Databases without a full-text index fall back to unranked substring matching
+    return select(
+        Question.id.label("question_id"),
+        literal(0.0).label("score")
+    ).where(and_(*[Question.question_text.ilike(f"%{term}%") for term in terms])).subquery()
+
+def _facet(db: Session, matches, facet_column, filters) -> Dict[str, int]:
+    rows = db.query(facet_column, func.count()).join(
+        matches, matches.c.question_id == Question.id
+    ).filter(*filters).group_by(facet_column).all()
+    return {value: count for value, count in rows if value is not None}
+
+def search_questions(
+    db: Session,
+    terms: List[str],
+    topic: Optional[str],
+    difficulty: Optional[str],
+    limit: int,
+    offset: int
+) -> Tuple[List[Tuple[Question, float]], int, Dict[str, Dict[str, int]]]:
+    """Ranked matches, their total, and topic/difficulty facet counts.
+
+    Each facet is counted with every filter except its own, so the counts
+    show what selecting another value would return.
+    """
+    matches = search_matches(db, terms)
+    topic_filters = [Question.topic == topic] if topic else []
+    difficulty_filters = [Question.difficulty_level == difficulty] if difficulty else []
+
+    hits = db.query(Question, matches.c.score).join(
+        matches, matches.c.question_id == Question.id
+    ).filter(
+        *topic_filters, *difficulty_filters
+    ).order_by(matches.c.score.desc(), Question.id).offset(offset).limit(limit).all()
+
+    total = db.query(func.count()).select_from(Question).join(
+        matches, matches.c.question_id == Question.id
+    ).filter(*topic_filters, *difficulty_filters).scalar()
+
+    facets: Dict[str, Dict[str, Any]] = {
+        "topic": _facet(db, matches, Question.topic, difficulty_filters),
+        "difficulty_level": _facet(db, matches, Question.difficulty_level, topic_filters),
+    }
+    return hits, total, facets
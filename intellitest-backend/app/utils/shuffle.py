@@ -0,0 +1,69 @@
+import hashlib
+import json
+import random
+import struct
+from itertools import permutations
+from typing import Any, Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.schemas.question import ANSWER_OPTIONS
+from app.utils.blueprints import student_question_ids
+
+# Every ordering of the four options; a question's ordering is an index here
+OPTION_ORDERS = list(permutations(ANSWER_OPTIONS))
+# Displayed letter -> the bank's letter, and back, per ordering
+_TO_ORIGINAL = [dict(zip(ANSWER_OPTIONS, order)) for order in OPTION_ORDERS]
+_TO_DISPLAYED = [dict(zip(order, ANSWER_OPTIONS)) for order in OPTION_ORDERS]
+
+# Keyed so students cannot work out each other's orderings from their ids
+_SEED_KEY = hashlib.sha256(settings.secret_key.encode()).digest()
+
+def attempt_seed(test_id: int, student_id: int) -> int:
+    digest = hashlib.blake2b(struct.pack(">qq", test_id, student_id), key=_SEED_KEY, digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+def question_order(seed: int, question_ids: List[int]) -> List[int]:
+    return random.Random(seed).sample(question_ids, len(question_ids))
+
+def option_order(seed: int, question_id: int) -> int:
+    digest = hashlib.blake2b(struct.pack(">Qq", seed, question_id), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % len(OPTION_ORDERS)
+
+def to_original(seed: int, question_id: int, selected_answer: Optional[str]) -> Optional[str]:
+    """The bank's letter for an option a student picked on their shuffled paper"""
+    if selected_answer not in ANSWER_OPTIONS:
+        return selected_answer
+    return _TO_ORIGINAL[option_order(seed, question_id)][selected_answer]
+
+def to_displayed(seed: int, question_id: int, selected_answer: Optional[str]) -> Optional[str]:
+    if selected_answer not in ANSWER_OPTIONS:
+        return selected_answer
+    return _TO_DISPLAYED[option_order(seed, question_id)][selected_answer]
+
+def _shuffle_options(seed: int, question: Dict[str, Any]) -> Dict[str, Any]:
+    shuffled = dict(question)
+    for displayed, original in zip(ANSWER_OPTIONS, OPTION_ORDERS[option_order(seed, question["id"])]):
+        shuffled[f"option_{displayed.lower()}"] = question[f"option_{original.lower()}"]
+    return shuffled
+
+def student_paper(paper, test_id: int, student_id: int) -> Tuple[bytes, str]:
+    """A student's copy of a cached paper, with its ETag.
+
+    Papers that are not shuffled or drawn per student are shared as-is.
+    Others are built from the cached question list on each request, so
+    no per-student ordering or selection is ever stored or cached.
+    """
+    if not (paper.shuffle_questions or paper.shuffle_options or paper.sections):
+        return paper.body, paper.etag
+
+    seed = attempt_seed(test_id, student_id)
+    questions = {question["id"]: question for question in paper.questions}
+    question_ids = student_question_ids(paper.question_ids, paper.sections, seed)
+    if paper.shuffle_questions:
+        question_ids = question_order(seed, question_ids)
+    ordered = [
+        _shuffle_options(seed, questions[question_id]) if paper.shuffle_options else questions[question_id]
+        for question_id in question_ids
+    ]
+    body = json.dumps({**paper.header, "questions": ordered}, separators=(",", ":")).encode()
+    etag = '"%s-%016x"' % (paper.etag.strip('"'), seed)
+    return body, etag
@@ -0,0 +1,101 @@
+import asyncio
+import heapq
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from anyio import to_thread
+from typing import Any, Iterable, List, Optional, Tuple
+
+class TimerHeap(ABC):
+    """Runs work when its time comes, from a min-heap of (due_at, item).
+
+    One asyncio task sleeps until the earliest entry, pops everything due
+    and hands it to `dispatch`, so an idle tick costs nothing and nothing
+    is polled. Entries may be pushed from any thread. Subclasses load
+    their entries from the database in `rebuild`, which runs on start.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[datetime, Any]] = []
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def push(self, due_at: datetime, item: Any):
+        with self._lock:
+            earliest = self._heap[0][0] if self._heap else None
+            heapq.heappush(self._heap, (due_at, item))
+        # Only a new earliest entry needs the sleeping task to recompute
+        if earliest is None or due_at <= earliest:
+            self._wake()
+
+    def replace(self, entries: Iterable[Tuple[datetime, Any]]):
+        with self._lock:
+            self._heap = list(entries)
+            heapq.heapify(self._heap)
+        self._wake()
+
+    @abstractmethod
+    def rebuild(self):
+        """Reload every entry from the database; runs on a worker thread"""
+
+    @abstractmethod
+    async def dispatch(self, items: List[Any], now: datetime):
+        """Handle the items whose time has come"""
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        await to_thread.run_sync(self.rebuild)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        self._loop = None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._heap)
+
+    def _wake(self):
+        if self._loop is None:
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        except RuntimeError:
+            # The loop closed between the check and the call
+            pass
+
+    def _pop_due(self, now: datetime) -> List[Any]:
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                due.append(heapq.heappop(self._heap)[1])
+        return due
+
+    def _seconds_until_next(self, now: datetime) -> Optional[float]:
+        with self._lock:
+            if not self._heap:
+                return None
+            return max((self._heap[0][0] - now).total_seconds(), 0.0)
+
+    async def _run(self):
+        while True:
+            timeout = self._seconds_until_next(datetime.utcnow())
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            now = datetime.utcnow()
+            due = self._pop_due(now)
+            if due:
+                await self.dispatch(due, now)
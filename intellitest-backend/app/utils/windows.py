@@ -0,0 +1,118 @@
+import logging
+from datetime import datetime, timedelta
+from anyio import to_thread
+from sqlalchemy import and_, or_, update
+from typing import List, Optional, Tuple
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.test import Test
+from app.utils.cache import answer_key_cache, paper_cache, warm_roster, warm_test
+from app.utils.timers import TimerHeap
+
+logger = logging.getLogger(__name__)
+
+WARM, OPEN, CLOSE = "warm", "open", "close"
+
+# Starts missed while no worker was running are still applied on startup
+# if they fall within this window, so a deploy at start time opens the test
+MISSED_START_WINDOW = timedelta(hours=1)
+
+class TestWindowScheduler(TimerHeap):
+    """Opens and closes tests at their start_time and end_time.
+
+    A few minutes before a test opens its answer key, paper and roster
+    are loaded into this process's caches, and the paper is rebuilt again
+    as the test goes live, so the first students hit warm caches instead
+    of all missing at once. Every worker runs its own scheduler to warm
+    its own caches; the is_live flips are conditional UPDATEs, so only
+    one of them changes the row. Events are checked against the test's
+    current times when they fire, so entries left over from an edit are
+    harmless. Between the two times a teacher can still toggle is_live.
+    """
+
+    def __init__(self, prewarm_seconds: int):
+        super().__init__()
+        self.prewarm = timedelta(seconds=prewarm_seconds)
+
+    def schedule_test(self, test_id: int, start_time: Optional[datetime], end_time: Optional[datetime], is_live: bool):
+        """Track a test's window; safe to call from threadpool handlers"""
+        for due_at, action in self._pending(start_time, end_time, is_live, datetime.utcnow()):
+            self.push(due_at, (action, test_id))
+
+    def rebuild(self):
+        """Load the upcoming windows, and apply any that were missed"""
+        now = datetime.utcnow()
+        db = SessionLocal()
+        try:
+            tests = db.query(Test.id, Test.start_time, Test.end_time, Test.is_live).filter(or_(
+                Test.start_time > now - MISSED_START_WINDOW,
+                Test.end_time > now,
+                and_(Test.end_time.isnot(None), Test.is_live.is_(True))
+            )).all()
+        finally:
+            db.close()
+
+        entries = [
+            (due_at, (action, test_id))
+            for test_id, start_time, end_time, is_live in tests
+            for due_at, action in self._pending(start_time, end_time, is_live, now)
+        ]
+        self.replace(entries)
+        logger.info("Test scheduler tracking %d events for %d tests", len(entries), len(tests))
+
+    async def dispatch(self, items: List[Tuple[str, int]], now: datetime):
+        # In due order, once each
+        for action, test_id in dict.fromkeys(items):
+            try:
+                await to_thread.run_sync(self._apply, action, test_id, now)
+            except Exception:
+                logger.exception("Scheduled %s of test %s failed", action, test_id)
+
+    def _pending(
+        self,
+        start_time: Optional[datetime],
+        end_time: Optional[datetime],
+        is_live: bool,
+        now: datetime
+    ) -> List[Tuple[datetime, str]]:
+        """Events still to come, plus past ones that would still change something"""
+        events = []
+        if start_time and start_time > now:
+            events += [(start_time - self.prewarm, WARM), (start_time, OPEN)]
+        elif start_time and start_time > now - MISSED_START_WINDOW and not is_live:
+            events.append((start_time, OPEN))
+        if end_time and (end_time > now or is_live):
+            events.append((end_time, CLOSE))
+        return events
+
+    def _apply(self, action: str, test_id: int, now: datetime):
+        db = SessionLocal()
+        try:
+            test = db.query(Test).filter(Test.id == test_id).first()
+            if not test:
+                return
+            before_end = test.end_time is None or now < test.end_time
+
+            if action == WARM and test.start_time and test.start_time - self.prewarm <= now < test.start_time and before_end:
+                warm_test(db, test_id)
+                warm_roster(db, [c.class_name for c in test.classes])
+
+            elif action == OPEN and test.start_time and test.start_time <= now and before_end:
+                db.execute(update(Test).where(Test.id == test_id, Test.is_live.is_(False)).values(is_live=True))
+                db.commit()
+                # The answer key is unchanged; the paper carries is_live
+                paper_cache.invalidate(test_id)
+                paper_cache.warm(db, test_id)
+                answer_key_cache.get(db, test_id)
+                warm_roster(db, [c.class_name for c in test.classes])
+                logger.info("Test %s is live", test_id)
+
+            elif action == CLOSE and test.end_time and test.end_time <= now:
+                db.execute(update(Test).where(Test.id == test_id, Test.is_live.is_(True)).values(is_live=False))
+                db.commit()
+                paper_cache.invalidate(test_id)
+                logger.info("Test %s is closed", test_id)
+        finally:
+            db.close()
+
+test_scheduler = TestWindowScheduler(prewarm_seconds=settings.test_prewarm_seconds)
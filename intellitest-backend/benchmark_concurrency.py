@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Concurrent request benchmark
+Measures requests/second on the database-bound endpoints of a local
+uvicorn server as concurrent clients are added. Handlers run on the
+threadpool, so throughput should hold or rise rather than collapse, and
+/health should keep answering. The clients share this process, so the
+absolute numbers understate a real deployment.
+Usage: python benchmark_concurrency.py [seconds per level]
+"""
+
+import asyncio
+import sys
+import time
+
+from script_env import serve, use_throwaway_database
+
+use_throwaway_database("concurrency")
+
+import httpx  # noqa: E402
+from app.core.database import SessionLocal  # noqa: E402
+from app.main import app  # noqa: E402
+from app.utils.demo_data import init_demo_data  # noqa: E402
+from migrate import migrate  # noqa: E402
+
+CLIENT_COUNTS = [1, 2, 4, 8, 16, 32]
+
+# (account, path) pairs each client cycles through; {test_id} is the demo live test
+ENDPOINTS = [
+    ("student1", "/api/tests/"),
+    ("student1", "/api/submissions/my-submissions"),
+    ("teacher", "/api/submissions/test/{test_id}"),
+    ("teacher", "/api/monitoring/test/{test_id}/progress"),
+]
+
+PASSWORDS = {"teacher": "teacher123", "student1": "student123"}
+
+async def _client(client, requests, index, deadline, latencies):
+    while time.perf_counter() < deadline:
+        headers, path = requests[index % len(requests)]
+        started = time.perf_counter()
+        response = await client.get(path, headers=headers)
+        if response.status_code != 200:
+            raise SystemExit(f"{path} returned {response.status_code}: {response.text}")
+        latencies.append(time.perf_counter() - started)
+        index += 1
+
+async def _health_probe(client, deadline, latencies):
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        await client.get("/health")
+        latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(0.05)
+
+async def _run(base_url, test_id, seconds):
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        headers = {}
+        for account, password in PASSWORDS.items():
+            response = await client.post("/api/auth/login-json", json={"username": account, "password": password})
+            headers[account] = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        requests = [(headers[account], path.format(test_id=test_id)) for account, path in ENDPOINTS]
+
+        baseline = None
+        for clients in CLIENT_COUNTS:
+            latencies, health = [], []
+            deadline = time.perf_counter() + seconds
+            await asyncio.gather(
+                _health_probe(client, deadline, health),
+                *[_client(client, requests, offset, deadline, latencies) for offset in range(clients)]
+            )
+            throughput = len(latencies) / seconds
+            baseline = baseline or throughput
+            latencies.sort()
+            print(
+                f"{clients:3d} clients: {throughput:7.1f} req/s ({throughput / baseline:4.1f}x)  "
+                f"p50 {latencies[len(latencies) // 2] * 1000:6.1f} ms  "
+                f"p95 {latencies[int(len(latencies) * 0.95)] * 1000:6.1f} ms  "
+                f"/health max {max(health) * 1000:6.1f} ms"
+            )
+
+def benchmark_concurrency(seconds=3.0):
+    migrate()
+    db = SessionLocal()
+    try:
+        _, _, _, tests = init_demo_data(db)
+        test_id = tests[0].id
+    finally:
+        db.close()
+
+    with serve(app) as base_url:
+        asyncio.run(_run(base_url, test_id, seconds))
+
+if __name__ == "__main__":
+    benchmark_concurrency(float(sys.argv[1]) if len(sys.argv) > 1 else 3.0)
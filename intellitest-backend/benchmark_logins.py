@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Concurrent login benchmark
+Signs a class of students in to a local uvicorn server at once and reports
+logins/second, latency and /health responsiveness while bcrypt runs on the
+hash pool. Then sends more simultaneous logins than the pool admits and
+fails unless the excess gets 429 with Retry-After and the rest succeed.
+Usage: python benchmark_logins.py [students]
+"""
+
+import asyncio
+import sys
+import time
+
+from script_env import serve, use_throwaway_database
+
+use_throwaway_database("logins")
+
+import httpx  # noqa: E402
+from app.core.database import SessionLocal  # noqa: E402
+from app.core.security import get_password_hash, password_hasher  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.user import User, UserRole  # noqa: E402
+from migrate import migrate  # noqa: E402
+
+PASSWORD = "student123"
+
+def _seed(count):
+    # One hash shared by every account; verifying it costs the same as distinct ones
+    hashed_password = get_password_hash(PASSWORD)
+    db = SessionLocal()
+    try:
+        db.add_all(
+            User(
+                username=f"login{index}",
+                email=f"login{index}@logins.example.com",
+                hashed_password=hashed_password,
+                full_name=f"Login Student {index}",
+                role=UserRole.STUDENT,
+                class_name="Class A"
+            )
+            for index in range(count)
+        )
+        db.commit()
+    finally:
+        db.close()
+
+async def _login(client, index):
+    started = time.perf_counter()
+    response = await client.post("/api/auth/login-json", json={"username": f"login{index}", "password": PASSWORD})
+    return response, time.perf_counter() - started
+
+async def _health_probe(client, done, latencies):
+    while not done.is_set():
+        started = time.perf_counter()
+        await client.get("/health")
+        latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(0.05)
+
+async def _sign_in_class(client, students):
+    """Students sign in in waves no larger than the pool admits, as a class would"""
+    latencies, health = [], []
+    done = asyncio.Event()
+    probe = asyncio.create_task(_health_probe(client, done, health))
+    started = time.perf_counter()
+    for wave in range(0, students, password_hasher.max_pending):
+        results = await asyncio.gather(*[
+            _login(client, index) for index in range(wave, min(wave + password_hasher.max_pending, students))
+        ])
+        for response, latency in results:
+            if response.status_code != 200:
+                raise SystemExit(f"login returned {response.status_code}: {response.text}")
+            latencies.append(latency)
+    elapsed = time.perf_counter() - started
+    done.set()
+    await probe
+
+    latencies.sort()
+    print(
+        f"{students} logins: {students / elapsed:.1f} logins/s on {password_hasher.workers} hash workers  "
+        f"p50 {latencies[len(latencies) // 2] * 1000:.0f} ms  "
+        f"p95 {latencies[int(len(latencies) * 0.95)] * 1000:.0f} ms  "
+        f"/health max {max(health) * 1000:.0f} ms"
+    )
+
+async def _overload(client):
+    """Fire twice what the pool admits at once; the excess must get 429"""
+    burst = 2 * password_hasher.max_pending
+    results = await asyncio.gather(*[_login(client, index) for index in range(burst)])
+    statuses = [response.status_code for response, _ in results]
+    accepted, shed = statuses.count(200), statuses.count(429)
+    retry_after = all(response.headers.get("Retry-After") for response, _ in results if response.status_code == 429)
+    print(f"{burst} simultaneous logins with room for {password_hasher.max_pending}: {accepted} accepted, {shed} shed with 429")
+
+    failures = []
+    if accepted + shed != burst:
+        failures.append(f"unexpected statuses {sorted(set(statuses) - {200, 429})}")
+    if not shed:
+        failures.append("no login was shed")
+    if not accepted:
+        failures.append("no login was accepted")
+    if not retry_after:
+        failures.append("a 429 came back without Retry-After")
+    for failure in failures:
+        print(f"FAIL  {failure}")
+    return len(failures)
+
+async def _run(base_url, students):
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        await _sign_in_class(client, students)
+        return await _overload(client)
+
+def benchmark_logins(students=100):
+    migrate()
+    _seed(max(students, 2 * password_hasher.max_pending))
+
+    with serve(app) as base_url:
+        return asyncio.run(_run(base_url, students))
+
+if __name__ == "__main__":
+    sys.exit(1 if benchmark_logins(int(sys.argv[1]) if len(sys.argv) > 1 else 100) else 0)
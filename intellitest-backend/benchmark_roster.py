@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Roster import benchmark
+Measures users/second for creating accounts one at a time, the way
+POST /api/users/ does, against the bulk roster import.
+Usage: python benchmark_roster.py [count]
+"""
+
+import os
+import sys
+import time
+
+from script_env import use_throwaway_database
+
+_workdir = use_throwaway_database("roster")
+
+from app.core.database import SessionLocal  # noqa: E402
+from app.core.security import get_password_hash, shutdown_bulk_hashing  # noqa: E402
+from app.models.user import User, UserRole  # noqa: E402
+from app.utils.imports import create_job, import_users  # noqa: E402
+from migrate import migrate  # noqa: E402
+
+def _write_roster(prefix, count):
+    path = os.path.join(_workdir, f"{prefix}.csv")
+    with open(path, "w") as file:
+        file.write("username,email,class\n")
+        for index in range(count):
+            file.write(f"{prefix}{index},{prefix}{index}@bench.example.com,{6 + index % 7}A\n")
+    return path
+
+def _one_at_a_time(db, count):
+    for index in range(count):
+        username, email = f"single{index}", f"single{index}@bench.example.com"
+        # The two uniqueness checks, hash and commit create_user pays per user
+        db.query(User).filter(User.username == username).first()
+        db.query(User).filter(User.email == email).first()
+        db.add(User(
+            username=username,
+            email=email,
+            hashed_password=get_password_hash("student123"),
+            full_name=username,
+            role=UserRole.STUDENT,
+            class_name=f"{6 + index % 7}A"
+        ))
+        db.commit()
+
+def benchmark_roster(count=500):
+    migrate()
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        _one_at_a_time(db, count)
+        single = count / (time.perf_counter() - started)
+        print(f"One at a time: {single:.1f} users/s")
+
+        path = _write_roster("bulk", count)
+        job = create_job(db, "users", "bench.csv", None)
+        started = time.perf_counter()
+        import_users(db, job, path, "csv", None, default_password="student123")
+        bulk = job.inserted_rows / (time.perf_counter() - started)
+        print(f"Bulk import: {bulk:.1f} users/s ({job.inserted_rows} created, {job.error_count} errors)")
+        print(f"Speedup: {bulk / single:.1f}x on {os.cpu_count()} CPUs")
+    finally:
+        db.close()
+        shutdown_bulk_hashing()
+
+if __name__ == "__main__":
+    benchmark_roster(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Submission scoring benchmark
+Posts full answer sheets to POST /api/submissions/ for papers of 10, 100
+and 500 questions and reports the queries and latency per submission.
+Scoring reads the answer key once and inserts every answer in one
+statement, so the query count should not grow with the paper.
+Usage: python benchmark_scoring.py [submissions per paper]
+"""
+
+import statistics
+import sys
+import time
+from datetime import datetime
+
+from script_env import use_throwaway_database
+
+use_throwaway_database("scoring")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from app.core.database import QueryCounter, SessionLocal  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.question import Question  # noqa: E402
+from app.models.test import Test, TestQuestion  # noqa: E402
+from app.models.user import User, UserRole  # noqa: E402
+from migrate import migrate  # noqa: E402
+
+PAPER_SIZES = [10, 100, 500]
+
+def _seed(db, students):
+    """One teacher, enough questions for the largest paper, one live test per
+    paper size, and the students who will submit them"""
+    now = datetime.utcnow()
+    teacher = User(
+        username="teacher", email="teacher@scoring.example.com", hashed_password="unused",
+        full_name="Teacher", role=UserRole.TEACHER
+    )
+    db.add(teacher)
+    db.flush()
+
+    questions = [
+        Question(
+            question_text=f"Scoring question {index}",
+            option_a="one", option_b="two", option_c="three", option_d="four",
+            correct_answer="ABCD"[index % 4],
+            topic="Scoring",
+            created_by=teacher.id,
+            created_at=now
+        )
+        for index in range(max(PAPER_SIZES))
+    ]
+    tests = [
+        Test(name=f"{size} questions", duration_minutes=60, is_live=True, created_by=teacher.id, created_at=now)
+        for size in PAPER_SIZES
+    ]
+    # The extra student warms the answer key and paper caches before each paper is measured
+    users = [
+        User(
+            username=f"scorer{index}", email=f"scorer{index}@scoring.example.com", hashed_password="unused",
+            full_name=f"Scorer {index}", role=UserRole.STUDENT, class_name="Class A"
+        )
+        for index in range(students + 1)
+    ]
+    db.add_all(questions + tests + users)
+    db.flush()
+
+    for test, size in zip(tests, PAPER_SIZES):
+        db.add_all(TestQuestion(test_id=test.id, question_id=question.id, order=order)
+                   for order, question in enumerate(questions[:size], start=1))
+    db.commit()
+    sheets = {
+        test.id: [
+            {"question_id": question.id, "selected_answer": "ABCD"[order % 3]}
+            for order, question in enumerate(questions[:size])
+        ]
+        for test, size in zip(tests, PAPER_SIZES)
+    }
+    return [test.id for test in tests], [user.id for user in users], sheets
+
+def benchmark_scoring(submissions=20):
+    migrate()
+    db = SessionLocal()
+    try:
+        test_ids, student_ids, sheets = _seed(db, submissions)
+    finally:
+        db.close()
+
+    headers = [
+        {"Authorization": f"Bearer {create_access_token({'sub': str(student_id)})}"}
+        for student_id in student_ids
+    ]
+    with TestClient(app) as client:
+        # Load every student into the principal cache so only scoring is counted
+        for student_headers in headers:
+            client.get("/api/submissions/my-submissions?include_answers=false", headers=student_headers)
+        for size, test_id in zip(PAPER_SIZES, test_ids):
+            body = {"test_id": test_id, "answers": sheets[test_id]}
+            client.post("/api/submissions/", json=body, headers=headers[0])
+
+            queries, latencies = [], []
+            for student_headers in headers[1:]:
+                with QueryCounter() as counter:
+                    started = time.perf_counter()
+                    response = client.post("/api/submissions/", json=body, headers=student_headers)
+                    latencies.append(time.perf_counter() - started)
+                if response.status_code != 200:
+                    raise SystemExit(f"{size}-question submission returned {response.status_code}: {response.text}")
+                queries.append(counter.count)
+            print(
+                f"{size:3d} questions: {max(queries):2d} queries  "
+                f"median {statistics.median(latencies) * 1000:6.1f} ms  "
+                f"max {max(latencies) * 1000:6.1f} ms"
+            )
+
+if __name__ == "__main__":
+    benchmark_scoring(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
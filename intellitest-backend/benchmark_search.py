@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Question search benchmark
+Seeds a large question bank and times read_questions?search= through the
+full-text index against the ILIKE filter it replaced, on the same page
+and total queries. The two match differently (the index stems words and
+matches the last one as a prefix), so each row also shows the hit count.
+Usage: python benchmark_search.py [questions]
+"""
+
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+
+from script_env import use_throwaway_database
+
+use_throwaway_database("search")
+
+from fastapi import Response  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+from app.api.questions import read_questions  # noqa: E402
+from app.core.database import SessionLocal  # noqa: E402
+from app.models.question import Question  # noqa: E402
+from app.models.user import User, UserRole  # noqa: E402
+from app.schemas.question import QuestionResponse  # noqa: E402
+from app.utils.cache import Principal  # noqa: E402
+from app.utils.pagination import page_response, paginate, parse_fields  # noqa: E402
+from migrate import migrate  # noqa: E402
+
+WORDS = (
+    "acid angle atom battle cell climate current density energy equation force fraction gravity habitat "
+    "kingdom lens magnet mass matrix molecule motion orbit oxygen planet pressure prime protein ratio "
+    "reaction river seed shadow signal solution speed theorem tissue treaty triangle velocity volcano wave"
+).split()
+
+# Appears in about one question in a thousand
+RARE_WORD = "isotope"
+
+TOPICS = ["Physics", "Chemistry", "Biology", "Mathematics", "History", "Geography"]
+
+# Common and rare words, two words together, and a partly typed word
+SEARCHES = ["energy", RARE_WORD, "planet orbit", "mass velocity force", "molec"]
+
+CHUNK_SIZE = 5000
+
+def _seed(db, count):
+    teacher = User(
+        username="teacher", email="teacher@search.example.com", hashed_password="unused",
+        full_name="Teacher", role=UserRole.TEACHER
+    )
+    db.add(teacher)
+    db.flush()
+
+    rng = random.Random(17)
+    now = datetime.utcnow()
+    for start in range(0, count, CHUNK_SIZE):
+        db.execute(insert(Question), [
+            {
+                "question_text": "What is the " + " ".join(
+                    rng.choices(WORDS, k=8) + ([RARE_WORD] if rng.random() < 0.001 else [])
+                ) + "?",
+                "option_a": rng.choice(WORDS),
+                "option_b": rng.choice(WORDS),
+                "option_c": rng.choice(WORDS),
+                "option_d": rng.choice(WORDS),
+                "correct_answer": rng.choice("ABCD"),
+                "topic": rng.choice(TOPICS),
+                "difficulty_level": rng.choice(["easy", "medium", "hard"]),
+                "created_by": teacher.id,
+                "created_at": now
+            }
+            for _ in range(start, min(start + CHUNK_SIZE, count))
+        ])
+    db.commit()
+    return Principal(teacher.id, UserRole.TEACHER, None, True)
+
+def _ilike_baseline(db, search, limit=100):
+    """read_questions as it filtered before the full-text index"""
+    query = db.query(Question).filter(Question.question_text.ilike(f"%{search}%"))
+    response = Response()
+    page_response(response, paginate(db, query, Question, None, limit, parse_fields(None, QuestionResponse)))
+    return response
+
+def _full_text(db, search, teacher, limit=100):
+    response = Response()
+    read_questions(response, cursor=None, limit=limit, fields=None, topic=None, search=search,
+                   current_user=teacher, db=db)
+    return response
+
+def _time(fn, runs=5):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        response = fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), response.headers.get("X-Total-Count", "?")
+
+def benchmark_search(count=100000):
+    migrate()
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        teacher = _seed(db, count)
+        print(f"Seeded {count} questions in {time.perf_counter() - started:.1f}s")
+
+        for search in SEARCHES:
+            ilike, ilike_hits = _time(lambda: _ilike_baseline(db, search))
+            fts, fts_hits = _time(lambda: _full_text(db, search, teacher))
+            print(
+                f"{search!r:24s} ILIKE {ilike * 1000:8.1f} ms ({ilike_hits} hits)  "
+                f"full-text {fts * 1000:7.1f} ms ({fts_hits} hits)  {ilike / fts:5.1f}x"
+            )
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    benchmark_search(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
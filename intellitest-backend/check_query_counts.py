@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Query count regression check
+Calls the list endpoints on a small and a larger data set and fails when
+any of them issues more queries for more rows, the signature of an N+1
+lazy load during serialization. The larger set is a class of `class size`
+students all submitting one test, which is what the live progress and
+analytics endpoints have to stay flat against. Needs httpx for FastAPI's
+TestClient.
+Usage: python check_query_counts.py [class size]
+"""
+
+import sys
+from datetime import datetime
+
+from script_env import use_throwaway_database
+
+use_throwaway_database("queries")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from app.core.database import QueryCounter, SessionLocal  # noqa: E402
+from app.core.security import get_password_hash  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.user import User, UserRole  # noqa: E402
+from app.models.test import Test, TestQuestion  # noqa: E402
+from app.models.submission import Submission, SubmissionAnswer  # noqa: E402
+from app.utils.demo_data import init_demo_data  # noqa: E402
+from migrate import migrate  # noqa: E402
+
+# (account, path) pairs; {test_id} is the demo live test
+ENDPOINTS = [
+    ("student1", "/api/submissions/my-submissions"),
+    ("student1", "/api/submissions/my-submissions?include_answers=false"),
+    ("student1", "/api/tests/"),
+    ("teacher", "/api/submissions/test/{test_id}"),
+    ("teacher", "/api/submissions/test/{test_id}?include_answers=false"),
+    ("teacher", "/api/tests/"),
+    ("teacher", "/api/tests/{test_id}"),
+    ("teacher", "/api/questions/"),
+    ("teacher", "/api/monitoring/live-tests"),
+    ("teacher", "/api/monitoring/test/{test_id}/progress"),
+    ("teacher", "/api/monitoring/test/{test_id}/analytics"),
+    ("admin", "/api/users/"),
+]
+
+# selectinload sends its IN query in batches of this many parent rows, so
+# one extra query per batch is paging, not an N+1
+SELECTIN_BATCH_SIZE = 500
+
+PASSWORDS = {"admin": "admin123", "teacher": "teacher123", "student1": "student123"}
+
+def _seed(db, start, count, hashed_password, test_id, student_id, question_ids):
+    """Add `count` students who each submit the live test, and `count` live
+    tests that student1 submits, every submission with a full answer sheet"""
+    now = datetime.utcnow()
+    students = [
+        User(
+            username=f"seed{index}",
+            email=f"seed{index}@queries.example.com",
+            hashed_password=hashed_password,
+            full_name=f"Seed Student {index}",
+            role=UserRole.STUDENT,
+            class_name="Class A"
+        )
+        for index in range(start, start + count)
+    ]
+    tests = [
+        Test(
+            name=f"Seed Test {index}",
+            duration_minutes=15,
+            is_live=True,
+            assigned_classes="Class A",
+            created_by=1,
+            created_at=now
+        )
+        for index in range(start, start + count)
+    ]
+    db.add_all(students + tests)
+    db.flush()
+
+    for test in tests:
+        db.add_all(TestQuestion(test_id=test.id, question_id=question_id, order=order)
+                   for order, question_id in enumerate(question_ids, start=1))
+    attempts = [(test_id, student.id) for student in students] + [(test.id, student_id) for test in tests]
+    for attempt_test_id, attempt_student_id in attempts:
+        submission = Submission(
+            test_id=attempt_test_id,
+            student_id=attempt_student_id,
+            started_at=now,
+            submitted_at=now,
+            score=100.0,
+            total_questions=len(question_ids),
+            attempted_questions=len(question_ids)
+        )
+        submission.answers = [
+            SubmissionAnswer(question_id=question_id, selected_answer="A", is_correct="true", answered_at=now)
+            for question_id in question_ids
+        ]
+        db.add(submission)
+    db.commit()
+
+def _measure(client, headers, test_id):
+    counts = {}
+    for account, path in ENDPOINTS:
+        path = path.format(test_id=test_id)
+        # A first call warms the caches, so only steady-state queries are counted
+        client.get(path, headers=headers[account])
+        with QueryCounter() as counter:
+            response = client.get(path, headers=headers[account])
+        if response.status_code != 200:
+            raise SystemExit(f"{path} as {account} returned {response.status_code}: {response.text}")
+        counts[(account, path)] = counter.count
+    return counts
+
+def check_query_counts(small=5, large=50):
+    migrate()
+    db = SessionLocal()
+    try:
+        _, _, questions, tests = init_demo_data(db)
+        test_id = tests[0].id
+        question_ids = [question.id for question in questions[:5]]
+        student_id = db.query(User.id).filter(User.username == "student1").scalar()
+        hashed_password = get_password_hash("student123")
+
+        with TestClient(app) as client:
+            headers = {}
+            for account, password in PASSWORDS.items():
+                response = client.post("/api/auth/login-json", json={"username": account, "password": password})
+                headers[account] = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+            _seed(db, 0, small, hashed_password, test_id, student_id, question_ids)
+            before = _measure(client, headers, test_id)
+            _seed(db, small, large - small, hashed_password, test_id, student_id, question_ids)
+            after = _measure(client, headers, test_id)
+    finally:
+        db.close()
+
+    # Every endpoint lists at most one row per seeded student or test
+    extra_batches = -(-large // SELECTIN_BATCH_SIZE) - -(-small // SELECTIN_BATCH_SIZE)
+    failures = 0
+    for key, count in before.items():
+        grew = after[key] > count + extra_batches
+        failures += grew
+        account, path = key
+        print(f"{'FAIL' if grew else 'ok  '}  {count:3d} -> {after[key]:3d}  {account:9s} {path}")
+    return failures
+
+if __name__ == "__main__":
+    sys.exit(1 if check_query_counts(large=int(sys.argv[1]) if len(sys.argv) > 1 else 50) else 0)
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Query plan regression check
+Runs EXPLAIN QUERY PLAN on the hot-path lookups and fails when any of them
+stops using the index it was given, which shows up as a full table SCAN.
+Usage: python check_query_plans.py
+"""
+
+import sys
+
+from script_env import use_throwaway_database
+
+use_throwaway_database("plans")
+
+from sqlalchemy import text  # noqa: E402
+from app.core.database import SessionLocal  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.models.test import Test, TestClass, TestQuestion  # noqa: E402
+from app.models.submission import Submission, SubmissionAnswer  # noqa: E402
+from app.utils.demo_data import init_demo_data  # noqa: E402
+from migrate import migrate  # noqa: E402
+
+def _lookups(db, test_id, student_id, submission_id):
+    """(description, query, index the plan must use) for each hot-path lookup"""
+    return [
+        (
+            "student test list by class",
+            db.query(Test).join(TestClass).filter(TestClass.class_name == "Class A"),
+            "ix_test_classes_class_name_test_id"
+        ),
+        (
+            "paper questions in order",
+            db.query(TestQuestion.question_id).filter(TestQuestion.test_id == test_id).order_by(TestQuestion.order),
+            "ix_test_questions_test_id_order"
+        ),
+        (
+            "attempt by test and student",
+            db.query(Submission).filter(Submission.test_id == test_id, Submission.student_id == student_id),
+            "uq_submissions_test_id_student_id"
+        ),
+        (
+            "answers of a submission",
+            db.query(SubmissionAnswer).filter(SubmissionAnswer.submission_id == submission_id),
+            "uq_submission_answers_submission_id_question_id"
+        ),
+    ]
+
+def _plan(db, query):
+    sql = str(query.statement.compile(db.get_bind(), compile_kwargs={"literal_binds": True}))
+    return [row[-1] for row in db.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+
+def check_query_plans():
+    migrate()
+    db = SessionLocal()
+    try:
+        _, _, _, tests = init_demo_data(db)
+        student_id = db.query(User.id).filter(User.username == "student1").scalar()
+        db.execute(text("ANALYZE"))
+        failures = 0
+        for description, query, index in _lookups(db, tests[0].id, student_id, 1):
+            plan = _plan(db, query)
+            used = any(index in step for step in plan)
+            failures += not used
+            print(f"{'ok  ' if used else 'FAIL'}  {description} ({index})")
+            for step in plan:
+                print(f"        {step}")
+    finally:
+        db.close()
+    return failures
+
+if __name__ == "__main__":
+    sys.exit(1 if check_query_plans() else 0)
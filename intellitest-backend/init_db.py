@@ -4,15 +4,14 @@ Database initialization script
 Run this script to create the database and populate it with demo data
 """
 
-from sqlalchemy.orm import Session
-from app.core.database import engine, SessionLocal
-from app.models import Base
+from app.core.database import SessionLocal
 from app.utils.demo_data import init_demo_data
+from migrate import migrate
 
 def init_database():
     """Initialize database with tables and demo data"""
-    print("Creating database tables...")
-    Base.metadata.create_all(bind=engine)
+    print("Applying database migrations...")
+    migrate()
     
     print("Creating demo data...")
     db = SessionLocal()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Database migration script
+Run this once per deploy, before the web workers start, to bring the
+schema up to the latest Alembic revision
+"""
+
+import os
+import sys
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect, text
+from app.core.database import engine
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Revision matching the schema that create_all used to build
+BASELINE_REVISION = "0001"
+
+# Arbitrary key for the Postgres advisory lock held while migrating
+MIGRATION_LOCK_KEY = 741_852_963
+
+def get_alembic_config() -> Config:
+    config = Config(os.path.join(BASE_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BASE_DIR, "migrations"))
+    return config
+
+def migrate(revision: str = "head"):
+    """Upgrade the database, stamping pre-migration databases first"""
+    config = get_alembic_config()
+    
+    with engine.connect() as connection:
+        postgresql = connection.dialect.name == "postgresql"
+        if postgresql:
+            # Only one deploy instance migrates at a time, and DDL that cannot
+            # get its lock quickly fails instead of stalling live queries.
+            # Both are session-level so they hold across per-migration commits.
+            connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+            connection.execute(text("SET lock_timeout = '5s'"))
+        tables = inspect(connection).get_table_names()
+        connection.commit()
+        
+        config.attributes["connection"] = connection
+        try:
+            if "alembic_version" not in tables and "users" in tables:
+                print(f"Existing schema has no migration history, stamping {BASELINE_REVISION}...")
+                command.stamp(config, BASELINE_REVISION)
+            
+            command.upgrade(config, revision)
+        finally:
+            if postgresql:
+                connection.rollback()
+                connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+                connection.commit()
+
+if __name__ == "__main__":
+    migrate(sys.argv[1] if len(sys.argv) > 1 else "head")
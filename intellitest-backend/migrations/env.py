@@ -0,0 +1,66 @@
+from logging.config import fileConfig
+from alembic import context
+from app.core.config import settings
+from app.core.database import engine
+from app.models import Base
+from app.utils.search import FTS_TABLE, SEARCH_VECTOR_COLUMN
+
+config = context.config
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+def include_object(object, name, type_, reflected, compare_to):
+    # Full-text search objects are dialect-specific and maintained by
+    # hand-written migrations, so autogenerate must not try to drop them
+    if type_ == "table" and name.startswith(FTS_TABLE):
+        return False
+    if type_ == "column" and name == SEARCH_VECTOR_COLUMN:
+        return False
+    return True
+
+def run_migrations_offline() -> None:
+    """Emit SQL to stdout instead of running against a database"""
+    context.configure(
+        url=settings.database_url,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=settings.database_url.startswith("sqlite"),
+        include_object=include_object,
+        transaction_per_migration=True,
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online() -> None:
+    # Reuse the application's engine so pool settings and SQLite pragmas apply
+    connectable = config.attributes.get("connection") or engine
+
+    if hasattr(connectable, "connect"):
+        with connectable.connect() as connection:
+            _run(connection)
+    else:
+        _run(connectable)
+
+def _run(connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        render_as_batch=connection.dialect.name == "sqlite",
+        include_object=include_object,
+        # Lets a migration step out into an autocommit block, e.g. for
+        # CREATE INDEX CONCURRENTLY, without committing earlier ones early
+        transaction_per_migration=True,
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
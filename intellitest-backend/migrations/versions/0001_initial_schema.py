@@ -0,0 +1,127 @@
+"""Initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2025-01-01 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("username", sa.String(), nullable=False),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("hashed_password", sa.String(), nullable=False),
+        sa.Column("full_name", sa.String(), nullable=False),
+        sa.Column("role", sa.Enum("STUDENT", "TEACHER", "ADMIN", name="userrole"), nullable=False),
+        sa.Column("is_active", sa.Boolean(), nullable=True),
+        sa.Column("class_name", sa.String(), nullable=True),
+        sa.Column("school_name", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_username", "users", ["username"], unique=True)
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "questions",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("question_text", sa.Text(), nullable=False),
+        sa.Column("option_a", sa.String(), nullable=False),
+        sa.Column("option_b", sa.String(), nullable=False),
+        sa.Column("option_c", sa.String(), nullable=False),
+        sa.Column("option_d", sa.String(), nullable=False),
+        sa.Column("correct_answer", sa.String(), nullable=False),
+        sa.Column("topic", sa.String(), nullable=True),
+        sa.Column("difficulty_level", sa.String(), nullable=True),
+        sa.Column("image_url", sa.String(), nullable=True),
+        sa.Column("created_by", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["created_by"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_questions_id", "questions", ["id"])
+
+    op.create_table(
+        "tests",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("duration_minutes", sa.Integer(), nullable=False),
+        sa.Column("is_live", sa.Boolean(), nullable=True),
+        sa.Column("assigned_classes", sa.String(), nullable=True),
+        sa.Column("created_by", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("start_time", sa.DateTime(), nullable=True),
+        sa.Column("end_time", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["created_by"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_tests_id", "tests", ["id"])
+
+    op.create_table(
+        "test_questions",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("test_id", sa.Integer(), nullable=True),
+        sa.Column("question_id", sa.Integer(), nullable=True),
+        sa.Column("order", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["question_id"], ["questions.id"]),
+        sa.ForeignKeyConstraint(["test_id"], ["tests.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_test_questions_id", "test_questions", ["id"])
+
+    op.create_table(
+        "submissions",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("test_id", sa.Integer(), nullable=True),
+        sa.Column("student_id", sa.Integer(), nullable=True),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("submitted_at", sa.DateTime(), nullable=True),
+        sa.Column("score", sa.Float(), nullable=True),
+        sa.Column("total_questions", sa.Integer(), nullable=True),
+        sa.Column("attempted_questions", sa.Integer(), nullable=True),
+        sa.Column("is_auto_submitted", sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(["student_id"], ["users.id"]),
+        sa.ForeignKeyConstraint(["test_id"], ["tests.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_submissions_id", "submissions", ["id"])
+
+    op.create_table(
+        "submission_answers",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("submission_id", sa.Integer(), nullable=True),
+        sa.Column("question_id", sa.Integer(), nullable=True),
+        sa.Column("selected_answer", sa.String(), nullable=True),
+        sa.Column("is_correct", sa.String(), nullable=True),
+        sa.Column("answered_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["question_id"], ["questions.id"]),
+        sa.ForeignKeyConstraint(["submission_id"], ["submissions.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_submission_answers_id", "submission_answers", ["id"])
+
+
+def downgrade() -> None:
+    op.drop_table("submission_answers")
+    op.drop_table("submissions")
+    op.drop_table("test_questions")
+    op.drop_table("tests")
+    op.drop_table("questions")
+    op.drop_table("users")
+    sa.Enum(name="userrole").drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,131 @@
+"""Hot-path indexes and test_classes join table
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2025-01-02 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _split_classes(assigned_classes):
+    names = []
+    for name in (assigned_classes or "").split(","):
+        name = name.strip()
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def _drop_duplicate_attempts(connection):
+    """Keep one submission per student and test before the unique index goes on.
+
+    A double-clicked start could create two rows. The submitted row wins,
+    then the lowest id; the others are deleted with their answers.
+    """
+    groups = connection.execute(sa.text(
+        "SELECT test_id, student_id FROM submissions "
+        "GROUP BY test_id, student_id HAVING COUNT(*) > 1"
+    )).fetchall()
+    duplicate_ids = []
+    for test_id, student_id in groups:
+        attempts = connection.execute(
+            sa.text("SELECT id, submitted_at FROM submissions WHERE test_id = :test_id AND student_id = :student_id"),
+            {"test_id": test_id, "student_id": student_id},
+        ).fetchall()
+        attempts.sort(key=lambda attempt: (attempt.submitted_at is None, attempt.id))
+        duplicate_ids.extend(attempt.id for attempt in attempts[1:])
+    if duplicate_ids:
+        delete_answers = sa.text("DELETE FROM submission_answers WHERE submission_id IN :ids")
+        delete_attempts = sa.text("DELETE FROM submissions WHERE id IN :ids")
+        ids = {"ids": duplicate_ids}
+        connection.execute(delete_answers.bindparams(sa.bindparam("ids", expanding=True)), ids)
+        connection.execute(delete_attempts.bindparams(sa.bindparam("ids", expanding=True)), ids)
+
+
+def upgrade() -> None:
+    test_classes = op.create_table(
+        "test_classes",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("test_id", sa.Integer(), nullable=False),
+        sa.Column("class_name", sa.String(), nullable=False),
+        sa.ForeignKeyConstraint(["test_id"], ["tests.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_test_classes_id", "test_classes", ["id"])
+    op.create_index("uq_test_classes_test_id_class_name", "test_classes", ["test_id", "class_name"], unique=True)
+    op.create_index("ix_test_classes_class_name_test_id", "test_classes", ["class_name", "test_id"])
+
+    # Move the comma-separated assignments into rows, then drop the column
+    connection = op.get_bind()
+    rows = connection.execute(
+        sa.text("SELECT id, assigned_classes FROM tests WHERE assigned_classes IS NOT NULL")
+    ).fetchall()
+    class_rows = [
+        {"test_id": test_id, "class_name": name}
+        for test_id, assigned_classes in rows
+        for name in _split_classes(assigned_classes)
+    ]
+    if class_rows:
+        op.bulk_insert(test_classes, class_rows)
+
+    with op.batch_alter_table("tests") as batch_op:
+        batch_op.drop_column("assigned_classes")
+
+    op.create_index("ix_tests_is_live", "tests", ["is_live"])
+    op.create_index("ix_test_questions_test_id_order", "test_questions", ["test_id", "order"])
+    op.create_index("ix_test_questions_question_id", "test_questions", ["question_id"])
+    op.create_index("ix_submissions_student_id", "submissions", ["student_id"])
+    _drop_duplicate_attempts(connection)
+    op.create_index("uq_submissions_test_id_student_id", "submissions", ["test_id", "student_id"], unique=True)
+
+    # Older clients could post the same question twice; keep the latest answer
+    op.execute(
+        "DELETE FROM submission_answers WHERE id NOT IN ("
+        "SELECT MAX(id) FROM submission_answers GROUP BY submission_id, question_id)"
+    )
+    op.create_index(
+        "uq_submission_answers_submission_id_question_id",
+        "submission_answers",
+        ["submission_id", "question_id"],
+        unique=True,
+    )
+    op.create_index("ix_submission_answers_question_id", "submission_answers", ["question_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_submission_answers_question_id", table_name="submission_answers")
+    op.drop_index("uq_submission_answers_submission_id_question_id", table_name="submission_answers")
+    op.drop_index("uq_submissions_test_id_student_id", table_name="submissions")
+    op.drop_index("ix_submissions_student_id", table_name="submissions")
+    op.drop_index("ix_test_questions_question_id", table_name="test_questions")
+    op.drop_index("ix_test_questions_test_id_order", table_name="test_questions")
+    op.drop_index("ix_tests_is_live", table_name="tests")
+
+    with op.batch_alter_table("tests") as batch_op:
+        batch_op.add_column(sa.Column("assigned_classes", sa.String(), nullable=True))
+
+    connection = op.get_bind()
+    rows = connection.execute(
+        sa.text("SELECT test_id, class_name FROM test_classes ORDER BY id")
+    ).fetchall()
+    assigned = {}
+    for test_id, class_name in rows:
+        assigned.setdefault(test_id, []).append(class_name)
+    for test_id, names in assigned.items():
+        connection.execute(
+            sa.text("UPDATE tests SET assigned_classes = :classes WHERE id = :id"),
+            {"classes": ",".join(names), "id": test_id},
+        )
+
+    op.drop_table("test_classes")
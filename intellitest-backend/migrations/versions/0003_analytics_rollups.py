@@ -0,0 +1,100 @@
+"""Analytics rollup tables
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2025-01-03 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SCORED = "s.submitted_at IS NOT NULL AND s.score IS NOT NULL"
+
+
+def upgrade() -> None:
+    op.create_table(
+        "test_rollups",
+        sa.Column("test_id", sa.Integer(), nullable=False),
+        sa.Column("attempt_count", sa.Integer(), nullable=False),
+        sa.Column("submission_count", sa.Integer(), nullable=False),
+        sa.Column("score_sum", sa.Float(), nullable=False),
+        sa.Column("score_sq_sum", sa.Float(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["test_id"], ["tests.id"]),
+        sa.PrimaryKeyConstraint("test_id"),
+    )
+    op.create_table(
+        "test_score_rollups",
+        sa.Column("test_id", sa.Integer(), nullable=False),
+        sa.Column("score", sa.Float(), nullable=False),
+        sa.Column("submission_count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["test_id"], ["tests.id"]),
+        sa.PrimaryKeyConstraint("test_id", "score"),
+    )
+    op.create_table(
+        "question_rollups",
+        sa.Column("test_id", sa.Integer(), nullable=False),
+        sa.Column("question_id", sa.Integer(), nullable=False),
+        sa.Column("answered", sa.Integer(), nullable=False),
+        sa.Column("correct", sa.Integer(), nullable=False),
+        sa.Column("option_a", sa.Integer(), nullable=False),
+        sa.Column("option_b", sa.Integer(), nullable=False),
+        sa.Column("option_c", sa.Integer(), nullable=False),
+        sa.Column("option_d", sa.Integer(), nullable=False),
+        sa.Column("correct_score_sum", sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(["question_id"], ["questions.id"]),
+        sa.ForeignKeyConstraint(["test_id"], ["tests.id"]),
+        sa.PrimaryKeyConstraint("test_id", "question_id"),
+    )
+
+    # Backfill from existing submissions; rebuild_analytics.py does the same per test
+    op.execute(
+        "INSERT INTO test_rollups "
+        "(test_id, attempt_count, submission_count, score_sum, score_sq_sum, updated_at) "
+        "SELECT s.test_id, COUNT(s.id), "
+        f"SUM(CASE WHEN {SCORED} THEN 1 ELSE 0 END), "
+        f"COALESCE(SUM(CASE WHEN {SCORED} THEN s.score END), 0), "
+        f"COALESCE(SUM(CASE WHEN {SCORED} THEN s.score * s.score END), 0), "
+        "CURRENT_TIMESTAMP "
+        "FROM submissions s JOIN tests t ON t.id = s.test_id "
+        "GROUP BY s.test_id"
+    )
+    op.execute(
+        "INSERT INTO test_score_rollups (test_id, score, submission_count) "
+        "SELECT s.test_id, s.score, COUNT(*) "
+        "FROM submissions s JOIN tests t ON t.id = s.test_id "
+        f"WHERE {SCORED} "
+        "GROUP BY s.test_id, s.score"
+    )
+    op.execute(
+        "INSERT INTO question_rollups "
+        "(test_id, question_id, answered, correct, option_a, option_b, option_c, option_d, correct_score_sum) "
+        "SELECT s.test_id, a.question_id, COUNT(a.selected_answer), "
+        "SUM(CASE WHEN a.is_correct = 'true' THEN 1 ELSE 0 END), "
+        "SUM(CASE WHEN a.selected_answer = 'A' THEN 1 ELSE 0 END), "
+        "SUM(CASE WHEN a.selected_answer = 'B' THEN 1 ELSE 0 END), "
+        "SUM(CASE WHEN a.selected_answer = 'C' THEN 1 ELSE 0 END), "
+        "SUM(CASE WHEN a.selected_answer = 'D' THEN 1 ELSE 0 END), "
+        "COALESCE(SUM(CASE WHEN a.is_correct = 'true' THEN s.score END), 0) "
+        "FROM submission_answers a "
+        "JOIN submissions s ON s.id = a.submission_id "
+        "JOIN tests t ON t.id = s.test_id "
+        "JOIN questions q ON q.id = a.question_id "
+        f"WHERE {SCORED} "
+        "GROUP BY s.test_id, a.question_id"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("question_rollups")
+    op.drop_table("test_score_rollups")
+    op.drop_table("test_rollups")
@@ -0,0 +1,110 @@
+"""Full-text search over questions
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2025-01-04 00:00:00
+
+SQLite gets an external-content FTS5 table kept in sync by triggers.
+Batch migrations that recreate the questions table drop those triggers,
+so such a migration must recreate them.
+
+PostgreSQL gets a tsvector column maintained by a trigger and a GIN index.
+The column is added without a default and backfilled in batches, and the
+index is built concurrently, so the table stays writable throughout.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 5000
+
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce({row}question_text, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce({row}topic, '')), 'B')"
+)
+
+
+def _upgrade_sqlite() -> None:
+    op.execute(
+        "CREATE VIRTUAL TABLE questions_fts USING fts5("
+        "question_text, topic, content='questions', content_rowid='id', "
+        "tokenize='porter unicode61')"
+    )
+    op.execute(
+        "CREATE TRIGGER questions_fts_insert AFTER INSERT ON questions BEGIN "
+        "INSERT INTO questions_fts(rowid, question_text, topic) "
+        "VALUES (new.id, new.question_text, new.topic); END"
+    )
+    op.execute(
+        "CREATE TRIGGER questions_fts_delete AFTER DELETE ON questions BEGIN "
+        "INSERT INTO questions_fts(questions_fts, rowid, question_text, topic) "
+        "VALUES ('delete', old.id, old.question_text, old.topic); END"
+    )
+    op.execute(
+        "CREATE TRIGGER questions_fts_update AFTER UPDATE OF question_text, topic ON questions BEGIN "
+        "INSERT INTO questions_fts(questions_fts, rowid, question_text, topic) "
+        "VALUES ('delete', old.id, old.question_text, old.topic); "
+        "INSERT INTO questions_fts(rowid, question_text, topic) "
+        "VALUES (new.id, new.question_text, new.topic); END"
+    )
+    op.execute("INSERT INTO questions_fts(questions_fts) VALUES ('rebuild')")
+    # Rank matches in the question text above matches in the topic
+    op.execute("INSERT INTO questions_fts(questions_fts, rank) VALUES ('rank', 'bm25(10.0, 2.0)')")
+
+
+def _upgrade_postgresql() -> None:
+    op.execute("ALTER TABLE questions ADD COLUMN search_vector tsvector")
+    op.execute(
+        "CREATE FUNCTION questions_search_vector_update() RETURNS trigger AS $$ "
+        f"BEGIN NEW.search_vector := {SEARCH_VECTOR.format(row='NEW.')}; RETURN NEW; END "
+        "$$ LANGUAGE plpgsql"
+    )
+    op.execute(
+        "CREATE TRIGGER questions_search_vector_update "
+        "BEFORE INSERT OR UPDATE OF question_text, topic ON questions "
+        "FOR EACH ROW EXECUTE FUNCTION questions_search_vector_update()"
+    )
+
+    with op.get_context().autocommit_block():
+        connection = op.get_bind()
+        while True:
+            # Short transactions so live writes never wait on a full-table UPDATE
+            result = connection.exec_driver_sql(
+                f"UPDATE questions SET search_vector = {SEARCH_VECTOR.format(row='')} "
+                "WHERE id IN (SELECT id FROM questions WHERE search_vector IS NULL "
+                f"LIMIT {BACKFILL_BATCH_SIZE})"
+            )
+            if result.rowcount < BACKFILL_BATCH_SIZE:
+                break
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_questions_search_vector "
+            "ON questions USING gin (search_vector)"
+        )
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        _upgrade_sqlite()
+    elif dialect == "postgresql":
+        _upgrade_postgresql()
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "sqlite":
+        for trigger in ("questions_fts_insert", "questions_fts_delete", "questions_fts_update"):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS questions_fts")
+    elif dialect == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_questions_search_vector")
+        op.execute("DROP TRIGGER IF EXISTS questions_search_vector_update ON questions")
+        op.execute("DROP FUNCTION IF EXISTS questions_search_vector_update()")
+        op.execute("ALTER TABLE questions DROP COLUMN IF EXISTS search_vector")
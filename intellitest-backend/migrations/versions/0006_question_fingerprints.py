@@ -0,0 +1,52 @@
+"""Near-duplicate question index
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2025-01-06 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.dedupe import document_of, index_questions
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH = 1000
+
+
+def upgrade() -> None:
+    op.create_table(
+        "question_fingerprints",
+        sa.Column("question_id", sa.Integer(), nullable=False),
+        sa.Column("band", sa.Integer(), nullable=False),
+        sa.Column("bucket", sa.BigInteger(), nullable=False),
+        sa.ForeignKeyConstraint(["question_id"], ["questions.id"]),
+        sa.PrimaryKeyConstraint("question_id", "band"),
+    )
+    op.create_index("ix_question_fingerprints_band_bucket", "question_fingerprints", ["band", "bucket"])
+
+    # Existing questions are fingerprinted in id order, one batch per round trip
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(sa.text(
+            "SELECT id, question_text, option_a, option_b, option_c, option_d FROM questions "
+            "WHERE id > :last_id ORDER BY id LIMIT :batch"
+        ), {"last_id": last_id, "batch": BACKFILL_BATCH}).all()
+        if not rows:
+            break
+        index_questions(bind, [(row.id, document_of(row)) for row in rows])
+        last_id = rows[-1].id
+
+
+def downgrade() -> None:
+    op.drop_index("ix_question_fingerprints_band_bucket", table_name="question_fingerprints")
+    op.drop_table("question_fingerprints")
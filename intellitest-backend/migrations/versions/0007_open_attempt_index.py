@@ -0,0 +1,36 @@
+"""Open-attempt index for the deadline scheduler
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2025-01-07 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+OPEN_ATTEMPTS = sa.text("submitted_at IS NULL")
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        # Built without locking submissions against writes during a live test
+        with op.get_context().autocommit_block():
+            op.create_index(
+                "ix_submissions_open_test_id", "submissions", ["test_id"],
+                postgresql_where=OPEN_ATTEMPTS, postgresql_concurrently=True
+            )
+    else:
+        op.create_index("ix_submissions_open_test_id", "submissions", ["test_id"], sqlite_where=OPEN_ATTEMPTS)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_submissions_open_test_id", table_name="submissions")
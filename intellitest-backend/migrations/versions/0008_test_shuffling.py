@@ -0,0 +1,30 @@
+"""Per-student question and option shuffling
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2025-01-08 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: Union[str, None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # A constant server default adds the columns without rewriting the table
+    op.add_column("tests", sa.Column("shuffle_questions", sa.Boolean(), nullable=False, server_default=sa.false()))
+    op.add_column("tests", sa.Column("shuffle_options", sa.Boolean(), nullable=False, server_default=sa.false()))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("tests") as batch_op:
+        batch_op.drop_column("shuffle_options")
+        batch_op.drop_column("shuffle_questions")
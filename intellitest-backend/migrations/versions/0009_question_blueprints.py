@@ -0,0 +1,40 @@
+"""Blueprint tests and the topic/difficulty sampling index
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2025-01-09 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0009"
+down_revision: Union[str, None] = "0008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEX_COLUMNS = ["topic", "difficulty_level", "id"]
+
+
+def upgrade() -> None:
+    op.add_column("tests", sa.Column("blueprint", sa.JSON(), nullable=True))
+
+    if op.get_bind().dialect.name == "postgresql":
+        # Built without blocking question bank writes
+        with op.get_context().autocommit_block():
+            op.create_index(
+                "ix_questions_topic_difficulty_level_id", "questions", INDEX_COLUMNS,
+                postgresql_concurrently=True
+            )
+    else:
+        op.create_index("ix_questions_topic_difficulty_level_id", "questions", INDEX_COLUMNS)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_questions_topic_difficulty_level_id", table_name="questions")
+    with op.batch_alter_table("tests") as batch_op:
+        batch_op.drop_column("blueprint")
@@ -0,0 +1,94 @@
+"""Upper-case answer keys and historic answers
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2025-01-10 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0010"
+down_revision: Union[str, None] = "0009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SCORED = "s.submitted_at IS NOT NULL AND s.score IS NOT NULL"
+
+# An answer's mark against the upper-cased key
+MATCHES = "UPPER(a.selected_answer) = UPPER(q.correct_answer)"
+
+
+def upgrade() -> None:
+    # Submissions with an answer the case-sensitive comparison got wrong are
+    # rescored first, while the stale marks still show which ones they are
+    op.execute(
+        "UPDATE submissions SET score = 100.0 * ("
+        "SELECT COUNT(*) FROM submission_answers a JOIN questions q ON q.id = a.question_id "
+        f"WHERE a.submission_id = submissions.id AND {MATCHES}"
+        ") / COALESCE(NULLIF(total_questions, 0), "
+        "(SELECT NULLIF(COUNT(*), 0) FROM submission_answers a WHERE a.submission_id = submissions.id)) "
+        "WHERE submitted_at IS NOT NULL AND id IN ("
+        "SELECT a.submission_id FROM submission_answers a JOIN questions q ON q.id = a.question_id "
+        "WHERE a.selected_answer IS NOT NULL AND a.is_correct IS NOT NULL "
+        f"AND a.is_correct <> CASE WHEN {MATCHES} THEN 'true' ELSE 'false' END)"
+    )
+    op.execute(
+        "UPDATE submission_answers SET is_correct = CASE WHEN UPPER(selected_answer) = ("
+        "SELECT UPPER(q.correct_answer) FROM questions q WHERE q.id = submission_answers.question_id"
+        ") THEN 'true' ELSE 'false' END "
+        "WHERE selected_answer IS NOT NULL AND is_correct IS NOT NULL"
+    )
+    op.execute("UPDATE questions SET correct_answer = UPPER(correct_answer) WHERE correct_answer IN ('a', 'b', 'c', 'd')")
+    op.execute(
+        "UPDATE submission_answers SET selected_answer = UPPER(selected_answer) "
+        "WHERE selected_answer IN ('a', 'b', 'c', 'd')"
+    )
+
+    # The rollups counted only upper-case options and the old marks; rebuild
+    # them the way 0003 backfilled them
+    for table in ("question_rollups", "test_score_rollups", "test_rollups"):
+        op.execute(f"DELETE FROM {table}")
+    op.execute(
+        "INSERT INTO test_rollups "
+        "(test_id, attempt_count, submission_count, score_sum, score_sq_sum, updated_at) "
+        "SELECT s.test_id, COUNT(s.id), "
+        f"SUM(CASE WHEN {SCORED} THEN 1 ELSE 0 END), "
+        f"COALESCE(SUM(CASE WHEN {SCORED} THEN s.score END), 0), "
+        f"COALESCE(SUM(CASE WHEN {SCORED} THEN s.score * s.score END), 0), "
+        "CURRENT_TIMESTAMP "
+        "FROM submissions s JOIN tests t ON t.id = s.test_id "
+        "GROUP BY s.test_id"
+    )
+    op.execute(
+        "INSERT INTO test_score_rollups (test_id, score, submission_count) "
+        "SELECT s.test_id, s.score, COUNT(*) "
+        "FROM submissions s JOIN tests t ON t.id = s.test_id "
+        f"WHERE {SCORED} "
+        "GROUP BY s.test_id, s.score"
+    )
+    op.execute(
+        "INSERT INTO question_rollups "
+        "(test_id, question_id, answered, correct, option_a, option_b, option_c, option_d, correct_score_sum) "
+        "SELECT s.test_id, a.question_id, COUNT(a.selected_answer), "
+        "SUM(CASE WHEN a.is_correct = 'true' THEN 1 ELSE 0 END), "
+        "SUM(CASE WHEN a.selected_answer = 'A' THEN 1 ELSE 0 END), "
+        "SUM(CASE WHEN a.selected_answer = 'B' THEN 1 ELSE 0 END), "
+        "SUM(CASE WHEN a.selected_answer = 'C' THEN 1 ELSE 0 END), "
+        "SUM(CASE WHEN a.selected_answer = 'D' THEN 1 ELSE 0 END), "
+        "COALESCE(SUM(CASE WHEN a.is_correct = 'true' THEN s.score END), 0) "
+        "FROM submission_answers a "
+        "JOIN submissions s ON s.id = a.submission_id "
+        "JOIN tests t ON t.id = s.test_id "
+        "JOIN questions q ON q.id = a.question_id "
+        f"WHERE {SCORED} "
+        "GROUP BY s.test_id, a.question_id"
+    )
+
+
+def downgrade() -> None:
+    # The original letter case is not kept
+    pass
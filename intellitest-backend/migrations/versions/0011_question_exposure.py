@@ -0,0 +1,47 @@
+"""Per-question exposure counts in the analytics rollups
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2025-01-11 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0011"
+down_revision: Union[str, None] = "0010"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("question_rollups", sa.Column("exposed", sa.Integer(), nullable=False, server_default="0"))
+    op.add_column("question_rollups", sa.Column("exposed_score_sum", sa.Float(), nullable=False, server_default="0"))
+
+    # Until now every scored student was shown every question on the test.
+    # Tests drawn from a blueprint pool are better recounted afterwards with
+    # rebuild_analytics.py, which knows which students saw which question.
+    op.execute(
+        "INSERT INTO question_rollups "
+        "(test_id, question_id, answered, correct, option_a, option_b, option_c, option_d, correct_score_sum) "
+        "SELECT tq.test_id, tq.question_id, 0, 0, 0, 0, 0, 0, 0 "
+        "FROM test_questions tq JOIN test_rollups r ON r.test_id = tq.test_id "
+        "WHERE r.submission_count > 0 AND NOT EXISTS ("
+        "SELECT 1 FROM question_rollups q WHERE q.test_id = tq.test_id AND q.question_id = tq.question_id)"
+    )
+    op.execute(
+        "UPDATE question_rollups SET "
+        "exposed = (SELECT r.submission_count FROM test_rollups r WHERE r.test_id = question_rollups.test_id), "
+        "exposed_score_sum = (SELECT r.score_sum FROM test_rollups r WHERE r.test_id = question_rollups.test_id) "
+        "WHERE EXISTS (SELECT 1 FROM test_rollups r WHERE r.test_id = question_rollups.test_id)"
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("question_rollups") as batch_op:
+        batch_op.drop_column("exposed_score_sum")
+        batch_op.drop_column("exposed")
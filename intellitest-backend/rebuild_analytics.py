@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+Analytics rollup rebuild script
+Recomputes the per-test and per-question rollups from raw submissions.
+Pass test ids to rebuild only those tests; with no arguments every test
+is rebuilt. Run it while the tests being rebuilt are not taking submissions.
+"""
+
+import sys
+from app.core.database import SessionLocal
+from app.models.test import Test
+from app.utils.analytics import rebuild_rollups
+
+def rebuild_analytics(test_ids=None):
+    db = SessionLocal()
+    try:
+        if not test_ids:
+            test_ids = [test_id for (test_id,) in db.query(Test.id).order_by(Test.id).all()]
+        
+        for test_id in test_ids:
+            # One transaction per test keeps locks short on a large backfill
+            rebuild_rollups(db, test_id)
+            db.commit()
+            print(f"Rebuilt analytics for test {test_id}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    rebuild_analytics([int(arg) for arg in sys.argv[1:]])
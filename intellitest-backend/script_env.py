@@ -0,0 +1,45 @@
+"""
+Shared setup for the benchmark and check scripts: a throwaway SQLite
+database in place of the configured one, and a local API server.
+"""
+
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+def use_throwaway_database(name: str) -> str:
+    """Point DATABASE_URL at a new SQLite file and return its directory.
+
+    Settings are read once on import, so this must run before anything
+    under `app` is imported.
+    """
+    if "app.core.config" in sys.modules:
+        raise RuntimeError("use_throwaway_database() must run before the app is imported")
+    workdir = tempfile.mkdtemp(prefix=f"intellitest-{name}-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{workdir}/{name}.db"
+    return workdir
+
+@contextmanager
+def serve(app):
+    """Run the app with uvicorn on a free local port and yield its base URL"""
+    import uvicorn
+
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    try:
+        while not server.started:
+            if not thread.is_alive():
+                raise RuntimeError("uvicorn exited before it started serving")
+            time.sleep(0.05)
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        thread.join()
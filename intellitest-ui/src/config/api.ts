@@ -16,11 +16,16 @@ export const API_ENDPOINTS = {
   
   // Submissions
   SUBMISSIONS: '/api/submissions',
+  START_SUBMISSION: '/api/submissions/start',
+  SUBMISSION_ANSWERS: (submissionId: number) => `/api/submissions/${submissionId}/answers`,
+  FINALIZE_SUBMISSION: (submissionId: number) => `/api/submissions/${submissionId}/finalize`,
   MY_SUBMISSIONS: '/api/submissions/my-submissions',
   TEST_SUBMISSIONS: (testId: number) => `/api/submissions/test/${testId}`,
   
   // Monitoring
   LIVE_TESTS: '/api/monitoring/live-tests',
   TEST_PROGRESS: (testId: number) => `/api/monitoring/test/${testId}/progress`,
+  TEST_PROGRESS_STREAM: (testId: number) => `/api/monitoring/test/${testId}/stream`,
+  TEST_PROGRESS_EVENTS: (testId: number) => `/api/monitoring/test/${testId}/events`,
   TEST_ANALYTICS: (testId: number) => `/api/monitoring/test/${testId}/analytics`,
 } as const;
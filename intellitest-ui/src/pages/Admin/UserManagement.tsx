@@ -31,7 +31,6 @@ export function UserManagement() {
   const fetchUsers = async () => {
     try {
       const data = await apiClient.get<User[]>(API_ENDPOINTS.USERS, {
-        skip: '0',
         limit: '1000'
       });
       setUsers(data);
@@ -18,7 +18,7 @@ export function StudentDashboard() {
       try {
         const [testsData, submissionsData] = await Promise.all([
           apiClient.get<Test[]>(API_ENDPOINTS.TESTS, { is_live: 'true' }),
-          apiClient.get<Submission[]>(API_ENDPOINTS.MY_SUBMISSIONS)
+          apiClient.get<Submission[]>(API_ENDPOINTS.MY_SUBMISSIONS, { include_answers: 'false' })
         ]);
         setTests(testsData);
         setSubmissions(submissionsData);
@@ -1,9 +1,9 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
 import { CheckCircle, Clock, AlertTriangle } from 'lucide-react';
 import { apiClient } from '../../utils/api';
 import { API_ENDPOINTS } from '../../config/api';
-import { Test, TestAnswer } from '../../types';
+import { Submission, Test, TestAnswer } from '../../types';
 import { Timer } from '../../components/Common/Timer';
 import { LoadingSpinner } from '../../components/Common/LoadingSpinner';
 
@@ -16,6 +16,10 @@ export function TestPage() {
   const [submitting, setSubmitting] = useState(false);
   const [showConfirm, setShowConfirm] = useState(false);
   const [testStarted, setTestStarted] = useState(false);
+  const [submissionId, setSubmissionId] = useState<number | null>(null);
+  // Refs, not state, so a submit fired by the timer sees the latest saves
+  const pendingSaves = useRef<Set<Promise<unknown>>>(new Set());
+  const autosaveFailed = useRef(false);
 
   useEffect(() => {
     const fetchTest = async () => {
@@ -35,8 +39,36 @@ export function TestPage() {
     fetchTest();
   }, [testId, navigate]);
 
+  const handleStart = async () => {
+    if (!test) return;
+
+    try {
+      const submission = await apiClient.post<Submission>(API_ENDPOINTS.START_SUBMISSION, {
+        test_id: test.id
+      });
+      setSubmissionId(submission.id);
+    } catch (error) {
+      // Without an attempt the answers are still sent in full on submit
+      console.error('Failed to start attempt:', error);
+    }
+    setTestStarted(true);
+  };
+
   const handleAnswerChange = (questionId: number, answer: string) => {
     setAnswers(prev => ({ ...prev, [questionId]: answer }));
+
+    // Autosave each choice so the final submit only has to score
+    if (submissionId !== null) {
+      const save = apiClient.patch(API_ENDPOINTS.SUBMISSION_ANSWERS(submissionId), {
+        question_id: questionId,
+        selected_answer: answer
+      }).catch(error => {
+        console.error('Failed to save answer:', error);
+        autosaveFailed.current = true;
+      });
+      pendingSaves.current.add(save);
+      save.finally(() => pendingSaves.current.delete(save));
+    }
   };
 
   const handleSubmit = async () => {
@@ -44,15 +76,24 @@ export function TestPage() {
 
     setSubmitting(true);
     try {
-      const testAnswers: TestAnswer[] = (test.questions || []).map(question => ({
-        question_id: question.id,
-        selected_answer: (answers[question.id] as 'a' | 'b' | 'c' | 'd') || null
-      }));
+      // A save still in flight would land after the attempt is closed
+      await Promise.allSettled(Array.from(pendingSaves.current));
 
-      await apiClient.post(API_ENDPOINTS.SUBMISSIONS, {
-        test_id: test.id,
-        answers: testAnswers
-      });
+      if (submissionId !== null && !autosaveFailed.current) {
+        await apiClient.post(API_ENDPOINTS.FINALIZE_SUBMISSION(submissionId));
+      } else {
+        const testAnswers: TestAnswer[] = (test.questions || []).map(question => ({
+          question_id: question.id,
+          selected_answer: (answers[question.id] as 'A' | 'B' | 'C' | 'D') || null
+        }));
+
+        // Posting the full sheet merges any answers whose autosave was lost
+        // into the open attempt before it is scored
+        await apiClient.post(API_ENDPOINTS.SUBMISSIONS, {
+          test_id: test.id,
+          answers: testAnswers
+        });
+      }
 
       navigate('/results');
     } catch (error) {
@@ -105,7 +146,7 @@ export function TestPage() {
             )}
             {!testStarted && (
               <button
-                onClick={() => setTestStarted(true)}
+                onClick={handleStart}
                 className="px-6 py-2 bg-green-600 text-white rounded-lg hover:bg-green-700 transition-colors font-medium"
               >
                 Start Test
@@ -159,10 +200,10 @@ export function TestPage() {
 
                     <div className="space-y-3">
                       {[
-                        { key: 'a', text: question.option_a },
-                        { key: 'b', text: question.option_b },
-                        { key: 'c', text: question.option_c },
-                        { key: 'd', text: question.option_d }
+                        { key: 'A', text: question.option_a },
+                        { key: 'B', text: question.option_b },
+                        { key: 'C', text: question.option_c },
+                        { key: 'D', text: question.option_d }
                       ].map(option => (
                         <label
                           key={option.key}
@@ -190,7 +231,7 @@ export function TestPage() {
                             )}
                           </div>
                           <span className="font-medium text-gray-700 mr-2">
-                            {option.key.toUpperCase()}.
+                            {option.key}.
                           </span>
                           <span className="text-gray-700">{option.text}</span>
                         </label>
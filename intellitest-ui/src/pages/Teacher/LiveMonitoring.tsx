@@ -1,8 +1,8 @@
 import React, { useState, useEffect } from 'react';
 import { Monitor, Users, Clock, CheckCircle, AlertCircle } from 'lucide-react';
 import { apiClient } from '../../utils/api';
-import { API_ENDPOINTS } from '../../config/api';
-import { Test, TestProgress } from '../../types';
+import { API_BASE_URL, API_ENDPOINTS } from '../../config/api';
+import { Test, TestProgress, TestProgressEvent } from '../../types';
 import { LoadingSpinner } from '../../components/Common/LoadingSpinner';
 
 export function LiveMonitoring() {
@@ -10,21 +10,62 @@ export function LiveMonitoring() {
   const [selectedTest, setSelectedTest] = useState<Test | null>(null);
   const [progress, setProgress] = useState<TestProgress[]>([]);
   const [loading, setLoading] = useState(true);
-  const [refreshing, setRefreshing] = useState(false);
+  const [connected, setConnected] = useState(false);
 
   useEffect(() => {
     fetchLiveTests();
   }, []);
 
   useEffect(() => {
-    if (selectedTest) {
-      fetchTestProgress(selectedTest.id);
-      const interval = setInterval(() => {
-        fetchTestProgress(selectedTest.id, true);
-      }, 5000); // Refresh every 5 seconds
+    if (!selectedTest) return;
 
-      return () => clearInterval(interval);
+    // Progress is pushed by the server: a snapshot on connect, then one
+    // event per student whenever their answers or submission change.
+    const token = localStorage.getItem('access_token') || '';
+    const query = `?token=${encodeURIComponent(token)}`;
+    let closed = false;
+    let socket: WebSocket | null = null;
+    let events: EventSource | null = null;
+
+    const handleEvent = (raw: string) => {
+      const event: TestProgressEvent = JSON.parse(raw);
+      if (event.type === 'snapshot') {
+        setProgress(event.students);
+      } else if (event.type === 'student') {
+        setProgress(prev => {
+          const others = prev.filter(p => p.student_id !== event.student.student_id);
+          return [...others, event.student];
+        });
+      } else if (event.type === 'resync') {
+        fetchTestProgress(selectedTest.id);
+      }
+      setConnected(true);
+    };
+
+    const openEventSource = () => {
+      events = new EventSource(`${API_BASE_URL}${API_ENDPOINTS.TEST_PROGRESS_EVENTS(selectedTest.id)}${query}`);
+      events.onmessage = (message) => handleEvent(message.data);
+      events.onerror = () => setConnected(false);
+    };
+
+    if ('WebSocket' in window) {
+      const wsBase = API_BASE_URL.replace(/^http/, 'ws');
+      socket = new WebSocket(`${wsBase}${API_ENDPOINTS.TEST_PROGRESS_STREAM(selectedTest.id)}${query}`);
+      socket.onmessage = (message) => handleEvent(message.data);
+      socket.onclose = () => {
+        setConnected(false);
+        // Fall back to SSE when the WebSocket is refused or dropped by a proxy
+        if (!closed && !events) openEventSource();
+      };
+    } else {
+      openEventSource();
     }
+
+    return () => {
+      closed = true;
+      socket?.close();
+      events?.close();
+    };
   }, [selectedTest]);
 
   const fetchLiveTests = async () => {
@@ -41,39 +82,27 @@ export function LiveMonitoring() {
     }
   };
 
-  const fetchTestProgress = async (testId: number, isRefresh = false) => {
-    if (isRefresh) {
-      setRefreshing(true);
-    }
-
+  const fetchTestProgress = async (testId: number) => {
     try {
-      const data = await apiClient.get<TestProgress[]>(API_ENDPOINTS.TEST_PROGRESS(testId));
-      // Ensure data is always an array
-      setProgress(Array.isArray(data) ? data : []);
+      const data = await apiClient.get<{ students: TestProgress[] }>(API_ENDPOINTS.TEST_PROGRESS(testId));
+      setProgress(Array.isArray(data.students) ? data.students : []);
     } catch (error) {
       console.error('Failed to fetch test progress:', error);
-      // Set empty array on error to prevent filter issues
-      setProgress([]);
-    } finally {
-      if (isRefresh) {
-        setRefreshing(false);
-      }
     }
   };
 
   const getStatusColor = (status: string) => {
     switch (status) {
-      case 'completed': return 'bg-green-100 text-green-800';
-      case 'in_progress': return 'bg-yellow-100 text-yellow-800';
-      case 'not_started': return 'bg-gray-100 text-gray-800';
+      case 'Submitted': return 'bg-green-100 text-green-800';
+      case 'In Progress': return 'bg-yellow-100 text-yellow-800';
       default: return 'bg-gray-100 text-gray-800';
     }
   };
 
   const getStatusIcon = (status: string) => {
     switch (status) {
-      case 'submitted': return <CheckCircle className="h-4 w-4 text-green-600" />;
-      case 'in_progress': return <Clock className="h-4 w-4 text-yellow-600" />;
+      case 'Submitted': return <CheckCircle className="h-4 w-4 text-green-600" />;
+      case 'In Progress': return <Clock className="h-4 w-4 text-yellow-600" />;
       default: return <AlertCircle className="h-4 w-4 text-gray-400" />;
     }
   };
@@ -96,9 +125,8 @@ export function LiveMonitoring() {
     );
   }
 
-  const completedCount = Array.isArray(progress) ? progress.filter(p => p.status === 'submitted').length : 0;
-  const inProgressCount = Array.isArray(progress) ? progress.filter(p => p.status === 'in_progress').length : 0;
-  const notStartedCount = Array.isArray(progress) ? progress.filter(p => p.status === 'not_started').length : 0;
+  const completedCount = progress.filter(p => p.status === 'Submitted').length;
+  const inProgressCount = progress.filter(p => p.status === 'In Progress').length;
 
   return (
     <div className="space-y-6">
@@ -106,8 +134,8 @@ export function LiveMonitoring() {
       <div className="flex justify-between items-center">
         <h1 className="text-2xl font-bold text-gray-900">Live Test Monitoring</h1>
         <div className="flex items-center space-x-2 text-sm text-gray-600">
-          {refreshing && <LoadingSpinner size="sm" />}
-          <span>Auto-refresh every 5s</span>
+          <span className={`h-2 w-2 rounded-full ${connected ? 'bg-green-500' : 'bg-gray-400'}`} />
+          <span>{connected ? 'Live updates' : 'Connecting...'}</span>
         </div>
       </div>
 
@@ -139,7 +167,7 @@ export function LiveMonitoring() {
       {selectedTest && (
         <>
           {/* Overview Stats */}
-          <div className="grid grid-cols-1 md:grid-cols-4 gap-6">
+          <div className="grid grid-cols-1 md:grid-cols-3 gap-6">
             <div className="bg-white p-6 rounded-xl shadow-sm border border-gray-200">
               <div className="flex items-center">
                 <Users className="h-8 w-8 text-blue-600" />
@@ -169,16 +197,6 @@ export function LiveMonitoring() {
                 </div>
               </div>
             </div>
-
-            <div className="bg-white p-6 rounded-xl shadow-sm border border-gray-200">
-              <div className="flex items-center">
-                <AlertCircle className="h-8 w-8 text-gray-400" />
-                <div className="ml-4">
-                  <p className="text-sm font-medium text-gray-600">Not Started</p>
-                  <p className="text-2xl font-bold text-gray-900">{notStartedCount}</p>
-                </div>
-              </div>
-            </div>
           </div>
 
           {/* Student Progress Table */}
@@ -207,12 +225,12 @@ export function LiveMonitoring() {
                 </thead>
                 <tbody className="bg-white divide-y divide-gray-200">
                   {Array.isArray(progress) ? progress.map((student) => (
-                    <tr key={student.user_id} className="hover:bg-gray-50">
+                    <tr key={student.student_id} className="hover:bg-gray-50">
                       <td className="px-6 py-4 whitespace-nowrap">
-                        <div className="font-medium text-gray-900">{student.user_name}</div>
+                        <div className="font-medium text-gray-900">{student.student_name}</div>
                       </td>
                       <td className="px-6 py-4 whitespace-nowrap">
-                        <div className="text-sm text-gray-600">{student.class_name}</div>
+                        <div className="text-sm text-gray-600">{student.student_class}</div>
                       </td>
                       <td className="px-6 py-4 whitespace-nowrap">
                         <div className="flex items-center">
@@ -233,7 +251,7 @@ export function LiveMonitoring() {
                         <div className="flex items-center">
                           {getStatusIcon(student.status)}
                           <span className={`ml-2 px-2 py-1 text-xs font-medium rounded-full ${getStatusColor(student.status)}`}>
-                            {student.status.replace('_', ' ')}
+                            {student.status}
                           </span>
                         </div>
                       </td>
@@ -19,7 +19,7 @@ export function QuestionBank() {
     option_b: '',
     option_c: '',
     option_d: '',
-    correct_answer: 'a' as 'a' | 'b' | 'c' | 'd',
+    correct_answer: 'A' as 'A' | 'B' | 'C' | 'D',
     topic: '',
     difficulty_level: 'easy' as 'easy' | 'medium' | 'hard',
     image_url: ''
@@ -32,7 +32,6 @@ export function QuestionBank() {
   const fetchQuestions = async () => {
     try {
       const data = await apiClient.get<Question[]>(API_ENDPOINTS.QUESTIONS, {
-        skip: '0',
         limit: '100'
       });
       setQuestions(data);
@@ -77,7 +76,7 @@ export function QuestionBank() {
       option_b: '',
       option_c: '',
       option_d: '',
-      correct_answer: 'a',
+      correct_answer: 'A',
       topic: '',
       difficulty_level: 'easy',
       image_url: ''
@@ -198,16 +197,16 @@ export function QuestionBank() {
                   </div>
                   
                   <div className="grid grid-cols-1 md:grid-cols-2 gap-2 text-sm">
-                    <div className={`p-2 rounded border ${question.correct_answer === 'a' ? 'bg-green-50 border-green-200' : 'bg-gray-50 border-gray-200'}`}>
+                    <div className={`p-2 rounded border ${question.correct_answer === 'A' ? 'bg-green-50 border-green-200' : 'bg-gray-50 border-gray-200'}`}>
                       <span className="font-medium">A.</span> {question.option_a}
                     </div>
-                    <div className={`p-2 rounded border ${question.correct_answer === 'b' ? 'bg-green-50 border-green-200' : 'bg-gray-50 border-gray-200'}`}>
+                    <div className={`p-2 rounded border ${question.correct_answer === 'B' ? 'bg-green-50 border-green-200' : 'bg-gray-50 border-gray-200'}`}>
                       <span className="font-medium">B.</span> {question.option_b}
                     </div>
-                    <div className={`p-2 rounded border ${question.correct_answer === 'c' ? 'bg-green-50 border-green-200' : 'bg-gray-50 border-gray-200'}`}>
+                    <div className={`p-2 rounded border ${question.correct_answer === 'C' ? 'bg-green-50 border-green-200' : 'bg-gray-50 border-gray-200'}`}>
                       <span className="font-medium">C.</span> {question.option_c}
                     </div>
-                    <div className={`p-2 rounded border ${question.correct_answer === 'd' ? 'bg-green-50 border-green-200' : 'bg-gray-50 border-gray-200'}`}>
+                    <div className={`p-2 rounded border ${question.correct_answer === 'D' ? 'bg-green-50 border-green-200' : 'bg-gray-50 border-gray-200'}`}>
                       <span className="font-medium">D.</span> {question.option_d}
                     </div>
                   </div>
@@ -318,13 +317,13 @@ export function QuestionBank() {
                   </label>
                   <select
                     value={formData.correct_answer}
-                    onChange={(e) => setFormData(prev => ({ ...prev, correct_answer: e.target.value as 'a' | 'b' | 'c' | 'd' }))}
+                    onChange={(e) => setFormData(prev => ({ ...prev, correct_answer: e.target.value as 'A' | 'B' | 'C' | 'D' }))}
                     className="w-full px-3 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-blue-500"
                   >
-                    <option value="a">A</option>
-                    <option value="b">B</option>
-                    <option value="c">C</option>
-                    <option value="d">D</option>
+                    <option value="A">A</option>
+                    <option value="B">B</option>
+                    <option value="C">C</option>
+                    <option value="D">D</option>
                   </select>
                 </div>
                 
@@ -18,7 +18,7 @@ export interface Question {
   option_b: string;
   option_c: string;
   option_d: string;
-  correct_answer: 'a' | 'b' | 'c' | 'd';
+  correct_answer: 'A' | 'B' | 'C' | 'D';
   topic: string;
   difficulty_level: 'easy' | 'medium' | 'hard';
   image_url?: string;
@@ -35,6 +35,8 @@ export interface Test {
   duration_minutes: number;
   assigned_classes: string;
   is_live: boolean;
+  shuffle_questions?: boolean;
+  shuffle_options?: boolean;
   created_by: number;
   school_name: string;
   created_at: string;
@@ -44,7 +46,7 @@ export interface Test {
 
 export interface TestAnswer {
   question_id: number;
-  selected_answer: 'a' | 'b' | 'c' | 'd' | null;
+  selected_answer: 'A' | 'B' | 'C' | 'D' | null;
 }
 
 export interface Submission {
@@ -67,24 +69,48 @@ export interface AuthState {
 }
 
 export interface TestProgress {
-  user_id: number;
-  user_name: string;
-  class_name: string;
+  student_id: number;
+  student_name: string;
+  student_class: string | null;
   attempted_questions: number;
   total_questions: number;
-  status: 'not_started' | 'in_progress' | 'submitted';
-  current_answers: Record<number, string>;
+  status: 'In Progress' | 'Submitted';
+  started_at: string | null;
+  submitted_at: string | null;
+  score: number | null;
+}
+
+export type TestProgressEvent =
+  | { type: 'snapshot'; test_id: number; students: TestProgress[] }
+  | { type: 'student'; test_id: number; student: TestProgress }
+  | { type: 'resync' };
+
+export interface QuestionAnalysis {
+  question_id: number;
+  topic?: string;
+  difficulty_level: string;
+  correct_answer: string;
+  answered: number;
+  correct: number;
+  p_value: number | null;
+  discrimination_index: number | null;
+  skip_rate: number | null;
+  option_distribution: Record<'A' | 'B' | 'C' | 'D', number>;
 }
 
 export interface TestAnalytics {
+  test_id: number;
+  test_name: string;
   total_submissions: number;
+  scored_submissions: number;
   average_score: number;
-  pass_rate: number;
-  score_distribution: Array<{ range: string; count: number }>;
-  question_analytics: Array<{
-    question_id: number;
-    question_text: string;
-    correct_rate: number;
-    difficulty_perception: string;
+  score_distribution: Record<string, number>;
+  percentile_buckets: Array<{
+    percentile: string;
+    count: number;
+    min_score: number;
+    max_score: number;
+    average_score: number;
   }>;
+  question_analysis: QuestionAnalysis[];
 }
\ No newline at end of file